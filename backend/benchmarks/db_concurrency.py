@@ -0,0 +1,179 @@
+"""
+Concurrent database write benchmark
+Two processes (like the two uvicorn workers) each run auth traffic (register,
+login lookup) and results traffic (save_playlist, load_analysis) in parallel
+threads against one SQLite file. Compares the original plain engine
+('legacy') with the tuned engine from database.py ('tuned').
+
+Usage (from backend/):
+    python -m benchmarks.db_concurrency
+    python -m benchmarks.run --suite db
+"""
+
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+from .fixtures import fake_track_features
+
+MODES = ["legacy", "tuned"]
+WORKLOADS = ["auth_write", "auth_read", "results_write", "results_read"]
+PARAMS = ['spectral_rolloff', 'spectral_flatness', 'low_energy', 'mid_energy', 'high_energy', 'danceability']
+
+
+def _auth_traffic(session_factory, worker: int, ops: int, record):
+    import models
+
+    for i in range(ops):
+        email = f"bench-{worker}-{i}@example.com"
+        with session_factory() as db:
+            start = time.perf_counter()
+            try:
+                db.add(models.User(email=email, hashed_password="x" * 60))
+                db.commit()
+                record("auth_write", time.perf_counter() - start)
+            except Exception:
+                db.rollback()
+                record("auth_write", None)
+
+            start = time.perf_counter()
+            try:
+                db.query(models.User).filter(models.User.email == email).first()
+                record("auth_read", time.perf_counter() - start)
+            except Exception:
+                record("auth_read", None)
+
+
+def _results_traffic(session_factory, worker: int, ops: int, record):
+    import results_store
+
+    tracks = [{
+        "content_hash": uuid.uuid4().hex * 2,
+        "filename": features.pop("filename"),
+        "features": features
+    } for features in fake_track_features(20, PARAMS, seed=worker)]
+    profile = {p: {'mean': 1.0, 'std': 0.1, 'min': 0.0, 'max': 2.0} for p in PARAMS}
+
+    for i in range(ops):
+        session_id = f"bench-{worker}-{i}"
+        with session_factory() as db:
+            start = time.perf_counter()
+            try:
+                results_store.save_playlist(db, session_id, PARAMS, profile, tracks)
+                record("results_write", time.perf_counter() - start)
+            except Exception:
+                db.rollback()
+                record("results_write", None)
+
+            start = time.perf_counter()
+            try:
+                results_store.load_analysis(db, session_id)
+                record("results_read", time.perf_counter() - start)
+            except Exception:
+                record("results_read", None)
+
+
+def _worker(url: str, mode: str, worker: int, ops: int, queue):
+    """One simulated uvicorn worker: auth and results traffic on two threads"""
+    os.environ["DATABASE_URL"] = url
+    import database
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    if mode == "legacy":
+        # The engine as originally configured: default journal, no tuning
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    else:
+        session_factory = database.SessionLocal
+
+    samples: Dict[str, List] = {name: [] for name in WORKLOADS}
+    lock = threading.Lock()
+
+    def record(name, seconds):
+        with lock:
+            samples[name].append(seconds)
+
+    threads = [
+        threading.Thread(target=_auth_traffic, args=(session_factory, worker, ops, record)),
+        threading.Thread(target=_results_traffic, args=(session_factory, worker, ops, record)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put(samples)
+
+
+def _summarize(values: List) -> Dict:
+    times = sorted(v for v in values if v is not None)
+    errors = sum(1 for v in values if v is None)
+    if not times:
+        return {'errors': errors}
+    return {
+        'median': statistics.median(times),
+        'min': times[0],
+        'p95': times[min(len(times) - 1, int(len(times) * 0.95))],
+        'max': times[-1],
+        'runs': len(times),
+        'errors': errors
+    }
+
+
+def measure(mode: str, workers: int = 2, ops: int = 100) -> Dict:
+    """
+    Run the concurrent workload against a fresh database file
+
+    Args:
+        mode: 'legacy' or 'tuned'
+        workers: Number of worker processes
+        ops: Operations per workload per worker
+
+    Returns:
+        Latency summary per workload plus total wall time
+    """
+    from sqlalchemy import create_engine
+    import models
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        setup_engine = create_engine(url)
+        models.Base.metadata.create_all(setup_engine)
+        setup_engine.dispose()
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        start = time.perf_counter()
+        processes = [ctx.Process(target=_worker, args=(url, mode, w, ops, queue)) for w in range(workers)]
+        for process in processes:
+            process.start()
+        collected = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        wall = time.perf_counter() - start
+
+    results = {f"db/{mode}/wall": {'median': wall, 'min': wall, 'runs': 1}}
+    for name in WORKLOADS:
+        values = [v for samples in collected for v in samples[name]]
+        results[f"db/{mode}/{name}"] = _summarize(values)
+    return results
+
+
+def run(modes: List[str] = None, ops: int = 100) -> Dict:
+    """Run all modes in the benchmark result format"""
+    results = {}
+    for mode in modes or MODES:
+        print(f"  [db] {mode} engine, 2 workers x {ops} ops")
+        results.update(measure(mode, ops=ops))
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,162 @@
+"""
+Deterministic synthetic audio fixtures for benchmarks
+Generates music-like signals (chords, kick, hi-hats) at real track lengths
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import shutil
+import subprocess
+import numpy as np
+import soundfile as sf
+
+
+FIXTURE_DIR = Path(__file__).parent / ".fixtures"
+
+# name -> (duration in seconds, channels)
+FIXTURES: Dict[str, tuple] = {
+    "30s_mono": (30, 1),
+    "30s_stereo": (30, 2),
+    "3min_stereo": (180, 2),
+    "10min_stereo": (600, 2),
+}
+
+QUICK_FIXTURES = ["30s_mono", "30s_stereo", "3min_stereo"]
+
+# A minor - F major - C major - G major, one chord per bar
+_PROGRESSION = [
+    [220.00, 261.63, 329.63],
+    [174.61, 220.00, 261.63],
+    [261.63, 329.63, 392.00],
+    [196.00, 246.94, 293.66],
+]
+
+
+def make_signal(duration: float, sr: int = 44100, channels: int = 2,
+                bpm: float = 120.0, seed: int = 0) -> np.ndarray:
+    """
+    Build a deterministic music-like test signal
+
+    Args:
+        duration: Length in seconds
+        sr: Sample rate
+        channels: 1 for mono, 2 for stereo
+        bpm: Tempo of the kick/hi-hat pattern
+        seed: Seed for the noise components
+
+    Returns:
+        Float32 array of shape (samples,) or (samples, channels)
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n, dtype=np.float64) / sr
+
+    beat_len = 60.0 / bpm
+    bar_len = beat_len * 4
+
+    # Chord pad: switch chords every bar, a few harmonics per note
+    chord_idx = (t // bar_len).astype(int) % len(_PROGRESSION)
+    pad = np.zeros(n)
+    for i, chord in enumerate(_PROGRESSION):
+        mask = chord_idx == i
+        tm = t[mask]
+        for f in chord:
+            for h, amp in ((1, 0.12), (2, 0.05), (3, 0.02)):
+                pad[mask] += amp * np.sin(2 * np.pi * f * h * tm)
+
+    # Kick on every beat: decaying 55 Hz sine with a pitch drop
+    beat_phase = np.mod(t, beat_len)
+    kick_env = np.exp(-beat_phase * 18.0)
+    kick = 0.6 * kick_env * np.sin(2 * np.pi * (55.0 + 60.0 * kick_env) * beat_phase)
+
+    # Hi-hat on the off-beats: short bursts of high-passed noise
+    hat_phase = np.mod(t + beat_len / 2, beat_len)
+    noise = rng.standard_normal(n)
+    noise = np.diff(noise, prepend=0.0)
+    hats = 0.08 * np.exp(-hat_phase * 60.0) * noise
+
+    # Slow energy arc so section-level features have something to measure
+    arc = 0.7 + 0.3 * np.sin(2 * np.pi * t / max(duration, 1.0))
+    mono = arc * (pad + kick + hats)
+
+    if channels == 1:
+        out = mono
+    else:
+        # Slightly decorrelated channels for a non-trivial stereo width
+        side = 0.05 * rng.standard_normal(n) * np.exp(-hat_phase * 30.0)
+        out = np.stack([mono + side, mono - side], axis=1)
+
+    peak = np.max(np.abs(out))
+    if peak > 0:
+        out = out * (0.89 / peak)
+    return out.astype(np.float32)
+
+
+# file extension -> (soundfile format, subtype)
+FORMATS: Dict[str, tuple] = {
+    "wav": ("WAV", "PCM_16"),
+    "flac": ("FLAC", "PCM_16"),
+    "mp3": ("MP3", "MPEG_LAYER_III"),
+}
+
+# file extension -> ffmpeg codec arguments, for formats libsndfile cannot write
+# (transcoded from the WAV fixture; only the ffmpeg decoder reads them)
+ENCODED_FORMATS: Dict[str, List[str]] = {
+    "m4a": ["-c:a", "aac", "-b:a", "192k"],
+    "opus": ["-c:a", "libopus", "-b:a", "128k"],
+}
+
+
+def fixture_path(name: str, sr: int = 44100, fmt: str = "wav") -> Path:
+    """
+    Return path of a fixture file, generating it on first use
+
+    Args:
+        name: Fixture name from FIXTURES
+        sr: Sample rate of the written file
+        fmt: File format from FORMATS (MP3 needs libsndfile >= 1.1) or ENCODED_FORMATS
+            (needs ffmpeg)
+
+    Returns:
+        Path to the audio file
+    """
+    duration, channels = FIXTURES[name]
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    path = FIXTURE_DIR / f"{name}_{sr}.{fmt}"
+    if not path.exists() and fmt in ENCODED_FORMATS:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError(f"ffmpeg is needed to write {fmt} fixtures")
+        partial = path.with_name(f"partial_{path.name}")
+        subprocess.run([ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", str(fixture_path(name, sr)),
+                        *ENCODED_FORMATS[fmt], str(partial)], check=True)
+        partial.replace(path)
+    elif not path.exists():
+        seed = sum(ord(c) for c in name)
+        file_format, subtype = FORMATS[fmt]
+        sf.write(str(path), make_signal(duration, sr, channels, seed=seed), sr,
+                 format=file_format, subtype=subtype)
+    return path
+
+
+def fake_track_features(count: int, params: List[str], seed: int = 0) -> List[Dict]:
+    """
+    Build deterministic feature dicts for comparator benchmarks
+
+    Args:
+        count: Number of tracks
+        params: Parameter names to fill
+        seed: Random seed
+
+    Returns:
+        List of feature dictionaries shaped like AudioProcessor output
+    """
+    rng = np.random.default_rng(seed)
+    keys = ['C Major', 'A Minor', 'G Major', 'E Minor']
+    tracks = []
+    for i in range(count):
+        track = {p: float(rng.uniform(0.1, 100.0)) for p in params}
+        track['key'] = keys[i % len(keys)]
+        track['filename'] = f"track_{i:02d}.wav"
+        tracks.append(track)
+    return tracks
@@ -0,0 +1,559 @@
+"""
+Benchmark runner for THE ALGORITHM
+Times extractors, analyze_file, comparators and HTTP endpoints
+and compares the results against a stored baseline
+
+Usage (from backend/):
+    python -m benchmarks.run                    # full suite, all fixtures
+    python -m benchmarks.run --quick            # skip the 10 minute fixture
+    python -m benchmarks.run --suite extractors --suite analyze
+    python -m benchmarks.run --save-baseline    # store results as the new baseline
+    python -m benchmarks.run --suite startup    # worker boot, first analysis, /health and warm-up latency
+    python -m benchmarks.run --suite db         # concurrent auth/results writes, legacy vs tuned engine
+    python -m benchmarks.run --suite serialization  # batch response JSON encoding
+    python -m benchmarks.run --suite report     # HTML report rendering, 30 to 1000 tracks
+    python -m benchmarks.run --suite aggregation  # structure extractors on frames vs beats vs bars
+    python -m benchmarks.run --suite decode     # decoder backends (soundfile, ffmpeg, librosa) per format, mono/stereo
+    python -m benchmarks.run --suite resampling  # resampling strategies: time and per-feature error vs soxr_hq
+    python -m benchmarks.run --suite stft       # 30-track playlist: librosa.stft vs blocked STFT; mel/chroma
+                                                # features per track vs analyze_batch
+
+The endpoint suite needs httpx (FastAPI's TestClient).
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .fixtures import ENCODED_FORMATS, FIXTURES, FORMATS, QUICK_FIXTURES, fixture_path, fake_track_features
+
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_OUTPUT = BENCH_DIR / "results.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+SUITES = ["extractors", "analyze", "comparators", "endpoints", "startup", "db", "serialization", "report",
+          "aggregation", "decode", "resampling", "stft"]
+
+# Parameters offered by the frontend (index.html), in UI order
+UI_PARAMS = [
+    'spectral_rolloff', 'spectral_flatness', 'zero_crossing_rate',
+    'low_energy', 'mid_energy', 'high_energy',
+    'danceability', 'beat_strength', 'sub_bass_presence', 'stereo_width', 'valence', 'key_confidence',
+    'loudness_range', 'true_peak', 'crest_factor', 'spectral_contrast', 'transient_energy',
+    'harmonic_to_noise_ratio',
+    'harmonic_complexity', 'melodic_range', 'rhythmic_density', 'arrangement_density',
+    'repetition_score', 'frequency_occupancy', 'timbral_diversity', 'vocal_instrumental_ratio',
+    'energy_curve', 'call_response_presence',
+]
+
+# Cheap spectral/energy tiers - what most users pick for large playlists
+FAST_PARAMS = UI_PARAMS[:6]
+
+# Samples trimmed per track in the stft suite so excerpts differ in length
+LENGTH_JITTER = 100
+
+
+def time_call(fn: Callable, repeat: int = 3) -> Dict:
+    """
+    Time a callable several times
+
+    Args:
+        fn: Zero-argument callable
+        repeat: Number of runs
+
+    Returns:
+        Dictionary with median and min seconds
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        'median': statistics.median(runs),
+        'min': min(runs),
+        'runs': len(runs)
+    }
+
+
+def _extractor_args(method: Callable, y, y_stereo, sr: int) -> Dict:
+    """Build keyword arguments for an extract_* method from its signature"""
+    available = {
+        'y': y,
+        'sr': sr,
+        'y_stereo': y_stereo,
+        'bpm': 120.0,
+        'features': {'bpm': 120.0, 'spectral_centroid': 2000.0, 'energy': 0.1, 'key': 'C Major'},
+    }
+    params = inspect.signature(method).parameters
+    return {name: available[name] for name in params if name in available}
+
+
+def bench_extractors(fixtures: List[str], repeat: int) -> Dict:
+    """Time decoding and every AudioProcessor.extract_* method on each fixture"""
+    import librosa
+    import numpy as np
+    from core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    results = {}
+
+    for name in fixtures:
+        path = str(fixture_path(name))
+        print(f"  [extractors] {name}")
+
+        results[f"decode/{name}/mono"] = time_call(
+            lambda: librosa.load(path, sr=processor.sr, mono=True), repeat)
+        results[f"decode/{name}/stereo"] = time_call(
+            lambda: librosa.load(path, sr=processor.sr, mono=False), repeat)
+
+        y, sr = librosa.load(path, sr=processor.sr, mono=True)
+        y_stereo, _ = librosa.load(path, sr=processor.sr, mono=False)
+        if y_stereo.ndim == 1:
+            y_stereo = np.array([y, y])
+
+        for method_name, method in inspect.getmembers(processor, inspect.ismethod):
+            if not method_name.startswith('extract_'):
+                continue
+            kwargs = _extractor_args(method, y, y_stereo, sr)
+            key = f"extractors/{name}/{method_name}"
+            try:
+                results[key] = time_call(lambda: method(**kwargs), repeat)
+            except Exception as e:
+                # Keep going - a broken extractor shows up as an error entry
+                results[key] = {'error': str(e)}
+
+    return results
+
+
+def bench_analyze(fixtures: List[str], repeat: int) -> Dict:
+    """Time analyze_file in fast mode (cheap and all UI params) and full mode"""
+    from core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    results = {}
+
+    for name in fixtures:
+        path = str(fixture_path(name))
+        print(f"  [analyze] {name}")
+        results[f"analyze/{name}/fast_tier1"] = time_call(
+            lambda: processor.analyze_file(path, fast_mode=True, additional_params=FAST_PARAMS), repeat)
+        results[f"analyze/{name}/fast_all"] = time_call(
+            lambda: processor.analyze_file(path, fast_mode=True, additional_params=UI_PARAMS), repeat)
+        results[f"analyze/{name}/full"] = time_call(
+            lambda: processor.analyze_file(path, fast_mode=False), repeat)
+
+    return results
+
+
+def bench_aggregation(fixtures: List[str], repeat: int) -> Dict:
+    """Time the chroma/MFCC structure extractors with frame, beat and bar pooling"""
+    import librosa
+    from core.audio_processor import AudioProcessor
+
+    # bpm shares the beat grid, as in a typical selection
+    params = ['bpm', 'harmonic_complexity', 'repetition_score', 'timbral_diversity']
+    results = {}
+
+    for name in fixtures:
+        print(f"  [aggregation] {name}")
+        y, sr = librosa.load(str(fixture_path(name)), sr=11025, mono=True)
+        for aggregation in AudioProcessor.AGGREGATIONS:
+            processor = AudioProcessor(aggregation=aggregation)
+            results[f"aggregation/{name}/{aggregation}"] = time_call(
+                lambda: processor.analyze_signal(y, sr, params), repeat)
+
+    return results
+
+
+def bench_decode(fixtures: List[str], repeat: int) -> Dict:
+    """
+    Time every decoder backend per file format, decoding to the analysis rate
+
+    Covers the libsndfile formats and, through ffmpeg-encoded fixtures, the formats only
+    the ffmpeg backend reads. "selected" times the backend AudioProcessor would pick.
+    A backend missing here (e.g. no ffmpeg binary) is recorded as an error, not skipped.
+    """
+    from core.decoders import BACKENDS, default_decoders
+
+    results = {}
+    backends = [backend() for backend in BACKENDS.values()]
+    decoders = default_decoders()
+    for name in fixtures:
+        for fmt in list(FORMATS) + list(ENCODED_FORMATS):
+            try:
+                path = str(fixture_path(name, fmt=fmt))
+            except Exception as e:  # e.g. MP3 with libsndfile < 1.1, m4a/opus without ffmpeg
+                results[f"decode/{name}/{fmt}"] = {'error': str(e)}
+                continue
+            print(f"  [decode] {name}.{fmt}")
+            for backend in backends:
+                if not backend.supports(fmt):
+                    continue
+                for mono in (True, False):
+                    key = f"decode/{name}/{fmt}/{backend.name}/{'mono' if mono else 'stereo'}"
+                    if not backend.available():
+                        results[key] = {'error': f"{backend.name} backend not available"}
+                        continue
+                    try:
+                        results[key] = time_call(lambda: backend.decode(path, 11025, mono), repeat)
+                    except Exception as e:
+                        results[key] = {'error': str(e)}
+            for mono in (True, False):
+                key = f"decode/{name}/{fmt}/selected/{'mono' if mono else 'stereo'}"
+                used = []
+                try:
+                    results[key] = time_call(lambda: used.append(decoders.decode(path, 11025, mono)[1]), repeat)
+                    results[key]['backend'] = used[-1]
+                except Exception as e:
+                    results[key] = {'error': str(e)}
+
+    return results
+
+
+def bench_resampling(fixtures: List[str], repeat: int) -> Dict:
+    """
+    Time each resampling strategy (44.1k -> 11.025k) and measure the relative error
+    it introduces in every parameter, against soxr_hq (source of core.resampling.FEATURE_ERROR)
+    """
+    import soundfile as sf
+    from core import resampling
+    from core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    results = {}
+
+    def analyze(stereo):
+        return processor.analyze_signal(stereo.mean(axis=0), 11025, AudioProcessor.ALL_PARAMS, stereo)
+
+    for name in fixtures:
+        print(f"  [resampling] {name}")
+        y, native_sr = sf.read(str(fixture_path(name)), dtype='float32', always_2d=True)
+        mono = y.mean(axis=1)
+        reference = analyze(resampling.resample(y, native_sr, 11025, resampling.DEFAULT).T.copy())
+        for strategy in resampling.STRATEGIES:
+            results[f"resampling/{name}/{strategy}/mono"] = time_call(
+                lambda: resampling.resample(mono, native_sr, 11025, strategy), repeat)
+            stereo = resampling.resample(y, native_sr, 11025, strategy).T.copy()
+            features = analyze(stereo)
+            errors = {}
+            for param, expected in reference.items():
+                if isinstance(expected, (int, float)) and not isinstance(expected, bool):
+                    errors[param] = round(abs(features[param] - expected) / max(abs(expected), 1e-9), 4)
+            results[f"resampling/{name}/{strategy}/stereo"] = dict(
+                time_call(lambda: resampling.resample(y, native_sr, 11025, strategy), repeat),
+                errors={param: error for param, error in sorted(errors.items(), key=lambda item: -item[1])
+                        if error >= 0.0001})
+
+    return results
+
+
+def bench_stft(fixtures: List[str], repeat: int) -> Dict:
+    """
+    Time the STFT of a 30-track playlist (30 s excerpts of each fixture), librosa.stft vs
+    the blocked stft_magnitude, and the parameters that share the mel spectrogram or the
+    chromagram, track by track (analyze_signal) vs in batches (analyze_batch)
+    """
+    import librosa
+    import numpy as np
+    from core.audio_processor import AudioProcessor, stft_magnitude
+
+    processor = AudioProcessor()
+    # Parameters reading the shared mel spectrogram (onset strength, beats, MFCC)
+    mel_params = ['bpm', 'danceability', 'rhythmic_density', 'timbral_diversity']
+    # Parameters reading the shared chromagram
+    chroma_params = ['key_confidence', 'harmonic_complexity']
+    # Tracks per analyze_batch call (PLAYLIST_BATCH_SIZE to route playlists through it)
+    batch_size = 8
+    results = {}
+
+    for name in fixtures:
+        print(f"  [stft] {name}")
+        y, sr = librosa.load(str(fixture_path(name)), sr=11025, mono=True)
+        length = min(len(y), 30 * sr)
+        # Staggered excerpts of slightly different lengths, like real tracks
+        starts = np.linspace(0, len(y) - length, 30).astype(int)
+        signals = [y[start:start + length - i * LENGTH_JITTER].copy() for i, start in enumerate(starts)]
+
+        results[f"stft/{name}/librosa"] = time_call(
+            lambda: [np.abs(librosa.stft(signal)) for signal in signals], repeat)
+        results[f"stft/{name}/blocked"] = time_call(
+            lambda: [stft_magnitude(signal) for signal in signals], repeat)
+        for label, params in (('mel_params', mel_params), ('chroma_params', chroma_params)):
+            results[f"stft/{name}/{label}"] = time_call(
+                lambda: [processor.analyze_signal(signal, sr, params) for signal in signals], repeat)
+            results[f"stft/{name}/{label}/batch"] = time_call(
+                lambda: [processor.analyze_batch(signals[i:i + batch_size], sr, params)
+                         for i in range(0, len(signals), batch_size)], repeat)
+
+    return results
+
+
+def bench_comparators(repeat: int) -> Dict:
+    """Time PlaylistComparator and TrackComparator on a 30-track, all-params playlist"""
+    from core.playlist_comparator import PlaylistComparator
+    from core.track_comparator import TrackComparator
+
+    params = ['bpm', 'energy', 'loudness', 'spectral_centroid', 'rms', 'dynamic_range'] + UI_PARAMS
+    playlist = fake_track_features(30, params, seed=1)
+    user_tracks = fake_track_features(10, params, seed=2)
+    print("  [comparators] 30 tracks x %d params" % len(params))
+
+    def playlist_batch():
+        comparator = PlaylistComparator(playlist)
+        for track in user_tracks:
+            comparator.generate_recommendations(comparator.compare_track(track))
+
+    def track_batch():
+        comparator = TrackComparator(playlist[0])
+        for track in user_tracks:
+            comparator.compare_track(track)
+
+    repeat = max(repeat, 10)
+    return {
+        'comparators/playlist/profile': time_call(lambda: PlaylistComparator(playlist), repeat),
+        'comparators/playlist/compare_10': time_call(playlist_batch, repeat),
+        'comparators/track/compare_10': time_call(track_batch, repeat),
+    }
+
+
+def bench_report(repeat: int) -> Dict:
+    """Time rendering a batch report to disk for growing numbers of compared tracks"""
+    import tempfile
+    from core.feature_matrix import FeatureMatrix
+    from core.playlist_comparator import PlaylistComparator
+    from core.report_generator import ReportGenerator
+
+    comparator = PlaylistComparator(fake_track_features(30, UI_PARAMS, seed=1))
+    generator = ReportGenerator()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "report.html"
+        for count in (30, 300, 1000):
+            print(f"  [report] {count} tracks")
+            matrix = FeatureMatrix.from_tracks(fake_track_features(count, UI_PARAMS, seed=2))
+            recommendations = [{
+                "filename": filename,
+                "comparison": comparison,
+                "recommendations": comparator.generate_recommendations(comparison)
+            } for filename, comparison in zip(matrix.filenames, comparator.compare_tracks(matrix))]
+            results[f"report/render_{count}"] = time_call(
+                lambda: generator.write_report(path, comparator.profile, recommendations), repeat)
+
+        # Charts on the first CHART_TRACKS tracks: drawn (cold) and from the chart cache
+        from core.charts import charts
+        matrix = FeatureMatrix.from_tracks(fake_track_features(30, UI_PARAMS, seed=2))
+        features = {filename: matrix.row(i) for i, filename in enumerate(matrix.filenames)}
+        recommendations = [{
+            "filename": filename,
+            "comparison": comparison,
+            "recommendations": comparator.generate_recommendations(comparison)
+        } for filename, comparison in zip(matrix.filenames, comparator.compare_tracks(matrix))]
+
+        def render_with_charts(cold: bool):
+            if cold:
+                charts.clear()
+            return generator.write_report(path, comparator.profile, recommendations, track_features=features)
+
+        print("  [report] 30 tracks with charts")
+        results["report/charts_30_cold"] = time_call(lambda: render_with_charts(True), repeat)
+        results["report/charts_30_cached"] = time_call(lambda: render_with_charts(False), repeat)
+
+    return results
+
+
+def bench_endpoints(repeat: int) -> Dict:
+    """Time the HTTP endpoints end to end through FastAPI's TestClient"""
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app, raise_server_exceptions=False)
+    results = {}
+    playlist_paths = [fixture_path("30s_mono"), fixture_path("30s_stereo")]
+    user_path = fixture_path("30s_stereo")
+    print("  [endpoints] 30s fixtures")
+
+    def files_payload(field: str, paths: List[Path]):
+        return [(field, (p.name, p.read_bytes(), "audio/wav")) for p in paths]
+
+    sessions = []
+
+    def upload_playlist():
+        response = client.post("/api/upload/playlist", files=files_payload("files", playlist_paths))
+        response.raise_for_status()
+        sessions.append(response.json()["session_id"])
+
+    results['endpoints/upload_playlist'] = time_call(upload_playlist, repeat)
+    session_id = sessions[-1]
+
+    def analyze():
+        client.post("/api/analyze/playlist",
+                    json={"session_id": session_id, "additional_params": FAST_PARAMS}).raise_for_status()
+
+    def upload_user():
+        client.post("/api/upload/user-tracks", data={"session_id": session_id},
+                    files=files_payload("files", [user_path])).raise_for_status()
+
+    def compare_batch():
+        client.post("/api/compare/batch",
+                    json={"session_id": session_id, "additional_params": FAST_PARAMS}).raise_for_status()
+
+    def compare_single(mode: str):
+        files = files_payload("user_track", [user_path])
+        if mode == "track":
+            files += files_payload("reference_track", [playlist_paths[0]])
+        client.post("/api/compare/single", files=files, data={
+            "mode": mode,
+            "session_id": session_id,
+            "additional_params": json.dumps(FAST_PARAMS),
+        }).raise_for_status()
+
+    def report():
+        client.post("/api/report/generate", json={"session_id": session_id}).raise_for_status()
+        client.get(f"/api/report/download/{session_id}")
+
+    results['endpoints/analyze_playlist'] = time_call(analyze, repeat)
+    results['endpoints/upload_user_tracks'] = time_call(upload_user, repeat)
+    results['endpoints/compare_batch'] = time_call(compare_batch, repeat)
+    results['endpoints/compare_single_playlist'] = time_call(lambda: compare_single("playlist"), repeat)
+    results['endpoints/compare_single_track'] = time_call(lambda: compare_single("track"), repeat)
+    results['endpoints/report'] = time_call(report, repeat)
+    results['endpoints/health'] = time_call(lambda: client.get("/health"), max(repeat, 20))
+
+    for sid in sessions:
+        client.delete(f"/api/session/{sid}")
+
+    return results
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare medians against a baseline
+
+    Args:
+        results: Current benchmark results
+        baseline: Baseline benchmark results
+        threshold: Relative slowdown that counts as a regression (0.2 = 20%)
+
+    Returns:
+        List of per-benchmark comparison rows, sorted by change
+    """
+    rows = []
+    for key, current in results.items():
+        if 'median' not in current or 'median' not in baseline.get(key, {}):
+            continue
+        before = baseline[key]['median']
+        after = current['median']
+        change = (after - before) / before if before > 0 else 0.0
+        rows.append({
+            'benchmark': key,
+            'baseline': before,
+            'current': after,
+            'change': change,
+            'regression': change > threshold
+        })
+    rows.sort(key=lambda r: r['change'], reverse=True)
+    return rows
+
+
+def print_report(rows: List[Dict], threshold: float):
+    """Print a baseline comparison table"""
+    print(f"\n{'benchmark':<60} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['benchmark']:<60} {row['baseline']:>10.4f} {row['current']:>10.4f} "
+              f"{row['change'] * 100:>7.1f}%{flag}")
+    regressions = sum(1 for r in rows if r['regression'])
+    print(f"\n{regressions} regression(s) above {threshold * 100:.0f}%")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis engine and API")
+    parser.add_argument("--suite", action="append", choices=SUITES,
+                        help="Suite to run (repeatable, default: all)")
+    parser.add_argument("--fixture", action="append", choices=list(FIXTURES),
+                        help="Fixture to use (repeatable, default: all)")
+    parser.add_argument("--quick", action="store_true", help="Skip the 10 minute fixture")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write results to the baseline file as well")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as regression")
+    args = parser.parse_args(argv)
+
+    suites = args.suite or SUITES
+    fixtures = args.fixture or (QUICK_FIXTURES if args.quick else list(FIXTURES))
+
+    results = {}
+    if "extractors" in suites:
+        results.update(bench_extractors(fixtures, args.repeat))
+    if "analyze" in suites:
+        results.update(bench_analyze(fixtures, args.repeat))
+    if "comparators" in suites:
+        results.update(bench_comparators(args.repeat))
+    if "endpoints" in suites:
+        results.update(bench_endpoints(args.repeat))
+    if "report" in suites:
+        results.update(bench_report(args.repeat))
+    if "aggregation" in suites:
+        results.update(bench_aggregation(fixtures, args.repeat))
+    if "decode" in suites:
+        results.update(bench_decode(fixtures, args.repeat))
+    if "resampling" in suites:
+        results.update(bench_resampling(fixtures, args.repeat))
+    if "stft" in suites:
+        results.update(bench_stft(fixtures, args.repeat))
+    if "startup" in suites:
+        from .startup import run as bench_startup
+        print("  [startup] import main, first analysis, /health, warm-up")
+        results.update(bench_startup())
+    if "db" in suites:
+        from .db_concurrency import run as bench_db
+        results.update(bench_db())
+    if "serialization" in suites:
+        from .serialization import run as bench_serialization
+        results.update(bench_serialization())
+
+    document = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'suites': suites,
+            'fixtures': fixtures,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    args.output.write_text(json.dumps(document, indent=2))
+    print(f"\nResults written to {args.output}")
+
+    exit_code = 0
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())['results']
+        rows = compare_to_baseline(results, baseline, args.threshold)
+        print_report(rows, args.threshold)
+        exit_code = 1 if any(r['regression'] for r in rows) else 0
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2))
+        print(f"Baseline written to {args.baseline}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
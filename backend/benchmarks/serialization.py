@@ -0,0 +1,87 @@
+"""
+Response serialization benchmark
+Times encoding of a 30-track, 30-parameter batch comparison response:
+FastAPI's default path (jsonable_encoder + JSONResponse) against
+NumpyJSONResponse (orjson, numpy-native, no encoder walk)
+
+Usage (from backend/):
+    python -m benchmarks.serialization
+    python -m benchmarks.run --suite serialization
+"""
+
+import json
+from typing import Dict
+
+import numpy as np
+
+from .fixtures import fake_track_features
+
+TRACKS = 30
+
+
+def batch_payload(tracks: int = TRACKS) -> Dict:
+    """
+    Build a compare/batch response shaped like the real endpoint
+
+    Values are numpy scalars, as they come out of the analysis code.
+    """
+    from core.feature_matrix import FeatureMatrix
+    from core.playlist_comparator import PlaylistComparator
+    from .run import UI_PARAMS
+
+    params = ['bpm', 'energy'] + UI_PARAMS
+    playlist = fake_track_features(tracks, params, seed=1)
+    user_tracks = [
+        {key: np.float64(value) if isinstance(value, float) else value for key, value in track.items()}
+        for track in fake_track_features(tracks, params, seed=2)
+    ]
+
+    comparator = PlaylistComparator(playlist)
+    matrix = FeatureMatrix.from_tracks(user_tracks)
+    recommendations = []
+    for track, comparison in zip(user_tracks, comparator.compare_tracks(matrix)):
+        for item in comparison:
+            if 'score' in item:
+                item['score'] = np.float64(item['score'])
+        recommendations.append({
+            "filename": track["filename"],
+            "features": track,
+            "comparison": comparison,
+            "recommendations": comparator.generate_recommendations(comparison)
+        })
+
+    profile = {
+        param: {stat: np.float64(value) for stat, value in stats.items()}
+        for param, stats in comparator.get_playlist_profile().items()
+    }
+    return {"tracks_compared": len(recommendations), "profile": profile, "recommendations": recommendations}
+
+
+def run(repeat: int = 50) -> Dict:
+    """Time both serialization paths in the benchmark result format"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from responses import NumpyJSONResponse
+    from .run import time_call
+
+    payload = batch_payload()
+    print(f"  [serialization] {TRACKS} tracks x {len(payload['profile'])} params batch response")
+
+    def default_path():
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def numpy_path():
+        return NumpyJSONResponse(payload).body
+
+    # Same document either way
+    assert json.loads(default_path()) == json.loads(numpy_path())
+
+    size = len(numpy_path())
+    return {
+        'serialization/batch_30/jsonable_encoder': dict(time_call(default_path, repeat), bytes=size),
+        'serialization/batch_30/numpy_json': dict(time_call(numpy_path, repeat), bytes=size),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
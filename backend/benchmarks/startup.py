@@ -0,0 +1,130 @@
+"""
+Worker startup benchmark
+Measures import time of the API module, time until a fresh uvicorn worker
+answers /health, time until the background warm-up has finished, and the
+first-analysis latency of a fresh process with and without warm-up
+
+Usage (from backend/):
+    python -m benchmarks.startup
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Runs in a fresh interpreter: optional warm-up, then two full analyses of the same file
+_FIRST_ANALYSIS_SCRIPT = """
+import json, sys, time
+from core import warmup
+warmup.configure_numba_cache()
+from core.audio_processor import AudioProcessor
+if sys.argv[2] == "1":
+    warmup.warm_up()
+processor = AudioProcessor()
+times = []
+for _ in range(2):
+    start = time.perf_counter()
+    processor.analyze_file(sys.argv[1], fast_mode=False)
+    times.append(time.perf_counter() - start)
+print(json.dumps(times))
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(runs: int = 3) -> Dict:
+    """Time `import main` in fresh interpreters (no warm-up thread is started)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return {'median': sorted(times)[len(times) // 2], 'min': min(times), 'runs': runs}
+
+
+def measure_worker(timeout: float = 120.0) -> Dict:
+    """
+    Launch a uvicorn worker and poll /health
+
+    Returns:
+        Seconds until the first successful /health and until warm-up reported done
+    """
+    port = _free_port()
+    env = dict(os.environ, LOG_LEVEL="WARNING")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    healthy_at = None
+    warm_at = None
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    body = json.loads(response.read())
+                now = time.perf_counter() - start
+                if healthy_at is None:
+                    healthy_at = now
+                if body.get("warmup") in ("done", "failed"):
+                    warm_at = now
+                    break
+            except OSError:
+                pass
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    return {'health_seconds': healthy_at, 'warm_seconds': warm_at}
+
+
+def measure_first_analysis(fixture: str = "30s_stereo") -> Dict:
+    """
+    Time the first and second full analysis in fresh processes
+
+    Returns:
+        Seconds for the first analysis without warm-up ('first_analysis_cold'),
+        the first analysis after warm-up ('first_analysis_warmed') and a
+        steady-state analysis ('steady_analysis')
+    """
+    from .fixtures import fixture_path
+
+    path = str(fixture_path(fixture))
+    timings = {}
+    for warm in ("0", "1"):
+        output = subprocess.run([sys.executable, "-c", _FIRST_ANALYSIS_SCRIPT, path, warm], cwd=BACKEND_DIR,
+                                check=True, capture_output=True, text=True).stdout
+        first, second = json.loads(output.strip().splitlines()[-1])
+        timings["first_analysis_warmed" if warm == "1" else "first_analysis_cold"] = first
+        timings["steady_analysis"] = min(second, timings.get("steady_analysis", second))
+    return timings
+
+
+def run() -> Dict:
+    """Run all startup measurements in the benchmark result format"""
+    results = {'startup/import_main': measure_import()}
+    for key, value in measure_first_analysis().items():
+        results[f"startup/{key}"] = {'median': value, 'min': value, 'runs': 1}
+    worker = measure_worker()
+    for key, value in worker.items():
+        if value is not None:
+            results[f"startup/{key}"] = {'median': value, 'min': value, 'runs': 1}
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
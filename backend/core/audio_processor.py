@@ -3,28 +3,188 @@ Core audio analysis engine using librosa
 Extracts key features from audio files
 """
 
+import functools
 import librosa
+import logging
 import numpy as np
+import os
 import pyloudnorm as pyln
-from typing import Dict, List, Optional
+import scipy.fft
+import scipy.signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
 import warnings
+from .instrumentation import Timings, NULL_TIMINGS, metrics
+from .curves import CurveRecorder, NULL_CURVES
+from .section_comparator import SectionProfile
+from .decode_cache import DecodeCache
+from .decoders import Decoders, default_decoders
+from . import resampling as resamplers
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+# Hop length of librosa's frame-based features (stft, rms, zero_crossing_rate defaults)
+FRAME_HOP = 512
+# FFT size of librosa.stft and melspectrogram defaults
+STFT_SIZE = 2048
+# Frames per FFT call in stft_magnitude (the block stays in cache)
+STFT_BLOCK = 256
+# Short-term loudness below this is treated as silence
+SILENCE_LUFS = -70.0
+# 'bars' aggregation groups beats assuming 4/4
+BEATS_PER_BAR = 4
+# Block size of the RMS scan that picks the preview excerpt
+PREVIEW_SCAN_HOP = 4096
+
+
+def stft_magnitude(y: np.ndarray) -> np.ndarray:
+    """
+    Magnitude STFT, same framing as librosa.stft (centered, zero-padded, Hann window,
+    STFT_SIZE / FRAME_HOP)
+
+    Frames are transformed STFT_BLOCK at a time and their magnitudes written straight
+    into the float32 output, so no complex spectrogram is allocated. About twice as fast
+    as np.abs(librosa.stft(y)), with the same values to float32 rounding.
+
+    Args:
+        y: Mono signal
+
+    Returns:
+        (STFT_SIZE // 2 + 1, frames) array
+    """
+    count = 1 + len(y) // FRAME_HOP
+    window = scipy.signal.get_window('hann', STFT_SIZE, fftbins=True).astype(np.float32)
+    padded = np.pad(np.asarray(y, dtype=np.float32), STFT_SIZE // 2)
+    frames = librosa.util.frame(padded, frame_length=STFT_SIZE, hop_length=FRAME_HOP, axis=0)
+    magnitudes = np.empty((count, STFT_SIZE // 2 + 1), dtype=np.float32)
+    for block in range(0, count, STFT_BLOCK):
+        np.abs(scipy.fft.rfft(frames[block:block + STFT_BLOCK] * window, axis=1),
+               out=magnitudes[block:block + STFT_BLOCK])
+    return magnitudes.T
+
+
+@functools.lru_cache(maxsize=None)
+def k_weighting(sr: int) -> np.ndarray:
+    """
+    BS.1770 K-weighting filter as second-order sections
+
+    The two RBJ-cookbook biquads pyloudnorm's 'K-weighting' meter applies before gating:
+    a +4 dB high shelf at 1500 Hz (Q 1/sqrt(2)) and a high-pass at 38 Hz (Q 0.5).
+
+    Args:
+        sr: Sample rate
+
+    Returns:
+        (2, 6) sos array for scipy.signal.sosfilt
+    """
+    gain = 10 ** (4.0 / 40.0)
+    w0 = 2.0 * np.pi * 1500.0 / sr
+    alpha = np.sin(w0) / (2.0 * (1.0 / np.sqrt(2.0)))
+    cos, root = np.cos(w0), 2.0 * np.sqrt(gain) * alpha
+    shelf = [
+        gain * ((gain + 1) + (gain - 1) * cos + root),
+        -2.0 * gain * ((gain - 1) + (gain + 1) * cos),
+        gain * ((gain + 1) + (gain - 1) * cos - root),
+        (gain + 1) - (gain - 1) * cos + root,
+        2.0 * ((gain - 1) - (gain + 1) * cos),
+        (gain + 1) - (gain - 1) * cos - root
+    ]
+
+    w0 = 2.0 * np.pi * 38.0 / sr
+    alpha = np.sin(w0) / (2.0 * 0.5)
+    cos = np.cos(w0)
+    high_pass = [(1 + cos) / 2, -(1 + cos), (1 + cos) / 2, 1 + alpha, -2.0 * cos, 1 - alpha]
+
+    sos = np.array([shelf, high_pass])
+    return sos / sos[:, 3:4]
+
+
+def pool_frames(frames: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """
+    Mean of frame features between consecutive boundaries
+
+    Same result as librosa.util.sync(frames, bounds, pad=False) with the default
+    mean aggregation, in a single reduceat instead of a loop over segments.
+
+    Args:
+        frames: Features (n, frames)
+        bounds: Increasing frame indices, including 0 and frames.shape[1] to cover everything
+
+    Returns:
+        (n, len(bounds) - 1) array
+    """
+    bounds = np.asarray(bounds, dtype=np.intp)
+    return np.add.reduceat(frames, bounds[:-1], axis=1) / np.diff(bounds)
+
 
 class AudioProcessor:
     """Process audio files and extract features"""
 
-    def __init__(self, sr: int = 11025):
+    # Parameters that need the stereo signal
+    STEREO_PARAMS = ('stereo_width',)
+
+    # Parameters whose extractors read the shared mel spectrogram (onsets, beats, MFCCs) or
+    # chromagram; analyze_batch projects every signal's spectrum onto those filterbanks at once
+    MEL_PARAMS = ('bpm', 'danceability', 'beat_strength', 'harmonic_complexity', 'rhythmic_density',
+                  'repetition_score', 'timbral_diversity', 'call_response_presence')
+    CHROMA_PARAMS = ('key_confidence', 'harmonic_complexity', 'repetition_score')
+
+    # Every parameter _extract_param knows, in full-mode extraction order
+    # (valence reads bpm/spectral_centroid/energy/key, so it comes after them).
+    # Changing what an extractor returns: bump results_store.FEATURE_VERSION
+    ALL_PARAMS = (
+        'bpm', 'energy', 'loudness', 'spectral_centroid', 'rms', 'zero_crossing_rate',
+        'dynamic_range', 'spectral_rolloff', 'spectral_flatness',
+        'low_energy', 'mid_energy', 'high_energy', 'key_confidence',
+        'danceability', 'beat_strength', 'sub_bass_presence', 'stereo_width', 'valence',
+        'loudness_range', 'true_peak', 'crest_factor', 'spectral_contrast',
+        'transient_energy', 'harmonic_to_noise_ratio',
+        'harmonic_complexity', 'melodic_range', 'rhythmic_density', 'arrangement_density',
+        'repetition_score', 'frequency_occupancy', 'timbral_diversity',
+        'vocal_instrumental_ratio', 'energy_curve', 'call_response_presence'
+    )
+
+    # How frame-level chroma/MFCC are pooled before the structure extractors
+    # (harmonic_complexity, repetition_score, timbral_diversity) use them
+    AGGREGATIONS = ('frames', 'beats', 'bars')
+
+    def __init__(self, sr: int = 11025, aggregation: str = 'frames', decode_cache: Optional[DecodeCache] = None,
+                 decoders: Optional[Decoders] = None, resampling: str = resamplers.DEFAULT):
         """
         Initialize audio processor
 
         Args:
             sr: Sample rate for audio loading (lowered to 11025 for faster processing on free tier)
-        """
+            aggregation: 'frames' (raw STFT frames), 'beats' or 'bars' (mean per beat/bar on the
+                beat_track grid; 20-50x smaller matrices, values differ from 'frames')
+            decode_cache: Optional cache of decoded signals, used for files analyzed with a cache_key
+            decoders: Decoder backends (default: AUDIO_DECODERS order, see core.decoders)
+            resampling: Strategy from core.resampling, or 'auto' to pick the fastest one whose
+                recorded error is within tolerance for the selected parameters
+        """
+        if aggregation not in self.AGGREGATIONS:
+            raise ValueError(f"aggregation must be one of {self.AGGREGATIONS}, got {aggregation!r}")
+        if resampling not in resamplers.STRATEGIES + ('auto',):
+            raise ValueError(f"resampling must be 'auto' or one of {resamplers.STRATEGIES}, got {resampling!r}")
         self.sr = sr
+        self.aggregation = aggregation
+        self.decode_cache = decode_cache
+        self.decoders = decoders or default_decoders()
+        self.resampling = resampling
         self.meter = pyln.Meter(sr)
+        # Per-thread analysis scope: current signal, shared intermediates, timings, curves
+        self._local = threading.local()
+        # Mel filterbanks per sample rate
+        self._mel_bases: Dict[int, np.ndarray] = {}
 
-    def analyze_file(self, file_path: str, fast_mode: bool = True, additional_params: list = None) -> Optional[Dict]:
+    def analyze_file(self, file_path: str, fast_mode: bool = True, additional_params: list = None,
+                     timings: Optional[Timings] = None,
+                     curves: Optional[CurveRecorder] = None,
+                     preview_seconds: Optional[float] = None,
+                     cache_key: Optional[str] = None) -> Optional[Dict]:
         """
         Analyze single audio file and extract features
 
@@ -32,107 +192,545 @@ class AudioProcessor:
             file_path: Path to audio file
             fast_mode: If True, extract only essential features (optimized for free tier)
             additional_params: List of additional parameters to extract beyond essential ones
+            timings: Optional recorder for per-stage wall/CPU time and peak allocation
+            curves: Optional recorder for the time-series curves the extractors compute anyway
+            preview_seconds: If set, analyze only the highest-energy excerpt of this length.
+                The result carries features['preview'] = {'start', 'end'} (seconds) and is
+                approximate; with a cache_key the full analysis later reuses the decoded signal.
+            cache_key: Key of this file in the decode cache (see DecodeCache.key)
 
         Returns:
             Dictionary of audio features or None if error
         """
-        print(f"DEBUG audio_processor: fast_mode={fast_mode}, additional_params={additional_params}")
+        timings = timings or Timings()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("analysis.start", extra={
+                'file': os.path.basename(file_path),
+                'fast_mode': fast_mode,
+                'param_count': len(additional_params or [])
+            })
         try:
+            resampling = self.resampling_for(additional_params if fast_mode else self.ALL_PARAMS)
             # Load audio (mono only for speed initially)
-            y, sr = librosa.load(file_path, sr=self.sr, mono=True)
+            y, sr = self._load(file_path, True, timings, cache_key, resampling)
             y_stereo = None
+            excerpt = None
+            if preview_seconds is not None:
+                with timings.measure('extractor', 'preview_scan'):
+                    excerpt = self.select_excerpt(y, sr, preview_seconds)
+                y = y[excerpt]
 
             if fast_mode:
                 # USER SELECTED MODE: Extract ONLY the parameters user selected
                 if additional_params and len(additional_params) > 0:
-                    print(f"DEBUG: Extracting ONLY user-selected parameters: {additional_params}")
-                    features = {}
-
                     # Check if stereo is needed
-                    stereo_params = ['stereo_width']
-                    needs_stereo = any(p in additional_params for p in stereo_params)
+                    needs_stereo = any(p in additional_params for p in self.STEREO_PARAMS)
 
                     if needs_stereo and y_stereo is None:
-                        y_stereo, sr = librosa.load(file_path, sr=self.sr, mono=False)
+                        y_stereo, sr = self._load(file_path, False, timings, cache_key, resampling)
                         if y_stereo.ndim == 1:
                             y_stereo = np.array([y, y])
+                        elif excerpt is not None:
+                            y_stereo = y_stereo[:, excerpt]
 
                     # Extract ONLY the selected parameters
-                    for param in additional_params:
-                        features.update(self._extract_param(param, y, sr, y_stereo, features))
-
+                    features = self.analyze_signal(y, sr, additional_params, y_stereo, timings, curves)
+                    if excerpt is not None:
+                        features['preview'] = {'start': round(excerpt.start / sr, 2),
+                                               'end': round(excerpt.stop / sr, 2)}
                     return features
                 else:
                     # No parameters selected - return error message
-                    print(f"DEBUG: No parameters selected by user")
+                    logger.debug("analysis.no_params")
                     return None
 
             # FULL MODE: All features (slower, for local use)
             # Load stereo for advanced analysis
-            y_stereo, sr = librosa.load(file_path, sr=self.sr, mono=False)
+            y_stereo, sr = self._load(file_path, False, timings, cache_key, resampling)
             if y_stereo.ndim > 1:
+                if excerpt is not None:
+                    y_stereo = y_stereo[:, excerpt]
                 y = librosa.to_mono(y_stereo)
             else:
                 y_stereo = np.array([y, y])
 
-            # Extract basic features
-            features = {
-                'bpm': self.extract_bpm(y, sr),
-                'energy': self.extract_energy(y),
-                'loudness': self.extract_loudness(y),
-                'spectral_centroid': self.extract_spectral_centroid(y, sr),
-                'rms': self.extract_rms(y),
-                'zero_crossing_rate': self.extract_zcr(y),
-            }
+            features = self.analyze_signal(y, sr, self.ALL_PARAMS, y_stereo, timings, curves)
+            if excerpt is not None:
+                features['preview'] = {'start': round(excerpt.start / sr, 2), 'end': round(excerpt.stop / sr, 2)}
+            return features
+
+        except Exception as e:
+            logger.warning("analysis.failed", extra={'file': os.path.basename(file_path), 'error': str(e)})
+            return None
+        finally:
+            timings.close()
+            metrics.observe_timings(timings)
+            if debug:
+                logger.debug("analysis.done", extra={
+                    'file': os.path.basename(file_path),
+                    'stage_ms': timings.totals()
+                })
+
+    def resampling_for(self, params: Optional[list]) -> str:
+        """Resampling strategy for a parameter selection (None: not a feature selection)"""
+        if self.resampling != 'auto':
+            return self.resampling
+        return resamplers.strategy_for(params)
+
+    def _load(self, file_path: str, mono: bool, timings: Timings, cache_key: Optional[str] = None,
+              resampling: str = resamplers.DEFAULT):
+        """
+        Decode a file at the processor's sample rate, through the decode cache if keyed
 
-            # Extract new advanced features (Tier 1)
-            features['dynamic_range'] = self.extract_dynamic_range(y)
-            features['spectral_rolloff'] = self.extract_spectral_rolloff(y, sr)
-            features['spectral_flatness'] = self.extract_spectral_flatness(y, sr)
+        Args:
+            file_path: Path to audio file
+            mono: Downmix to mono
+            timings: Recorder for the decode stage
+            cache_key: Key of the file in the decode cache
+            resampling: Resampling strategy
 
-            # Energy distribution
-            energy_dist = self.extract_energy_distribution(y, sr)
-            features['low_energy'] = energy_dist['low']
-            features['mid_energy'] = energy_dist['mid']
-            features['high_energy'] = energy_dist['high']
+        Returns:
+            (signal, sample rate); cached signals are read-only memory maps
+        """
+        channels = 'mono' if mono else 'stereo'
+        cache = self.decode_cache if cache_key else None
+        if cache is not None:
+            with timings.measure('decode', f'load_{channels}_cached'):
+                y = cache.get(cache_key, self.sr, mono, resampling)
+            if y is not None:
+                return y, self.sr
 
-            # Key detection
-            key_data = self.extract_key(y, sr)
-            features['key'] = key_data['key']
-            features['key_confidence'] = key_data['confidence']
-
-            # Extract Tier 2 features
-            features['danceability'] = self.extract_danceability(y, sr, features['bpm'])
-            features['beat_strength'] = self.extract_beat_strength(y, sr)
-            features['sub_bass_presence'] = self.extract_sub_bass_presence(y, sr)
-            features['stereo_width'] = self.extract_stereo_width(y_stereo)
-            features['valence'] = self.extract_valence(y, sr, features)
-
-            # Extract Tier 3 features (Production-critical)
-            features['loudness_range'] = self.extract_loudness_range(y)
-            features['true_peak'] = self.extract_true_peak(y)
-            features['crest_factor'] = self.extract_crest_factor(y)
-            features['spectral_contrast'] = self.extract_spectral_contrast(y, sr)
-            features['transient_energy'] = self.extract_transient_energy(y, sr)
-            features['harmonic_to_noise_ratio'] = self.extract_harmonic_to_noise_ratio(y, sr)
-
-            # Extract Tier 4 features (Composition & Arrangement)
-            features['harmonic_complexity'] = self.extract_harmonic_complexity(y, sr)
-            features['melodic_range'] = self.extract_melodic_range(y, sr)
-            features['rhythmic_density'] = self.extract_rhythmic_density(y, sr)
-            features['arrangement_density'] = self.extract_arrangement_density(y, sr)
-            features['repetition_score'] = self.extract_repetition_score(y, sr)
-            features['frequency_occupancy'] = self.extract_frequency_occupancy(y, sr)
-            features['timbral_diversity'] = self.extract_timbral_diversity(y, sr)
-            features['vocal_instrumental_ratio'] = self.extract_vocal_instrumental_ratio(y, sr)
-            features['energy_curve'] = self.extract_energy_curve(y, sr)
-            features['call_response_presence'] = self.extract_call_response(y, sr)
+        with timings.measure('decode', f'load_{channels}'):
+            y, backend = self.decoders.decode(file_path, self.sr, mono, resampling)
+        metrics.inc("decode_backend_total", 1, "Files decoded per backend", labels={'backend': backend})
+        if cache is not None:
+            cache.put(cache_key, self.sr, mono, resampling, y)
+        return y, self.sr
 
-            return features
+    def select_excerpt(self, y: np.ndarray, sr: int, seconds: float) -> slice:
+        """
+        Highest-energy window of a signal, found by a coarse RMS scan
+
+        Args:
+            y: Mono audio time series
+            sr: Sample rate
+            seconds: Window length
+
+        Returns:
+            Sample slice of the window (the whole signal if it is shorter)
+        """
+        length = int(seconds * sr)
+        blocks = len(y) // PREVIEW_SCAN_HOP
+        window = max(1, length // PREVIEW_SCAN_HOP)
+        if len(y) <= length or blocks <= window:
+            return slice(0, len(y))
+        scan = y[:blocks * PREVIEW_SCAN_HOP].reshape(blocks, PREVIEW_SCAN_HOP)
+        power = np.einsum('ij,ij->i', scan, scan)
+        energy = np.cumsum(power, dtype=np.float64)
+        # Energy of every window of `window` blocks
+        totals = energy[window - 1:] - np.concatenate(([0.0], energy[:-window]))
+        start = int(np.argmax(totals)) * PREVIEW_SCAN_HOP
+        return slice(start, min(start + length, len(y)))
+
+    def analyze_signal(self, y: np.ndarray, sr: int, params, y_stereo: np.ndarray = None,
+                       timings: Optional[Timings] = None, curves: Optional[CurveRecorder] = None) -> Dict:
+        """
+        Extract parameters from an already decoded signal
+
+        Args:
+            y: Mono audio time series
+            sr: Sample rate
+            params: Parameter names to extract, in order
+            y_stereo: Stereo audio (2, n) for stereo parameters
+            timings: Optional recorder for per-stage timings
+            curves: Optional recorder for time-series curves
+
+        Returns:
+            Dictionary of audio features
+        """
+        features = {}
+        with self._analysis_scope(y, timings or Timings(), curves):
+            for param in params:
+                features.update(self._extract_param(param, y, sr, y_stereo, features))
+        return features
+
+    def analyze_files(self, file_paths: Sequence[str], params: list,
+                      timings: Optional[Sequence[Timings]] = None,
+                      cache_keys: Optional[Sequence[Optional[str]]] = None) -> List[Optional[Dict]]:
+        """
+        Analyze several files together (e.g. a playlist) with analyze_batch
+
+        Same result per file as analyze_file(fast_mode=True): every file is decoded first,
+        then the batch is analyzed. Callers keep batches small enough to hold all signals.
 
+        Args:
+            file_paths: Paths to audio files
+            params: Parameter names to extract, in order
+            timings: Optional recorder per file
+            cache_keys: Key of each file in the decode cache
+
+        Returns:
+            Dictionary of audio features per file, or the exception that failed the file
+        """
+        timings = list(timings or [Timings() for _ in file_paths])
+        cache_keys = list(cache_keys or [None] * len(file_paths))
+        if not params:
+            return [ValueError("No parameters selected")] * len(file_paths)
+        resampling = self.resampling_for(params)
+        needs_stereo = any(p in params for p in self.STEREO_PARAMS)
+
+        results: List = [None] * len(file_paths)
+        decoded = []
+        for index, file_path in enumerate(file_paths):
+            try:
+                y, sr = self._load(file_path, True, timings[index], cache_keys[index], resampling)
+                y_stereo = None
+                if needs_stereo:
+                    y_stereo, sr = self._load(file_path, False, timings[index], cache_keys[index], resampling)
+                    if y_stereo.ndim == 1:
+                        y_stereo = np.array([y, y])
+                decoded.append((index, y, y_stereo))
+            except Exception as e:
+                logger.warning("analysis.failed", extra={'file': os.path.basename(file_path), 'error': str(e)})
+                results[index] = e
+
+        try:
+            if decoded:
+                indices, signals, stereo = zip(*decoded)
+                try:
+                    batch = self.analyze_batch(signals, self.sr, params, stereo, [timings[i] for i in indices])
+                except Exception as e:
+                    # Retry track by track, so a bad track only fails itself
+                    logger.warning("analysis.batch_failed", extra={'files': len(decoded), 'error': str(e)})
+                    batch = []
+                    for index, y, y_stereo in decoded:
+                        try:
+                            batch.append(self.analyze_signal(y, self.sr, params, y_stereo, timings[index]))
+                        except Exception as e:
+                            logger.warning("analysis.failed", extra={'file': os.path.basename(file_paths[index]),
+                                                                     'error': str(e)})
+                            batch.append(e)
+                for index, features in zip(indices, batch):
+                    results[index] = features
+        finally:
+            for recorder in timings:
+                recorder.close()
+                metrics.observe_timings(recorder)
+        return results
+
+    def analyze_batch(self, signals: Sequence[np.ndarray], sr: int, params,
+                      stereo: Optional[Sequence[Optional[np.ndarray]]] = None,
+                      timings: Optional[Sequence[Timings]] = None) -> List[Dict]:
+        """
+        Extract parameters from several decoded signals
+
+        The filterbank projections the selected parameters need are computed for all
+        signals in one product over their frames side by side: the mel spectrogram
+        (onsets, beats, MFCCs) from the blocked STFTs, and the chroma projection of the
+        constant-Q spectra. Each signal is then analyzed with those intermediates in
+        place; the results equal analyze_signal's up to float32 rounding.
+
+        Not faster than analyze_signal per track on the benchmarks so far (benchmarks.run
+        --suite stft), and the stacked spectra grow with the batch.
+
+        Args:
+            signals: Mono audio time series
+            sr: Sample rate
+            params: Parameter names to extract, in order
+            stereo: Stereo audio (2, n) per signal for stereo parameters
+            timings: Optional recorder per signal
+
+        Returns:
+            Dictionary of audio features per signal
+        """
+        stereo = list(stereo or [None] * len(signals))
+        timings = list(timings or [Timings() for _ in signals])
+        shared: List[Dict] = [{} for _ in signals]
+
+        if any(p in params for p in self.MEL_PARAMS):
+            stacked = self._stacked_spectra(signals, stft_magnitude, timings, 'stft_magnitude', square=True)
+            with self._batch_measure(timings, 'mel_db'):
+                mel = self._split(self._mel_basis(sr).dot(stacked), signals)
+                del stacked
+                for values, power in zip(shared, mel):
+                    values['mel_db'] = librosa.power_to_db(power)
+
+        if any(p in params for p in self.CHROMA_PARAMS):
+            # The constant-Q spectrum librosa.feature.chroma_cqt(y=y, sr=sr) computes first
+            # (tuning estimated per signal: cqt's own default is 0)
+            stacked = self._stacked_spectra(
+                signals, lambda y: np.abs(librosa.cqt(y, sr=sr, hop_length=FRAME_HOP, n_bins=7 * 36,
+                                                      bins_per_octave=36, tuning=None)), timings, 'cqt')
+            with self._batch_measure(timings, 'chroma_cqt'):
+                # Chroma is normalized per frame, so projecting the side-by-side spectra is exact
+                chroma = self._split(librosa.feature.chroma_cqt(C=stacked, sr=sr), signals)
+                del stacked
+                for values, frames in zip(shared, chroma):
+                    values['chroma_cqt'] = frames
+
+        results = []
+        for index, y in enumerate(signals):
+            features = {}
+            with self._analysis_scope(y, timings[index], values=shared[index]):
+                for param in params:
+                    features.update(self._extract_param(param, y, sr, stereo[index], features))
+            # Free this signal's spectrograms before the next one is analyzed
+            shared[index] = None
+            results.append(features)
+        return results
+
+    @staticmethod
+    def _stacked_spectra(signals: Sequence[np.ndarray], spectrum: Callable, timings: Sequence[Timings],
+                         name: str, square: bool = False) -> np.ndarray:
+        """
+        Spectrograms of several signals side by side in one array
+
+        Each spectrogram is freed as soon as it is copied in, so only the stacked array
+        grows with the batch.
+
+        Args:
+            signals: Mono signals
+            spectrum: Maps a signal to its (bins, 1 + len(y) // FRAME_HOP) spectrogram
+            timings: Recorder per signal
+            name: Stage name each spectrogram is recorded under
+            square: Stack the power (squared magnitude) instead of the values
+
+        Returns:
+            (bins, total frames) array
+        """
+        counts = [1 + len(y) // FRAME_HOP for y in signals]
+        stacked = None
+        start = 0
+        for y, count, recorder in zip(signals, counts, timings):
+            with recorder.measure('intermediate', name):
+                values = spectrum(y)
+            if stacked is None:
+                stacked = np.empty((values.shape[0], sum(counts)), dtype=values.dtype)
+            if square:
+                np.square(values, out=stacked[:, start:start + count])
+            else:
+                stacked[:, start:start + count] = values
+            del values
+            start += count
+        return stacked
+
+    @staticmethod
+    def _split(projected: np.ndarray, signals: Sequence[np.ndarray]) -> List[np.ndarray]:
+        """Split a projection of _stacked_spectra back into one (bands, frames) array per signal"""
+        counts = [1 + len(y) // FRAME_HOP for y in signals]
+        return np.split(projected, np.cumsum(counts)[:-1], axis=1)
+
+    @staticmethod
+    @contextmanager
+    def _batch_measure(timings: Sequence[Timings], name: str):
+        """Record a batch-wide intermediate on every signal's recorder, as an equal share of its cost"""
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            share = 1000 / max(1, len(timings))
+            wall = (time.perf_counter() - wall_start) * share
+            cpu = (time.process_time() - cpu_start) * share
+            for recorder in timings:
+                recorder.entries.append({'stage': 'intermediate', 'name': name, 'wall_ms': round(wall, 3),
+                                         'cpu_ms': round(cpu, 3), 'batch': len(timings)})
+
+    def analyze_sections(self, file_path: str, timings: Optional[Timings] = None,
+                         cache_key: Optional[str] = None) -> Optional[SectionProfile]:
+        """
+        Decode a file and extract its beat-synchronous section profile
+
+        Args:
+            file_path: Path to audio file
+            timings: Optional recorder for per-stage timings
+            cache_key: Key of this file in the decode cache
+
+        Returns:
+            SectionProfile or None if error
+        """
+        timings = timings or Timings()
+        try:
+            y, sr = self._load(file_path, True, timings, cache_key, self.resampling_for(None))
+            with self._analysis_scope(y, timings):
+                with timings.measure('extractor', 'sections'):
+                    return self.extract_section_profile(y, sr)
         except Exception as e:
-            print(f"Error analyzing {file_path}: {e}")
+            logger.warning("analysis.failed", extra={'file': os.path.basename(file_path), 'error': str(e)})
             return None
+        finally:
+            timings.close()
+            metrics.observe_timings(timings)
+
+    def get_duration(self, file_path: str) -> Optional[float]:
+        """
+        Read the duration of an audio file from its header (no full decode)
+
+        Args:
+            file_path: Path to audio file
+
+        Returns:
+            Duration in seconds or None if it cannot be determined
+        """
+        try:
+            return float(librosa.get_duration(path=file_path))
+        except Exception:
+            return None
+
+    # ==================== SHARED INTERMEDIATES ====================
+
+    @contextmanager
+    def _analysis_scope(self, y: np.ndarray, timings: Timings, curves: Optional[CurveRecorder] = None,
+                        values: Optional[Dict] = None):
+        """
+        Activate intermediate sharing and timing for one signal
+
+        Args:
+            y: Audio time series being analyzed
+            timings: Recorder for this analysis
+            curves: Optional recorder for time-series curves
+            values: Intermediates already computed for this signal (analyze_batch)
+        """
+        state = self._local
+        state.signal, state.values, state.timings, state.curves = y, dict(values or {}), timings, curves
+        try:
+            yield
+        finally:
+            # Drop references so large spectrograms are freed right after the analysis
+            state.signal = state.values = state.timings = state.curves = None
+
+    def _timings(self):
+        """Return the recorder of the active analysis scope (no-op outside a scope)"""
+        return getattr(self._local, 'timings', None) or NULL_TIMINGS
+
+    def _curves(self):
+        """Return the curve recorder of the active analysis scope (no-op if curves were not requested)"""
+        return getattr(self._local, 'curves', None) or NULL_CURVES
+
+    def _shared(self, name: str, y: np.ndarray, compute: Callable):
+        """
+        Return an intermediate computed at most once per analyzed signal
+
+        Outside an analysis scope (or for another signal) the value is computed directly.
+
+        Args:
+            name: Intermediate name
+            y: Audio time series the intermediate belongs to
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        state = self._local
+        values = getattr(state, 'values', None)
+        if values is None or state.signal is not y:
+            return compute()
+        if name not in values:
+            with state.timings.measure('intermediate', name):
+                values[name] = compute()
+        return values[name]
+
+    def _stft_magnitude(self, y: np.ndarray) -> np.ndarray:
+        """Magnitude STFT (librosa defaults), shared by spectral and band-energy extractors"""
+        return self._shared('stft_magnitude', y, lambda: stft_magnitude(y))
+
+    def _mel_db(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """
+        Log-power mel spectrogram from the shared STFT
+
+        librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=sr)) up to float32 rounding,
+        which onset_strength, beat_track and mfcc would otherwise each recompute from the signal.
+        """
+        return self._shared('mel_db', y, lambda: librosa.power_to_db(
+            self._mel_basis(sr).dot(np.square(self._stft_magnitude(y)))))
+
+    def _mel_basis(self, sr: int) -> np.ndarray:
+        """Mel filterbank for the default STFT (128 bands, n_fft 2048), built once per sample rate"""
+        if sr not in self._mel_bases:
+            self._mel_bases[sr] = librosa.filters.mel(sr=sr, n_fft=STFT_SIZE)
+        return self._mel_bases[sr]
+
+    def _onset_envelope(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """Onset strength envelope, shared by rhythm extractors"""
+        return self._shared('onset_envelope', y, lambda: librosa.onset.onset_strength(S=self._mel_db(y, sr), sr=sr))
+
+    def _chroma(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """Constant-Q chromagram, shared by key and harmony extractors"""
+        return self._shared('chroma_cqt', y, lambda: librosa.feature.chroma_cqt(y=y, sr=sr))
+
+    def _beat_track(self, y: np.ndarray, sr: int):
+        """Tempo and beat frames from librosa's beat tracker"""
+        # beat_track(y=...) would compute its own median-aggregated onset envelope
+        return self._shared('beat_track', y, lambda: librosa.beat.beat_track(
+            onset_envelope=librosa.onset.onset_strength(S=self._mel_db(y, sr), sr=sr, aggregate=np.median), sr=sr))
+
+    def _mfcc(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """13 MFCCs per frame"""
+        return self._shared('mfcc', y, lambda: librosa.feature.mfcc(S=self._mel_db(y, sr), n_mfcc=13))
+
+    def _pooled(self, name: str, y: np.ndarray, sr: int, frames: np.ndarray) -> np.ndarray:
+        """
+        Frame features averaged per beat or bar, depending on self.aggregation
+
+        Args:
+            name: Intermediate name of the frame features
+            y: Audio time series
+            sr: Sample rate
+            frames: Frame-level features (n, frames) on the default hop
+
+        Returns:
+            (n, beats or bars) array; the frames themselves in 'frames' mode or without a beat grid
+        """
+        if self.aggregation == 'frames':
+            return frames
+
+        def compute():
+            _, beats = self._beat_track(y, sr)
+            if self.aggregation == 'bars':
+                beats = beats[::BEATS_PER_BAR]
+            if len(beats) < 2:
+                return frames
+            bounds = librosa.util.fix_frames(beats, x_min=0, x_max=frames.shape[1])
+            return pool_frames(frames, bounds)
+
+        return self._shared(f'{name}_per_{self.aggregation[:-1]}', y, compute)
+
+    def extract_section_profile(self, y: np.ndarray, sr: int) -> SectionProfile:
+        """
+        Pool chroma, onset strength, brightness and K-weighted power per beat
+        Built on the shared beat, onset, chroma and STFT intermediates
+
+        Args:
+            y: Audio time series
+            sr: Sample rate
+
+        Returns:
+            SectionProfile for SectionComparator
+        """
+        chroma = self._chroma(y, sr)
+        onset_env = self._onset_envelope(y, sr)
+        centroid = librosa.feature.spectral_centroid(S=self._stft_magnitude(y), sr=sr)[0]
+        frames = min(chroma.shape[1], len(onset_env), len(centroid))
+
+        _, beats = self._beat_track(y, sr)
+        if len(beats) < 2:
+            # No usable beat grid: fall back to one-second blocks
+            beats = np.arange(0, frames, max(1, int(round(sr / FRAME_HOP))))
+        bounds = librosa.util.fix_frames(beats, x_min=0, x_max=frames)
+
+        # BS.1770 K-weighting (the same filter as the loudness meter), then mean square per beat
+        weighted = scipy.signal.sosfilt(k_weighting(sr), y.astype(np.float64))
+        samples = np.minimum(librosa.frames_to_samples(bounds, hop_length=FRAME_HOP), len(y))
+        energy = np.add.reduceat(weighted ** 2, samples[:-1])
+        power = energy / np.maximum(np.diff(samples), 1)
+
+        return SectionProfile(
+            times=samples / sr,
+            chroma=pool_frames(chroma[:, :frames], bounds).T,
+            onset=pool_frames(onset_env[np.newaxis, :frames], bounds)[0],
+            centroid=pool_frames(centroid[np.newaxis, :frames], bounds)[0],
+            power=power
+        )
 
     def extract_bpm(self, y: np.ndarray, sr: int) -> float:
         """
@@ -145,8 +743,9 @@ class AudioProcessor:
         Returns:
             BPM value
         """
-        tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-        return float(tempo)
+        tempo, _ = self._beat_track(y, sr)
+        # librosa >= 0.10 returns tempo as a 1-element array
+        return float(np.atleast_1d(tempo)[0])
 
     def extract_energy(self, y: np.ndarray) -> float:
         """
@@ -191,7 +790,8 @@ class AudioProcessor:
         Returns:
             Average spectral centroid in Hz
         """
-        centroid = librosa.feature.spectral_centroid(y=y, sr=sr)
+        centroid = librosa.feature.spectral_centroid(S=self._stft_magnitude(y), sr=sr)
+        self._curves().record('brightness', centroid, FRAME_HOP / sr)
         return float(np.mean(centroid))
 
     def extract_rms(self, y: np.ndarray) -> float:
@@ -205,6 +805,7 @@ class AudioProcessor:
             RMS energy value
         """
         rms = librosa.feature.rms(y=y)
+        self._curves().record('rms', rms, FRAME_HOP / self.sr)
         return float(np.mean(rms))
 
     def extract_zcr(self, y: np.ndarray) -> float:
@@ -218,6 +819,7 @@ class AudioProcessor:
             Average zero crossing rate
         """
         zcr = librosa.feature.zero_crossing_rate(y)
+        self._curves().record('zero_crossing_rate', zcr, FRAME_HOP / self.sr)
         return float(np.mean(zcr))
 
     def calculate_profile(self, features_list: List[Dict]) -> Dict:
@@ -297,7 +899,7 @@ class AudioProcessor:
         Returns:
             Average spectral rolloff in Hz
         """
-        rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr, roll_percent=0.85)
+        rolloff = librosa.feature.spectral_rolloff(S=self._stft_magnitude(y), sr=sr, roll_percent=0.85)
         return float(np.mean(rolloff))
 
     def extract_spectral_flatness(self, y: np.ndarray, sr: int) -> float:
@@ -312,7 +914,7 @@ class AudioProcessor:
         Returns:
             Average spectral flatness (0-1)
         """
-        flatness = librosa.feature.spectral_flatness(y=y)
+        flatness = librosa.feature.spectral_flatness(S=self._stft_magnitude(y))
         return float(np.mean(flatness))
 
     def extract_energy_distribution(self, y: np.ndarray, sr: int) -> Dict:
@@ -327,7 +929,7 @@ class AudioProcessor:
             Dictionary with low, mid, high energy percentages
         """
         # Compute STFT
-        S = np.abs(librosa.stft(y))
+        S = self._stft_magnitude(y)
         freqs = librosa.fft_frequencies(sr=sr)
 
         # Define frequency bands
@@ -363,7 +965,7 @@ class AudioProcessor:
         """
         try:
             # Compute chroma features
-            chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+            chroma = self._chroma(y, sr)
             chroma_mean = np.mean(chroma, axis=1)
 
             # Key names
@@ -408,7 +1010,7 @@ class AudioProcessor:
         """
         try:
             # Beat strength component
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+            onset_env = self._onset_envelope(y, sr)
             beat_strength = float(np.mean(onset_env))
 
             # Tempo component (optimal dance tempo around 120 BPM)
@@ -438,7 +1040,7 @@ class AudioProcessor:
             Beat strength value
         """
         try:
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+            onset_env = self._onset_envelope(y, sr)
             return float(np.mean(onset_env))
         except:
             return 0.0
@@ -456,7 +1058,7 @@ class AudioProcessor:
         """
         try:
             # Compute STFT
-            S = np.abs(librosa.stft(y))
+            S = self._stft_magnitude(y)
             freqs = librosa.fft_frequencies(sr=sr)
 
             # Sub-bass band (20-60 Hz)
@@ -559,14 +1161,18 @@ class AudioProcessor:
             # Compute short-term loudness (3 second window)
             hop_length = self.sr * 3  # 3 second hops
             loudness_values = []
+            segment_loudness = []
 
             for i in range(0, len(y) - hop_length, hop_length):
                 segment = y[i:i + hop_length]
                 if len(segment) > 0:
                     loudness = self.meter.integrated_loudness(segment)
-                    if np.isfinite(loudness) and loudness > -70:  # Ignore silence
+                    segment_loudness.append(loudness if np.isfinite(loudness) else SILENCE_LUFS)
+                    if np.isfinite(loudness) and loudness > SILENCE_LUFS:  # Ignore silence
                         loudness_values.append(loudness)
 
+            self._curves().record('loudness', np.maximum(segment_loudness, SILENCE_LUFS), 3.0)
+
             if len(loudness_values) > 1:
                 # LRA = difference between 95th and 10th percentile
                 lra = np.percentile(loudness_values, 95) - np.percentile(loudness_values, 10)
@@ -638,7 +1244,7 @@ class AudioProcessor:
             Mean spectral contrast (dB)
         """
         try:
-            contrast = librosa.feature.spectral_contrast(y=y, sr=sr)
+            contrast = librosa.feature.spectral_contrast(S=self._stft_magnitude(y), sr=sr)
             # Return mean contrast across all bands
             return float(np.mean(contrast))
         except:
@@ -715,7 +1321,7 @@ class AudioProcessor:
         """
         try:
             # Use chroma features to analyze harmony
-            chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+            chroma = self._pooled('chroma_cqt', y, sr, self._chroma(y, sr))
 
             # Calculate unique pitch class usage
             pitch_class_strength = np.mean(chroma, axis=1)
@@ -782,7 +1388,7 @@ class AudioProcessor:
         """
         try:
             # Detect onsets (rhythmic events)
-            onset_frames = librosa.onset.onset_detect(y=y, sr=sr)
+            onset_frames = librosa.onset.onset_detect(onset_envelope=self._onset_envelope(y, sr), sr=sr)
             duration = librosa.get_duration(y=y, sr=sr)
 
             if duration > 0:
@@ -840,7 +1446,7 @@ class AudioProcessor:
         """
         try:
             # Use chroma features for harmonic repetition
-            chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
+            chroma = self._pooled('chroma_cqt', y, sr, self._chroma(y, sr))
 
             # Calculate self-similarity matrix
             similarity_matrix = np.corrcoef(chroma.T)
@@ -868,7 +1474,7 @@ class AudioProcessor:
         """
         try:
             # Calculate weighted average frequency
-            S = np.abs(librosa.stft(y))
+            S = self._stft_magnitude(y)
             freqs = librosa.fft_frequencies(sr=sr)
 
             # Weight each frequency by its energy
@@ -894,7 +1500,7 @@ class AudioProcessor:
         """
         try:
             # Use MFCC (Mel-frequency cepstral coefficients) for timbre
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+            mfccs = self._pooled('mfcc', y, sr, self._mfcc(y, sr))
 
             # Calculate variance across time for each MFCC
             mfcc_variance = np.var(mfccs, axis=1)
@@ -924,7 +1530,7 @@ class AudioProcessor:
         """
         try:
             # Vocals typically occupy 200-4000 Hz range with specific spectral shape
-            S = np.abs(librosa.stft(y))
+            S = self._stft_magnitude(y)
             freqs = librosa.fft_frequencies(sr=sr)
 
             # Vocal frequency band
@@ -965,6 +1571,9 @@ class AudioProcessor:
                 energy = np.sum(segment**2)
                 energy_segments.append(energy)
 
+            # Mean power per segment (independent of the sample rate)
+            self._curves().record('energy', np.asarray(energy_segments) / hop_length, 4.0)
+
             if len(energy_segments) > 2:
                 # Calculate coefficient of variation
                 energy_curve_var = np.std(energy_segments) / (np.mean(energy_segments) + 1e-6)
@@ -989,7 +1598,7 @@ class AudioProcessor:
         """
         try:
             # Analyze onset patterns for rhythmic call-response
-            onset_env = librosa.onset.onset_strength(y=y, sr=sr)
+            onset_env = self._onset_envelope(y, sr)
 
             # Calculate autocorrelation to find repeating patterns
             onset_autocorr = librosa.autocorrelate(onset_env)
@@ -1017,76 +1626,98 @@ class AudioProcessor:
         features = features or {}
 
         try:
-            # Tier 1
-            if param == 'spectral_rolloff':
-                result[param] = self.extract_spectral_rolloff(y, sr)
-            elif param == 'spectral_flatness':
-                result[param] = self.extract_spectral_flatness(y, sr)
-            elif param == 'zero_crossing_rate':
-                result[param] = self.extract_zcr(y)
-            # Tier 1B
-            elif param in ['low_energy', 'mid_energy', 'high_energy']:
-                energy_dist = self.extract_energy_distribution(y, sr)
-                result[param] = energy_dist[param.split('_')[0]]
-            # Tier 2
-            elif param == 'danceability':
-                bpm = features.get('bpm', self.extract_bpm(y, sr))
-                result[param] = self.extract_danceability(y, sr, bpm)
-            elif param == 'beat_strength':
-                result[param] = self.extract_beat_strength(y, sr)
-            elif param == 'sub_bass_presence':
-                result[param] = self.extract_sub_bass_presence(y, sr)
-            elif param == 'stereo_width':
-                result[param] = self.extract_stereo_width(y_stereo) if y_stereo is not None else 0.0
-            elif param == 'valence':
-                result[param] = self.extract_valence(y, sr, features)
-            elif param == 'key_confidence':
-                key_data = self.extract_key(y, sr)
-                result['key'], result['key_confidence'] = key_data['key'], key_data['confidence']
-            # Tier 3
-            elif param == 'loudness_range':
-                result[param] = self.extract_loudness_range(y)
-            elif param == 'true_peak':
-                result[param] = self.extract_true_peak(y)
-            elif param == 'crest_factor':
-                result[param] = self.extract_crest_factor(y)
-            elif param == 'spectral_contrast':
-                result[param] = self.extract_spectral_contrast(y, sr)
-            elif param == 'transient_energy':
-                result[param] = self.extract_transient_energy(y, sr)
-            elif param == 'harmonic_to_noise_ratio':
-                result[param] = self.extract_harmonic_to_noise_ratio(y, sr)
-            # Tier 4
-            elif param == 'harmonic_complexity':
-                result[param] = self.extract_harmonic_complexity(y, sr)
-            elif param == 'melodic_range':
-                result[param] = self.extract_melodic_range(y, sr)
-            elif param == 'rhythmic_density':
-                result[param] = self.extract_rhythmic_density(y, sr)
-            elif param == 'arrangement_density':
-                result[param] = self.extract_arrangement_density(y, sr)
-            elif param == 'repetition_score':
-                result[param] = self.extract_repetition_score(y, sr)
-            elif param == 'frequency_occupancy':
-                result[param] = self.extract_frequency_occupancy(y, sr)
-            elif param == 'timbral_diversity':
-                result[param] = self.extract_timbral_diversity(y, sr)
-            elif param == 'vocal_instrumental_ratio':
-                result[param] = self.extract_vocal_instrumental_ratio(y, sr)
-            elif param == 'energy_curve':
-                result[param] = self.extract_energy_curve(y, sr)
-            elif param == 'call_response_presence':
-                result[param] = self.extract_call_response(y, sr)
+            with self._timings().measure('extractor', param):
+                result = self._dispatch_param(param, y, sr, y_stereo, features)
         except Exception as e:
-            print(f"Error extracting {param}: {e}")
+            logger.warning("extractor.failed", extra={'param': param, 'error': str(e)})
             result[param] = 0.0
 
         # Validate extracted values - replace NaN/inf with safe defaults
         for key, value in result.items():
             if isinstance(value, (int, float)):
                 if np.isnan(value) or np.isinf(value):
-                    print(f"Warning: {key} returned invalid value ({value}), using 0.0")
+                    logger.warning("extractor.invalid_value", extra={'param': key, 'value': str(value)})
                     result[key] = 0.0
 
         return result
 
+    def _dispatch_param(self, param: str, y: np.ndarray, sr: int, y_stereo: np.ndarray, features: dict) -> dict:
+        """Call the extractor(s) behind a parameter name"""
+        result = {}
+
+        # Core
+        if param == 'bpm':
+            result[param] = self.extract_bpm(y, sr)
+        elif param == 'energy':
+            result[param] = self.extract_energy(y)
+        elif param == 'loudness':
+            result[param] = self.extract_loudness(y)
+        elif param == 'spectral_centroid':
+            result[param] = self.extract_spectral_centroid(y, sr)
+        elif param == 'rms':
+            result[param] = self.extract_rms(y)
+        elif param == 'dynamic_range':
+            result[param] = self.extract_dynamic_range(y)
+        # Tier 1
+        elif param == 'spectral_rolloff':
+            result[param] = self.extract_spectral_rolloff(y, sr)
+        elif param == 'spectral_flatness':
+            result[param] = self.extract_spectral_flatness(y, sr)
+        elif param == 'zero_crossing_rate':
+            result[param] = self.extract_zcr(y)
+        # Tier 1B
+        elif param in ['low_energy', 'mid_energy', 'high_energy']:
+            energy_dist = self.extract_energy_distribution(y, sr)
+            result[param] = energy_dist[param.split('_')[0]]
+        # Tier 2
+        elif param == 'danceability':
+            bpm = features['bpm'] if 'bpm' in features else self.extract_bpm(y, sr)
+            result[param] = self.extract_danceability(y, sr, bpm)
+        elif param == 'beat_strength':
+            result[param] = self.extract_beat_strength(y, sr)
+        elif param == 'sub_bass_presence':
+            result[param] = self.extract_sub_bass_presence(y, sr)
+        elif param == 'stereo_width':
+            result[param] = self.extract_stereo_width(y_stereo) if y_stereo is not None else 0.0
+        elif param == 'valence':
+            result[param] = self.extract_valence(y, sr, features)
+        elif param == 'key_confidence':
+            key_data = self.extract_key(y, sr)
+            result['key'], result['key_confidence'] = key_data['key'], key_data['confidence']
+        # Tier 3
+        elif param == 'loudness_range':
+            result[param] = self.extract_loudness_range(y)
+        elif param == 'true_peak':
+            result[param] = self.extract_true_peak(y)
+        elif param == 'crest_factor':
+            result[param] = self.extract_crest_factor(y)
+        elif param == 'spectral_contrast':
+            result[param] = self.extract_spectral_contrast(y, sr)
+        elif param == 'transient_energy':
+            result[param] = self.extract_transient_energy(y, sr)
+        elif param == 'harmonic_to_noise_ratio':
+            result[param] = self.extract_harmonic_to_noise_ratio(y, sr)
+        # Tier 4
+        elif param == 'harmonic_complexity':
+            result[param] = self.extract_harmonic_complexity(y, sr)
+        elif param == 'melodic_range':
+            result[param] = self.extract_melodic_range(y, sr)
+        elif param == 'rhythmic_density':
+            result[param] = self.extract_rhythmic_density(y, sr)
+        elif param == 'arrangement_density':
+            result[param] = self.extract_arrangement_density(y, sr)
+        elif param == 'repetition_score':
+            result[param] = self.extract_repetition_score(y, sr)
+        elif param == 'frequency_occupancy':
+            result[param] = self.extract_frequency_occupancy(y, sr)
+        elif param == 'timbral_diversity':
+            result[param] = self.extract_timbral_diversity(y, sr)
+        elif param == 'vocal_instrumental_ratio':
+            result[param] = self.extract_vocal_instrumental_ratio(y, sr)
+        elif param == 'energy_curve':
+            result[param] = self.extract_energy_curve(y, sr)
+        elif param == 'call_response_presence':
+            result[param] = self.extract_call_response(y, sr)
+
+        return result
+
@@ -0,0 +1,288 @@
+"""
+Report charts - z-score bars and a radar of a track against the playlist
+Rendered headless (Agg) from a pool of reused figures; results are cached by data hash
+
+Axes, labels and grid are drawn once per layout (parameter set) and kept as a
+background; each chart then only updates and blits its bars or polygons.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+# z-scores are clipped to this range on the bar chart
+Z_LIMIT = 4.0
+# Radar axes show the playlist range (0 = min, 1 = max), clipped to this
+RADAR_LIMIT = 1.5
+# A radar needs at least three axes
+RADAR_MIN_PARAMS = 3
+DPI = 80
+# Charts are a few flat colors plus anti-aliasing: a small palette PNG is ~2.5x smaller
+# than RGB and faster to encode; higher zlib levels cost time for little gain
+PNG_COLORS = 64
+PNG_COMPRESS_LEVEL = 3
+
+BACKGROUND = '#131822'
+FOREGROUND = '#e0e6ff'
+GRID = '#1e293b'
+PLAYLIST_COLOR = '#818cf8'
+TRACK_COLOR = '#f59e0b'
+
+# Same thresholds (in standard deviations) and colors as Comparator / ReportGenerator
+STATUS_BANDS = ((0.5, '#10b981'), (1.0, '#84cc16'), (1.5, '#f59e0b'), (float('inf'), '#ef4444'))
+
+
+def _status_color(z: float) -> str:
+    distance = abs(z)
+    for limit, color in STATUS_BANDS:
+        if distance <= limit:
+            return color
+    return STATUS_BANDS[-1][1]
+
+
+class _PreparedChart:
+    """A figure whose static parts are rendered once and kept as a background"""
+
+    def __init__(self, fig: Figure):
+        self.fig = fig
+        self.canvas = FigureCanvasAgg(fig)
+        self.background = None
+        self.dynamic = []
+
+    def _snapshot(self):
+        """Render everything except the dynamic artists and keep it as the background"""
+        for artist in self.dynamic:
+            artist.set_visible(False)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.dynamic:
+            artist.set_visible(True)
+
+    def png(self) -> bytes:
+        """Blit the dynamic artists onto the background and encode the result"""
+        self.canvas.restore_region(self.background)
+        for artist in self.dynamic:
+            artist.axes.draw_artist(artist)
+        width, height = self.canvas.get_width_height()
+        image = Image.frombuffer('RGBA', (width, height), self.canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+        buffer = io.BytesIO()
+        palette = image.convert('RGB').quantize(PNG_COLORS, method=Image.Quantize.FASTOCTREE)
+        palette.save(buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+        return buffer.getvalue()
+
+
+class _ZScoreChart(_PreparedChart):
+    """Horizontal z-score bars for a fixed list of parameters"""
+
+    def __init__(self, names: Sequence[str]):
+        height = 1.2 + 0.28 * len(names)
+        super().__init__(Figure(figsize=(6, height), dpi=DPI, facecolor=BACKGROUND))
+        # Fixed margins - tight_layout would measure every label
+        self.fig.subplots_adjust(left=0.36, right=0.97, top=1 - 0.2 / height, bottom=0.7 / height)
+        ax = self.fig.add_subplot(111)
+        positions = np.arange(len(names))
+        self.bars = list(ax.barh(positions, np.zeros(len(names)), height=0.7))
+        ax.set_yticks(positions, names, fontsize=8, color=FOREGROUND)
+        ax.invert_yaxis()
+        ax.set_xlim(-Z_LIMIT, Z_LIMIT)
+        for edge in (-1, 1):
+            ax.axvline(edge, color=GRID, linewidth=1, linestyle='--')
+        zero = ax.axvline(0, color=PLAYLIST_COLOR, linewidth=1)
+        ax.set_xlabel('standard deviations from playlist average', fontsize=8, color=FOREGROUND)
+        ax.set_facecolor(BACKGROUND)
+        ax.tick_params(axis='x', colors=FOREGROUND, labelsize=8)
+        for spine in ax.spines.values():
+            spine.set_color(GRID)
+        self.dynamic = self.bars + [zero]
+        self._snapshot()
+
+    def update(self, values: Sequence[float]):
+        for bar, z in zip(self.bars, values):
+            bar.set_width(z)
+            bar.set_color(_status_color(z))
+
+
+class _RadarChart(_PreparedChart):
+    """Track against playlist average on one axis per parameter"""
+
+    def __init__(self, names: Sequence[str]):
+        super().__init__(Figure(figsize=(4.5, 4.5), dpi=DPI, facecolor=BACKGROUND))
+        self.fig.subplots_adjust(left=0.18, right=0.82, top=0.82, bottom=0.18)
+        ax = self.fig.add_subplot(111, projection='polar')
+        self.angles = np.linspace(0, 2 * np.pi, len(names), endpoint=False)
+        self.series = {}
+        for key, color, label in (('playlist', PLAYLIST_COLOR, 'Playlist avg'), ('track', TRACK_COLOR, 'Track')):
+            line, = ax.plot([], [], color=color, linewidth=1.5, label=label)
+            fill, = ax.fill(self.angles, np.zeros(len(names)), color=color, alpha=0.2)
+            self.series[key] = (line, fill)
+        ax.set_xticks(self.angles, names, fontsize=7, color=FOREGROUND)
+        ax.set_ylim(0, RADAR_LIMIT)
+        ax.set_yticks([0.5, 1.0], ['', ''])
+        ax.set_facecolor(BACKGROUND)
+        ax.grid(color=GRID)
+        ax.spines['polar'].set_color(GRID)
+        ax.tick_params(axis='x', pad=8)
+        self.fig.legend(*ax.get_legend_handles_labels(), loc='lower left', fontsize=7,
+                        facecolor=BACKGROUND, edgecolor=GRID, labelcolor=FOREGROUND)
+        self.dynamic = [artist for pair in self.series.values() for artist in pair]
+        self._snapshot()
+
+    def update(self, playlist: Sequence[float], track: Sequence[float]):
+        closed = np.append(self.angles, self.angles[0])
+        for key, values in (('playlist', playlist), ('track', track)):
+            line, fill = self.series[key]
+            radii = np.append(values, values[0])
+            line.set_data(closed, radii)
+            fill.set_xy(np.column_stack([closed, radii]))
+
+
+class FigurePool:
+    """Prepared figures per layout, reused across charts (building one costs far more than drawing it)"""
+
+    def __init__(self, factory: Callable[[Tuple[str, ...]], _PreparedChart],
+                 max_layouts: int = 8, max_idle: int = 2):
+        """
+        Initialize pool
+
+        Args:
+            factory: Builds a prepared chart for a tuple of parameter names
+            max_layouts: Distinct layouts kept (least recently used dropped first)
+            max_idle: Idle figures kept per layout
+        """
+        self.factory = factory
+        self.max_layouts = max_layouts
+        self.max_idle = max_idle
+        self._idle: "OrderedDict[Hashable, List[_PreparedChart]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self, names: Tuple[str, ...]):
+        """Borrow a prepared chart for this layout (built if none is idle)"""
+        with self._lock:
+            idle = self._idle.get(names)
+            chart = idle.pop() if idle else None
+        if chart is None:
+            chart = self.factory(names)
+        try:
+            yield chart
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(names, [])
+                self._idle.move_to_end(names)
+                if len(idle) < self.max_idle:
+                    idle.append(chart)
+                while len(self._idle) > self.max_layouts:
+                    self._idle.popitem(last=False)
+
+
+class ChartRenderer:
+    """Render report charts as PNG data URIs"""
+
+    def __init__(self, cache_size: int = 512):
+        """
+        Initialize renderer
+
+        Args:
+            cache_size: Rendered charts kept in memory (LRU, keyed by data hash)
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pools = {'zscore': FigurePool(_ZScoreChart), 'radar': FigurePool(_RadarChart)}
+
+    def clear(self):
+        """Drop rendered charts (prepared figures are kept)"""
+        with self._lock:
+            self._cache.clear()
+
+    def _cached(self, kind: str, rows: List[Tuple], render: Callable[[_PreparedChart], None]) -> str:
+        key = hashlib.sha1(json.dumps([kind, rows], separators=(',', ':')).encode('utf-8')).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        with self._pools[kind].figure(tuple(row[0] for row in rows)) as chart:
+            render(chart)
+            png = chart.png()
+        uri = 'data:image/png;base64,' + base64.b64encode(png).decode('ascii')
+
+        with self._lock:
+            self._cache[key] = uri
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return uri
+
+    @staticmethod
+    def _series(target_profile: Dict, track_features: Dict) -> List[Tuple[str, float, Dict]]:
+        """Parameters present in both the profile and the track, in profile order"""
+        series = []
+        for param, stats in target_profile.items():
+            value = track_features.get(param)
+            if not isinstance(stats, dict) or not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if not all(isinstance(stats.get(field), (int, float)) for field in ('mean', 'std', 'min', 'max')):
+                continue
+            series.append((param, float(value), stats))
+        return series
+
+    def zscore_chart(self, target_profile: Dict, track_features: Dict,
+                     labels: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Horizontal bars of (track - playlist mean) / playlist std per parameter
+
+        Args:
+            target_profile: Playlist profile ({param: {'mean', 'std', 'min', 'max'}})
+            track_features: Track features
+            labels: Display names per parameter
+
+        Returns:
+            PNG data URI, or None if there is nothing to plot
+        """
+        labels = labels or {}
+        rows = []
+        for param, value, stats in self._series(target_profile, track_features):
+            z = (value - stats['mean']) / stats['std'] if stats['std'] > 0 else 0.0
+            rows.append((labels.get(param, param), round(float(np.clip(z, -Z_LIMIT, Z_LIMIT)), 2)))
+        if not rows:
+            return None
+        return self._cached('zscore', rows, lambda chart: chart.update([z for _, z in rows]))
+
+    def radar_chart(self, target_profile: Dict, track_features: Dict,
+                    labels: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Radar of the track against the playlist average, each axis scaled to the playlist range
+
+        Args:
+            target_profile: Playlist profile
+            track_features: Track features
+            labels: Display names per parameter
+
+        Returns:
+            PNG data URI, or None with fewer than three comparable parameters
+        """
+        labels = labels or {}
+        rows = []
+        for param, value, stats in self._series(target_profile, track_features):
+            span = stats['max'] - stats['min']
+            if span <= 0:
+                continue
+            scale = lambda v: round(float(np.clip((v - stats['min']) / span, 0.0, RADAR_LIMIT)), 3)
+            rows.append((labels.get(param, param), scale(stats['mean']), scale(value)))
+        if len(rows) < RADAR_MIN_PARAMS:
+            return None
+        return self._cached('radar', rows, lambda chart: chart.update([r[1] for r in rows], [r[2] for r in rows]))
+
+
+# Shared by all reports of this worker
+charts = ChartRenderer()
@@ -3,8 +3,9 @@ Comparator - AI Assistant that generates actionable recommendations
 Compares your tracks against target playlist profile
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
+from .feature_matrix import FeatureMatrix
 
 
 class Comparator:
@@ -27,13 +28,14 @@ class Comparator:
             'critical': 2.0   # Beyond 1.5 std
         }
 
-    def compare_track(self, track_features: Dict) -> List[Dict]:
+    def compare_track(self, track_features: Dict, score: Optional[float] = None) -> List[Dict]:
         """
         Compare single track against target profile (DYNAMIC VERSION)
         Only compares parameters that exist in both track and profile
 
         Args:
             track_features: Features of your track
+            score: Precomputed match score (see match_scores); calculated if omitted
 
         Returns:
             List of recommendations with status and messages
@@ -41,7 +43,8 @@ class Comparator:
         recommendations = []
 
         # Calculate overall match score
-        score = self.calculate_match_score(track_features)
+        if score is None:
+            score = self.calculate_match_score(track_features)
         recommendations.append({
             'status': self.get_score_status(score),
             'message': f"Overall match: {score}% compatible with target playlist",
@@ -159,6 +162,39 @@ class Comparator:
 
         return round(np.mean(scores), 1) if scores else 0.0
 
+    def match_scores(self, matrix: FeatureMatrix) -> List[float]:
+        """
+        Calculate match scores for every track of a feature matrix at once
+        Same scoring as calculate_match_score
+
+        Args:
+            matrix: Features of the tracks to score
+
+        Returns:
+            Match score percentage per row
+        """
+        cols, means, stds = [], [], []
+        for param, col in matrix.index.items():
+            profile = self.target_profile.get(param)
+            if not isinstance(profile, dict):
+                continue
+            target_mean, target_std = profile.get('mean'), profile.get('std')
+            if isinstance(target_mean, (int, float)) and isinstance(target_std, (int, float)) and target_std > 0:
+                cols.append(col)
+                means.append(target_mean)
+                stds.append(target_std)
+
+        if not cols or not len(matrix):
+            return [0.0] * len(matrix)
+
+        values = matrix.values[:, cols].astype(np.float64)
+        valid = matrix.mask[:, cols]
+        distance = np.abs(values - np.array(means)) / np.array(stds)
+        scores = np.where(valid, np.maximum(0, 100 - distance * 33.3), 0.0)
+        counts = valid.sum(axis=1)
+        totals = scores.sum(axis=1)
+        return [round(float(total / count), 1) if count else 0.0 for total, count in zip(totals, counts)]
+
     def get_score_status(self, score: float) -> str:
         """Get status based on score"""
         if score >= 80:
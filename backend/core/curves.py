@@ -0,0 +1,111 @@
+"""
+Time-series curves of one analysis (loudness, energy, brightness, ...)
+Extractors hand over the frame-level values they already computed; curves are
+averaged down to a fixed number of segments and delta-encoded for transport
+"""
+
+import base64
+from typing import Dict
+
+import numpy as np
+
+# Segments per curve (a 3-minute track gives ~1.4 s per point)
+CURVE_POINTS = 128
+# Values are quantized to this many steps between the curve's min and max
+CURVE_LEVELS = 4095
+
+
+def downsample(frames: np.ndarray, points: int = CURVE_POINTS) -> np.ndarray:
+    """
+    Average frames into at most `points` equal segments
+
+    Args:
+        frames: Frame-level values (1-D, or (1, n) as returned by librosa.feature)
+        points: Maximum number of segments
+
+    Returns:
+        float64 array of segment means (the frames themselves if there are fewer)
+    """
+    frames = np.asarray(frames, dtype=np.float64).ravel()
+    if len(frames) <= points:
+        return frames
+    bounds = np.linspace(0, len(frames), points + 1).astype(np.intp)
+    return np.add.reduceat(frames, bounds[:-1]) / np.diff(bounds)
+
+
+def encode_curve(values: np.ndarray, seconds: float) -> Dict:
+    """
+    Quantize and delta-encode a curve
+
+    Args:
+        values: Curve values (non-finite values are replaced by the curve minimum)
+        seconds: Duration covered by one point
+
+    Returns:
+        {'seconds', 'min', 'max', 'levels', 'deltas'}; deltas is base64 of little-endian int16
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    low = float(values[finite].min()) if finite.any() else 0.0
+    high = float(values[finite].max()) if finite.any() else 0.0
+    values = np.where(finite, values, low)
+
+    span = high - low
+    levels = np.round((values - low) / span * CURVE_LEVELS) if span > 0 else np.zeros(len(values))
+    deltas = np.diff(levels, prepend=0).astype('<i2')
+    return {
+        'seconds': round(float(seconds), 4),
+        'min': low,
+        'max': high,
+        'levels': CURVE_LEVELS,
+        'deltas': base64.b64encode(deltas.tobytes()).decode('ascii')
+    }
+
+
+def decode_curve(curve: Dict) -> np.ndarray:
+    """Reverse encode_curve (values are exact to (max - min) / levels)"""
+    levels = np.cumsum(np.frombuffer(base64.b64decode(curve['deltas']), dtype='<i2'), dtype=np.int64)
+    return curve['min'] + levels / curve['levels'] * (curve['max'] - curve['min'])
+
+
+class CurveRecorder:
+    """Collect the curves of one analysis"""
+
+    def __init__(self, points: int = CURVE_POINTS):
+        """
+        Initialize recorder
+
+        Args:
+            points: Maximum points per curve
+        """
+        self.points = points
+        self.curves: Dict[str, Dict] = {}
+
+    def record(self, name: str, frames: np.ndarray, frame_seconds: float):
+        """
+        Store a curve from frame-level values
+
+        Args:
+            name: Curve name ('rms', 'brightness', 'loudness', ...)
+            frames: One value per frame or segment, in time order
+            frame_seconds: Hop between consecutive frames in seconds
+        """
+        frames = np.asarray(frames).ravel()
+        if len(frames) < 2:
+            return
+        values = downsample(frames, self.points)
+        self.curves[name] = encode_curve(values, frame_seconds * len(frames) / len(values))
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Encoded curves by name"""
+        return dict(self.curves)
+
+
+class _NullCurves:
+    """No-op recorder used when curves were not requested"""
+
+    def record(self, name: str, frames: np.ndarray, frame_seconds: float):
+        pass
+
+
+NULL_CURVES = _NullCurves()
@@ -0,0 +1,159 @@
+"""
+Decoded audio cache - resampled PCM kept as memory-mapped .npy files
+Buffers live in the session's upload directory (removed with the session) and
+are keyed by content hash, so re-analysis with other parameters, preview
+upgrades and repeated single comparisons skip decoding and resampling
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DecodeCache:
+    """Size-capped LRU of decoded signals on local disk"""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize cache
+
+        Args:
+            max_bytes: Total size of the kept buffers; least recently used files are
+                deleted beyond it (0 disables the cache)
+        """
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(directory: Path, content_hash: str) -> str:
+        """Cache key (path prefix) of a file's buffers in a session directory"""
+        return str(Path(directory) / "decoded" / content_hash)
+
+    @staticmethod
+    def path(key: str, sr: int, mono: bool, resampling: str) -> str:
+        """File holding one decoded variant (sample rate, resampling strategy, mono/stereo) of a key"""
+        return f"{key}.{sr}.{resampling}.{'mono' if mono else 'stereo'}.npy"
+
+    def get(self, key: str, sr: int, mono: bool, resampling: str) -> Optional[np.ndarray]:
+        """
+        Memory-map a kept buffer
+
+        Args:
+            key: Cache key
+            sr: Sample rate
+            mono: Mono or stereo variant
+            resampling: Resampling strategy the buffer was decoded with
+
+        Returns:
+            Read-only array, or None if the buffer is not cached
+        """
+        if self.max_bytes <= 0:
+            return None
+        path = self.path(key, sr, mono, resampling)
+        try:
+            y = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            with self._lock:
+                self._total -= self._sizes.pop(path, 0)
+            metrics.inc("decode_cache_misses_total", 1, "Decodes not served from the decoded audio cache")
+            return None
+        with self._lock:
+            if path in self._sizes:
+                self._sizes.move_to_end(path)
+            else:
+                # Written by another worker or before a restart
+                self._sizes[path] = y.nbytes
+                self._total += y.nbytes
+        metrics.inc("decode_cache_hits_total", 1, "Decodes served from the decoded audio cache")
+        return y
+
+    def put(self, key: str, sr: int, mono: bool, resampling: str, y: np.ndarray):
+        """
+        Keep a decoded buffer, evicting the least recently used ones beyond the size cap
+
+        Args:
+            key: Cache key
+            sr: Sample rate
+            mono: Mono or stereo variant
+            resampling: Resampling strategy the buffer was decoded with
+            y: Decoded signal
+        """
+        if self.max_bytes <= 0 or y.nbytes > self.max_bytes:
+            return
+        path = self.path(key, sr, mono, resampling)
+        # Write then rename so a concurrent reader never maps a partial file
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(partial, 'wb') as handle:
+                np.save(handle, y)
+            os.replace(partial, path)
+        except OSError as e:
+            logger.warning("decode_cache.write_failed", extra={"error": str(e)})
+            return
+
+        with self._lock:
+            self._total += y.nbytes - self._sizes.pop(path, 0)
+            self._sizes[path] = y.nbytes
+            evicted = []
+            while self._total > self.max_bytes and self._sizes:
+                old, size = self._sizes.popitem(last=False)
+                self._total -= size
+                evicted.append(old)
+        for old in evicted:
+            self._remove(old)
+
+    def discard(self, key: str):
+        """Delete every variant kept for a key"""
+        directory, prefix = os.path.split(key)
+        with self._lock:
+            paths = [path for path in self._sizes if os.path.dirname(path) == directory
+                     and os.path.basename(path).startswith(prefix + '.')]
+            for path in paths:
+                self._total -= self._sizes.pop(path)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(prefix + '.') and name.endswith('.npy'):
+                self._remove(os.path.join(directory, name))
+
+    def evict_session(self, session_id: str) -> int:
+        """
+        Forget the buffers of a session whose directory was deleted (expiry, quota, session delete)
+
+        Args:
+            session_id: Name of the session directory the keys were built from
+
+        Returns:
+            Bytes no longer indexed
+        """
+        with self._lock:
+            paths = [path for path in self._sizes if Path(path).parent.parent.name == session_id]
+            freed = sum(self._sizes.pop(path) for path in paths)
+            self._total -= freed
+        return freed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def size(self) -> int:
+        """Bytes currently indexed"""
+        with self._lock:
+            return self._total
@@ -0,0 +1,235 @@
+"""
+Audio decoder backends with format-aware selection
+Each file is decoded by the fastest backend available for its format, falling
+back to the next one on failure:
+
+- soundfile: libsndfile in-process (WAV/FLAC/OGG/AIFF, and MP3 from libsndfile 1.1)
+- ffmpeg: one process per file that decodes to float32 WAV at the native rate and
+  channel count, which its header carries, so no separate probe is needed; the
+  downmix and core.resampling then run as for soundfile. The CLI takes its inputs
+  at start-up, so a process cannot be kept open across files; one per file is the
+  minimum.
+- librosa: librosa.load (soundfile, then audioread)
+
+All backends return float32 at the requested rate, shaped like librosa.load,
+resampled with the requested strategy.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .resampling import DEFAULT as DEFAULT_RESAMPLING, resample
+
+logger = logging.getLogger(__name__)
+
+
+def downmix(y: np.ndarray) -> np.ndarray:
+    """
+    Mean of the channels of a (samples, channels) signal, as librosa.to_mono
+
+    Column by column, as y.mean(axis=1) is slow on the interleaved layout.
+
+    Returns:
+        (samples, 1) array
+    """
+    mixed = y[:, 0].copy()
+    for channel in range(1, y.shape[1]):
+        mixed += y[:, channel]
+    mixed /= y.shape[1]
+    return mixed[:, np.newaxis]
+
+
+class Decoder:
+    """A decoding backend"""
+
+    name = ''
+
+    def available(self) -> bool:
+        """Whether the backend can run in this environment"""
+        return True
+
+    def supports(self, extension: str) -> bool:
+        """Whether the backend handles files with this (lower-case, dotless) extension"""
+        return True
+
+    def decode(self, path: str, sr: int, mono: bool, resampling: str = DEFAULT_RESAMPLING) -> np.ndarray:
+        """
+        Decode a file
+
+        Args:
+            path: Audio file
+            sr: Target sample rate
+            mono: Downmix to mono
+            resampling: Strategy from core.resampling
+
+        Returns:
+            float32 (samples,) if mono or single-channel, otherwise (channels, samples)
+        """
+        raise NotImplementedError
+
+
+class SoundFileDecoder(Decoder):
+    """libsndfile via soundfile, then core.resampling (soxr_hq gives the same result as librosa.load)"""
+
+    name = 'soundfile'
+    EXTENSIONS = {'wav': 'WAV', 'wave': 'WAV', 'flac': 'FLAC', 'ogg': 'OGG', 'oga': 'OGG',
+                  'aif': 'AIFF', 'aiff': 'AIFF', 'mp3': 'MP3'}
+
+    def __init__(self):
+        try:
+            import soundfile
+            self.formats = set(soundfile.available_formats())
+        except (ImportError, OSError):
+            self.formats = set()
+
+    def available(self) -> bool:
+        return bool(self.formats)
+
+    def supports(self, extension: str) -> bool:
+        return self.EXTENSIONS.get(extension) in self.formats
+
+    def decode(self, path: str, sr: int, mono: bool, resampling: str = DEFAULT_RESAMPLING) -> np.ndarray:
+        import soundfile
+
+        y, native_sr = soundfile.read(path, dtype='float32', always_2d=True)
+        if mono and y.shape[1] > 1:
+            # Downmix before resampling (half the samples to filter)
+            y = downmix(y)
+        y = resample(y, native_sr, sr, resampling)
+        return np.ascontiguousarray(y[:, 0] if y.shape[1] == 1 else y.T, dtype=np.float32)
+
+
+class FFmpegDecoder(Decoder):
+    """ffmpeg subprocess writing float32 WAV at the native rate and layout, then downmix and core.resampling"""
+
+    name = 'ffmpeg'
+    # Also covers what libsndfile cannot read: AAC/M4A, WMA, Opus, and MP3 before libsndfile 1.1
+    EXTENSIONS = {'mp3', 'm4a', 'mp4', 'aac', 'wma', 'opus', 'webm', 'wav', 'flac', 'ogg', 'aif', 'aiff'}
+
+    def __init__(self, binary: Optional[str] = None):
+        self.binary = binary or shutil.which('ffmpeg')
+
+    def available(self) -> bool:
+        return self.binary is not None
+
+    def supports(self, extension: str) -> bool:
+        return extension in self.EXTENSIONS
+
+    def decode(self, path: str, sr: int, mono: bool, resampling: str = DEFAULT_RESAMPLING) -> np.ndarray:
+        # No -ac/-ar: ffmpeg's rematrixing mixes stereo to mono (and back) at -3 dB, not as
+        # the mean, and its resampler is not the requested strategy
+        command = [self.binary, '-nostdin', '-hide_banner', '-loglevel', 'error', '-i', path,
+                   '-vn', '-f', 'wav', '-acodec', 'pcm_f32le', '-']
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip() or 'ffmpeg failed')
+        if not result.stdout:
+            raise RuntimeError(f"no audio stream in {os.path.basename(path)}")
+        native_sr, channels, data = self._read_wav(result.stdout)
+        y = np.frombuffer(data[:len(data) - len(data) % (4 * channels)], dtype='<f4').reshape(-1, channels)
+        if mono and channels > 1:
+            y = downmix(y)
+        y = resample(y, native_sr, sr, resampling)
+        return np.ascontiguousarray(y[:, 0] if y.shape[1] == 1 else y.T, dtype=np.float32)
+
+    @staticmethod
+    def _read_wav(stream: bytes) -> Tuple[int, int, memoryview]:
+        """
+        Format and sample data of a WAV file ffmpeg wrote to a pipe
+
+        The RIFF and data sizes are left unset on a pipe, so the data runs to the end.
+
+        Returns:
+            (sample rate, channel count, sample bytes)
+        """
+        if stream[:4] != b'RIFF' or stream[8:12] != b'WAVE':
+            raise RuntimeError("ffmpeg did not write WAV")
+        view = memoryview(stream)
+        position, sr, channels = 12, None, None
+        while position + 8 <= len(stream):
+            chunk, size = stream[position:position + 4], int.from_bytes(stream[position + 4:position + 8], 'little')
+            if chunk == b'fmt ':
+                channels = int.from_bytes(stream[position + 10:position + 12], 'little')
+                sr = int.from_bytes(stream[position + 12:position + 16], 'little')
+            elif chunk == b'data':
+                if not sr or not channels:
+                    break
+                return sr, channels, view[position + 8:]
+            position += 8 + size + size % 2
+        raise RuntimeError("no audio data in ffmpeg output")
+
+
+class LibrosaDecoder(Decoder):
+    """librosa.load - the previous behaviour, kept as the last resort"""
+
+    name = 'librosa'
+
+    def decode(self, path: str, sr: int, mono: bool, resampling: str = DEFAULT_RESAMPLING) -> np.ndarray:
+        import librosa
+        y, _ = librosa.load(path, sr=sr, mono=mono, res_type=resampling)
+        return y
+
+
+class Decoders:
+    """Pick and run a decoder per file"""
+
+    def __init__(self, backends: Sequence[Decoder]):
+        """
+        Initialize selection
+
+        Args:
+            backends: Decoders in order of preference (unavailable ones are dropped)
+        """
+        self.backends: List[Decoder] = [backend for backend in backends if backend.available()]
+
+    def for_file(self, path: str) -> List[Decoder]:
+        """Backends that handle this file, fastest first"""
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        return [backend for backend in self.backends if backend.supports(extension)]
+
+    def decode(self, path: str, sr: int, mono: bool,
+               resampling: str = DEFAULT_RESAMPLING) -> Tuple[np.ndarray, str]:
+        """
+        Decode with the first backend that succeeds
+
+        Args:
+            path: Audio file
+            sr: Target sample rate
+            mono: Downmix to mono
+            resampling: Strategy from core.resampling
+
+        Returns:
+            (signal, name of the backend used)
+        """
+        errors: Dict[str, str] = {}
+        for backend in self.for_file(path):
+            try:
+                return backend.decode(path, sr, mono, resampling), backend.name
+            except Exception as e:
+                errors[backend.name] = str(e)
+                logger.debug("decode.fallback", extra={'file': os.path.basename(path), 'backend': backend.name,
+                                                       'error': str(e)})
+        raise RuntimeError(f"could not decode {os.path.basename(path)}: {errors}")
+
+
+BACKENDS = {'soundfile': SoundFileDecoder, 'ffmpeg': FFmpegDecoder, 'librosa': LibrosaDecoder}
+
+
+def default_decoders(order: Optional[str] = None) -> Decoders:
+    """
+    Decoders in the configured order
+
+    Args:
+        order: Comma-separated backend names (default: AUDIO_DECODERS or soundfile,ffmpeg,librosa)
+
+    Returns:
+        Decoders instance
+    """
+    order = order or os.environ.get('AUDIO_DECODERS', 'soundfile,ffmpeg,librosa')
+    names = [name.strip() for name in order.split(',') if name.strip() in BACKENDS]
+    return Decoders([BACKENDS[name]() for name in names or BACKENDS])
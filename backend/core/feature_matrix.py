@@ -0,0 +1,172 @@
+"""
+FeatureMatrix - Columnar storage for analyzed tracks
+One float32 row per track, one column per parameter, with a validity mask
+"""
+
+import io
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Track fields that are not numeric parameters
+META_FIELDS = ('filename', 'key')
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+class FeatureMatrix:
+    """Features of many tracks as a (tracks x params) float32 matrix"""
+
+    def __init__(self, params: List[str], values: np.ndarray, mask: np.ndarray,
+                 filenames: List[str], keys: List[Optional[str]]):
+        """
+        Initialize from already aligned arrays
+
+        Args:
+            params: Parameter name of each column
+            values: float32 array (tracks, params); NaN where not computed
+            mask: bool array (tracks, params); True where a value was computed
+            filenames: Filename of each row
+            keys: Detected musical key of each row (None if not analyzed)
+        """
+        self.params = list(params)
+        self.index = {param: i for i, param in enumerate(self.params)}
+        self.values = values
+        self.mask = mask
+        self.filenames = list(filenames)
+        self.keys = list(keys)
+
+    @classmethod
+    def from_tracks(cls, tracks: Iterable[Dict], params: Optional[List[str]] = None) -> 'FeatureMatrix':
+        """
+        Build a matrix from per-track feature dicts
+
+        Args:
+            tracks: Feature dicts as returned by AudioProcessor (optionally with 'filename')
+            params: Column order; defaults to every numeric parameter found, sorted
+
+        Returns:
+            FeatureMatrix with one row per track
+        """
+        tracks = list(tracks or [])
+        if params is None:
+            params = sorted({
+                key for track in tracks for key, value in track.items()
+                if key not in META_FIELDS and _is_number(value)
+            })
+
+        values = np.full((len(tracks), len(params)), np.nan, dtype='<f4')
+        for row, track in enumerate(tracks):
+            for col, param in enumerate(params):
+                value = track.get(param)
+                if _is_number(value):
+                    values[row, col] = value
+
+        return cls(
+            params,
+            values,
+            ~np.isnan(values),
+            [track.get('filename', '') for track in tracks],
+            [track.get('key') for track in tracks]
+        )
+
+    @classmethod
+    def empty(cls) -> 'FeatureMatrix':
+        return cls.from_tracks([])
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def column(self, param: str) -> np.ndarray:
+        """Computed values of one parameter (missing rows dropped)"""
+        col = self.index[param]
+        return self.values[self.mask[:, col], col]
+
+    def row(self, i: int) -> Dict:
+        """One track as a feature dict (missing parameters omitted)"""
+        features = {
+            param: float(value)
+            for param, value, valid in zip(self.params, self.values[i], self.mask[i]) if valid
+        }
+        if self.keys[i] is not None:
+            features['key'] = self.keys[i]
+        if self.filenames[i]:
+            features['filename'] = self.filenames[i]
+        return features
+
+    def to_tracks(self) -> List[Dict]:
+        """All tracks as feature dicts"""
+        return [self.row(i) for i in range(len(self))]
+
+    def select(self, params: List[str]) -> 'FeatureMatrix':
+        """
+        Reorder columns to the given parameters
+
+        Args:
+            params: Column order of the result; parameters not in this matrix become missing
+
+        Returns:
+            New FeatureMatrix with the same rows
+        """
+        values = np.full((len(self), len(params)), np.nan, dtype='<f4')
+        for col, param in enumerate(params):
+            if param in self.index:
+                values[:, col] = self.values[:, self.index[param]]
+        mask = ~np.isnan(values)
+        return FeatureMatrix(params, values, mask, self.filenames, self.keys)
+
+    def profile(self) -> Dict:
+        """
+        Per-parameter statistics over the computed values
+
+        Returns:
+            {param: {'mean', 'std', 'min', 'max'}} for every parameter with at least one value
+        """
+        profile = {}
+        counts = self.mask.sum(axis=0)
+        if not len(self):
+            return profile
+
+        data = self.values.astype(np.float64)
+        with np.errstate(invalid='ignore'):
+            means = np.nanmean(data, axis=0)
+            stds = np.nanstd(data, axis=0)
+            mins = np.nanmin(data, axis=0)
+            maxs = np.nanmax(data, axis=0)
+
+        for col, param in enumerate(self.params):
+            if counts[col]:
+                profile[param] = {
+                    'mean': float(means[col]),
+                    'std': float(stds[col]),
+                    'min': float(mins[col]),
+                    'max': float(maxs[col])
+                }
+        return profile
+
+    def to_npz(self) -> bytes:
+        """Serialize to a compressed .npz archive (no pickled objects)"""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            params=np.array(self.params, dtype=str),
+            values=self.values,
+            mask=self.mask,
+            filenames=np.array(self.filenames, dtype=str),
+            keys=np.array([key or '' for key in self.keys], dtype=str)
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_npz(cls, data: bytes) -> 'FeatureMatrix':
+        """Load a matrix written by to_npz"""
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            return cls(
+                archive['params'].tolist(),
+                archive['values'].astype('<f4', copy=False),
+                archive['mask'].astype(bool, copy=False),
+                archive['filenames'].tolist(),
+                [key or None for key in archive['keys'].tolist()]
+            )
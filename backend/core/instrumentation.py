@@ -0,0 +1,253 @@
+"""
+Analysis instrumentation
+Records wall time, CPU time and peak allocation per analysis stage
+and aggregates them as Prometheus-style metrics
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+
+class _MemoryTracer:
+    """
+    Process-wide tracemalloc shared by every recorder that traces memory
+
+    Tracing starts with the first user and stops after the last one. The peak
+    counter is only reset here, after folding it into every open stage, so
+    concurrent analyses (e.g. warm-up next to a request) never lose each other's
+    peaks; allocations of one thread do count towards the others' open stages.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._started = False
+        self._open: Dict[int, Dict] = {}
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+            if self._users == 1 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                if self._started and tracemalloc.is_tracing():
+                    tracemalloc.stop()
+                self._started = False
+
+    def begin(self, frame: Dict):
+        """Open a stage: frame['base'] is the current allocation, frame['peak'] tracks its peak"""
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            self._fold(peak)
+            frame['base'] = frame['peak'] = current
+            tracemalloc.reset_peak()
+            self._open[id(frame)] = frame
+
+    def end(self, frame: Dict) -> int:
+        """Close a stage and return its peak allocation in bytes"""
+        with self._lock:
+            self._fold(tracemalloc.get_traced_memory()[1])
+            self._open.pop(id(frame), None)
+            return frame['peak']
+
+    def _fold(self, peak: int):
+        for frame in self._open.values():
+            frame['peak'] = max(frame['peak'], peak)
+
+
+_tracer = _MemoryTracer()
+
+
+class Timings:
+    """Collect per-stage measurements for one analysis (decode, intermediates, extractors)"""
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        Initialize timings recorder
+
+        Args:
+            trace_memory: Also record peak Python/numpy allocation per stage (uses tracemalloc, slower)
+        """
+        self.trace_memory = trace_memory
+        self.entries: List[Dict] = []
+        self._tracing = False
+
+    @contextmanager
+    def measure(self, stage: str, name: str):
+        """
+        Measure a block of work
+
+        Stages nest: an extractor that triggers a shared intermediate
+        includes the intermediate's cost, which is also recorded on its own.
+
+        Args:
+            stage: Stage kind ('decode', 'intermediate', 'extractor', ...)
+            name: Stage name (e.g. parameter name)
+        """
+        frame = {'peak': 0, 'base': 0}
+        if self.trace_memory:
+            if not self._tracing:
+                _tracer.acquire()
+                self._tracing = True
+            _tracer.begin(frame)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+
+            entry = {
+                'stage': stage,
+                'name': name,
+                'wall_ms': round(wall * 1000, 3),
+                'cpu_ms': round(cpu * 1000, 3)
+            }
+            if self.trace_memory:
+                peak = _tracer.end(frame)
+                entry['peak_kb'] = round(max(0, peak - frame['base']) / 1024, 1)
+            self.entries.append(entry)
+
+    def close(self):
+        """Release the shared memory tracer if this recorder used it"""
+        if self._tracing:
+            _tracer.release()
+        self._tracing = False
+
+    def as_list(self) -> List[Dict]:
+        """Return recorded entries in completion order"""
+        return list(self.entries)
+
+    def totals(self) -> Dict[str, float]:
+        """Return summed wall time in ms per stage kind"""
+        totals: Dict[str, float] = {}
+        for entry in self.entries:
+            totals[entry['stage']] = round(totals.get(entry['stage'], 0.0) + entry['wall_ms'], 3)
+        return totals
+
+
+class _NullTimings:
+    """No-op recorder used when no analysis scope is active"""
+
+    _context = nullcontext()
+
+    def measure(self, stage: str, name: str):
+        return self._context
+
+
+NULL_TIMINGS = _NullTimings()
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Thread-safe in-process metrics rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        # name -> {labels tuple -> value}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._gauges: Dict[str, Dict[tuple, float]] = {}
+        # name -> {labels tuple -> [sum, count]}
+        self._summaries: Dict[str, Dict[tuple, List[float]]] = {}
+
+    def _declare(self, name: str, kind: str, help_text: str):
+        if name not in self._types:
+            self._types[name] = kind
+            self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, help_text: str = '', labels: Optional[Dict] = None):
+        """Increment a counter"""
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._declare(name, 'counter', help_text)
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_max(self, name: str, value: float, help_text: str = '', labels: Optional[Dict] = None):
+        """Set a gauge to the maximum of its current and the given value"""
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._declare(name, 'gauge', help_text)
+            series = self._gauges.setdefault(name, {})
+            series[key] = max(series.get(key, value), value)
+
+    def set_gauge(self, name: str, value: float, help_text: str = '', labels: Optional[Dict] = None):
+        """Set a gauge to the given value"""
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._declare(name, 'gauge', help_text)
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, help_text: str = '', labels: Optional[Dict] = None):
+        """Add an observation to a summary (sum and count)"""
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._declare(name, 'summary', help_text)
+            series = self._summaries.setdefault(name, {})
+            stats = series.setdefault(key, [0.0, 0])
+            stats[0] += value
+            stats[1] += 1
+
+    def observe_timings(self, timings: Timings):
+        """Aggregate all entries of an analysis into stage metrics"""
+        for entry in timings.entries:
+            labels = {'stage': entry['stage'], 'name': entry['name']}
+            self.observe('algorithm_stage_wall_seconds', entry['wall_ms'] / 1000,
+                         'Wall time per analysis stage', labels)
+            self.observe('algorithm_stage_cpu_seconds', entry['cpu_ms'] / 1000,
+                         'Process CPU time per analysis stage', labels)
+            if 'peak_kb' in entry:
+                self.set_max('algorithm_stage_peak_alloc_bytes', entry['peak_kb'] * 1024,
+                             'Largest peak allocation seen per analysis stage', labels)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._types):
+                kind = self._types[name]
+                if self._help[name]:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+                if kind == 'summary':
+                    for key, (total, count) in sorted(self._summaries.get(name, {}).items()):
+                        label_str = self._format_labels(key)
+                        lines.append(f"{name}_sum{label_str} {total:.6f}")
+                        lines.append(f"{name}_count{label_str} {count}")
+                else:
+                    source = self._counters if kind == 'counter' else self._gauges
+                    for key, value in sorted(source.get(name, {}).items()):
+                        lines.append(f"{name}{self._format_labels(key)} {self._format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        # Byte counters must stay exact - no exponent notation for whole numbers
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+    @staticmethod
+    def _format_labels(key: tuple) -> str:
+        if not key:
+            return ''
+        return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in key) + '}'
+
+
+# Process-wide registry (one per uvicorn worker)
+metrics = MetricsRegistry()
@@ -3,63 +3,59 @@ PlaylistComparator - Wrapper for Comparator class
 Creates playlist profile and compares tracks
 """
 
-from typing import Dict, List
-import numpy as np
+from typing import Dict, List, Optional, Union
 from .comparator import Comparator
+from .feature_matrix import FeatureMatrix
 
 
 class PlaylistComparator:
     """Analyze playlist and compare tracks against it"""
 
-    def __init__(self, playlist_tracks: List[Dict]):
+    def __init__(self, playlist_tracks: Union[FeatureMatrix, List[Dict]]):
         """
-        Initialize with list of analyzed tracks
+        Initialize with analyzed tracks
 
         Args:
-            playlist_tracks: List of track features from playlist
+            playlist_tracks: Feature matrix of the playlist (or list of track features)
         """
-        self.playlist_tracks = playlist_tracks
+        self.matrix = self._as_matrix(playlist_tracks)
         self.profile = self._create_profile()
         self.comparator = Comparator(self.profile)
 
+    @classmethod
+    def from_profile(cls, profile: Dict,
+                     playlist_tracks: Optional[Union[FeatureMatrix, List[Dict]]] = None) -> 'PlaylistComparator':
+        """
+        Build a comparator from an existing profile without recomputing it
+
+        Args:
+            profile: Statistical profile ({param: {'mean', 'std', 'min', 'max'}})
+            playlist_tracks: Optional tracks the profile was built from
+
+        Returns:
+            PlaylistComparator for the profile
+        """
+        instance = cls.__new__(cls)
+        instance.matrix = cls._as_matrix(playlist_tracks)
+        instance.profile = profile
+        instance.comparator = Comparator(profile)
+        return instance
+
+    @staticmethod
+    def _as_matrix(tracks: Optional[Union[FeatureMatrix, List[Dict]]]) -> FeatureMatrix:
+        if isinstance(tracks, FeatureMatrix):
+            return tracks
+        return FeatureMatrix.from_tracks(tracks or [])
+
+    @property
+    def playlist_tracks(self) -> List[Dict]:
+        """Playlist tracks as feature dicts"""
+        return self.matrix.to_tracks()
+
     def _create_profile(self) -> Dict:
         """Create statistical profile from playlist tracks"""
-        if not self.playlist_tracks:
-            return {}
-
-        profile = {}
-
-        # Dynamically collect ALL numeric parameters from tracks
-        all_params = set()
-        for track in self.playlist_tracks:
-            for key, value in track.items():
-                # Skip non-numeric fields
-                if key in ['filename', 'key']:
-                    continue
-                # Check if it's a numeric value
-                if isinstance(value, (int, float)):
-                    all_params.add(key)
-
-        # Calculate mean and std for each parameter
-        # Use nested dict structure: {param: {'mean': x, 'std': y, 'min': z, 'max': w}}
-        for param in all_params:
-            values = []
-            for track in self.playlist_tracks:
-                if param in track and track[param] is not None:
-                    try:
-                        values.append(float(track[param]))
-                    except (ValueError, TypeError):
-                        continue
-
-            if values:
-                profile[param] = {
-                    'mean': np.mean(values),
-                    'std': np.std(values),
-                    'min': np.min(values),
-                    'max': np.max(values)
-                }
-
-        return profile
+        # Nested dict structure: {param: {'mean': x, 'std': y, 'min': z, 'max': w}}
+        return self.matrix.profile()
 
     def get_playlist_profile(self) -> Dict:
         """Return the playlist profile"""
@@ -77,6 +73,22 @@ class PlaylistComparator:
         """
         return self.comparator.compare_track(track_features)
 
+    def compare_tracks(self, tracks: FeatureMatrix) -> List[List[Dict]]:
+        """
+        Compare many tracks against playlist profile, scoring them in one pass
+
+        Args:
+            tracks: Feature matrix of the tracks to compare
+
+        Returns:
+            List of recommendations per track (same order as the matrix rows)
+        """
+        scores = self.comparator.match_scores(tracks)
+        return [
+            self.comparator.compare_track(tracks.row(i), score)
+            for i, score in enumerate(scores)
+        ]
+
     def generate_recommendations(self, comparison: List[Dict]) -> List[Dict]:
         """
         Generate formatted recommendations
@@ -1,109 +1,46 @@
 """
 HTML Report Generator
 Creates beautiful, shareable reports with recommendations
+Page and row templates are compiled once; reports are rendered as a stream of chunks
+Tracks with stored features get a z-score and a radar chart (see core/charts.py)
 """
 
 from datetime import datetime
-from typing import Dict, List
+from html import escape
+import hashlib
+import json
+from string import Formatter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import os
-
-
-class ReportGenerator:
-    """Generate HTML reports"""
-
-    def generate_html_report(self, target_profile: Dict, recommendations: List[Dict]) -> str:
-        """
-        Generate HTML report
-
-        Args:
-            target_profile: Target playlist profile
-            recommendations: List of track recommendations
-
-        Returns:
-            Path to generated HTML file
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"report_{timestamp}.html"
-        filepath = os.path.join("reports", filename)
-
-        # Ensure reports directory exists
-        os.makedirs("reports", exist_ok=True)
-
-        html_content = self.build_html(target_profile, recommendations)
-
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-        return filepath
-
-    def build_html(self, target_profile: Dict, recommendations: List[Dict]) -> str:
-        """Build HTML content"""
-
-        # Build target profile table
-        profile_rows = ""
-        feature_names = {
-            'bpm': 'BPM (Tempo)',
-            'energy': 'Energy',
-            'loudness': 'Loudness (LUFS)',
-            'spectral_centroid': 'Brightness (Hz)',
-            'rms': 'RMS Energy',
-            'zero_crossing_rate': 'Zero Crossing Rate'
-        }
-
-        for key, stats in target_profile.items():
-            name = feature_names.get(key, key)
-            profile_rows += f"""
-                <tr>
-                    <td>{name}</td>
-                    <td>{stats['mean']:.2f}</td>
-                    <td>{stats['min']:.2f} - {stats['max']:.2f}</td>
-                    <td>{stats['std']:.2f}</td>
-                </tr>
-            """
-
-        # Build recommendations sections
-        recommendations_html = ""
-        for track_rec in recommendations:
-            filename = track_rec['filename']
-            recs = track_rec['recommendations']
-
-            # Get score
-            score = recs[0]['score'] if recs else 0
-            score_color = self.get_score_color(score)
-
-            # Build recommendation items
-            rec_items = ""
-            for rec in recs:
-                status_icon = self.get_status_icon(rec['status'])
-                status_color = self.get_status_color_hex(rec['status'])
-
-                rec_items += f"""
-                    <div class="recommendation-item" style="border-left-color: {status_color};">
-                        <span class="status-icon">{status_icon}</span>
-                        <span class="rec-message">{rec['message']}</span>
-                    </div>
-                """
-
-            recommendations_html += f"""
-                <div class="track-section">
-                    <h3>🎵 {filename}</h3>
-                    <div class="score-badge" style="background-color: {score_color};">
-                        Match Score: {score}%
-                    </div>
-                    <div class="recommendations">
-                        {rec_items}
-                    </div>
-                </div>
-            """
-
-        # Complete HTML
-        html = f"""
-<!DOCTYPE html>
+import uuid
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Rendered text is yielded in pieces of roughly this size
+CHUNK_SIZE = 64 * 1024
+# Only the first tracks of a report get charts; each new chart costs ~10-20 ms to draw
+CHART_TRACKS = int(os.environ.get("REPORT_CHART_TRACKS", 50))
+# The radar gets unreadable with many axes; used when few of FEATURE_NAMES are in the profile
+RADAR_MAX_AXES = 12
+
+FEATURE_NAMES = {
+    'bpm': 'BPM (Tempo)',
+    'energy': 'Energy',
+    'loudness': 'Loudness (LUFS)',
+    'spectral_centroid': 'Brightness (Hz)',
+    'rms': 'RMS Energy',
+    'zero_crossing_rate': 'Zero Crossing Rate'
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
-<head>
+<head>{version_marker}
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Audio Analysis Report - {datetime.now().strftime("%Y-%m-%d %H:%M")}</title>
+    <title>Audio Analysis Report - {title_time}</title>
     <style>
         * {{
             margin: 0;
@@ -219,6 +156,19 @@ class ReportGenerator:
             color: white;
         }}
 
+        .charts {{
+            display: flex;
+            flex-wrap: wrap;
+            gap: 20px;
+            margin: 10px 0;
+        }}
+
+        .charts img {{
+            max-width: 100%;
+            height: auto;
+            border-radius: 8px;
+        }}
+
         .recommendations {{
             margin-top: 20px;
         }}
@@ -269,7 +219,7 @@ class ReportGenerator:
         <header>
             <h1>🎵 Audio Analysis Report</h1>
             <p class="subtitle">Playlist DNA Decoded • Actionable Recommendations</p>
-            <p class="timestamp">Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+            <p class="timestamp">Generated: {generated}</p>
         </header>
 
         <section>
@@ -283,15 +233,13 @@ class ReportGenerator:
                         <th>Std Dev</th>
                     </tr>
                 </thead>
-                <tbody>
-                    {profile_rows}
+                <tbody>{profile_rows}
                 </tbody>
             </table>
         </section>
 
         <section>
-            <h2>🤖 AI Recommendations</h2>
-            {recommendations_html}
+            <h2>🤖 AI Recommendations</h2>{track_sections}
         </section>
 
         <footer>
@@ -302,7 +250,278 @@ class ReportGenerator:
 </body>
 </html>
 """
-        return html
+
+PROFILE_ROW_TEMPLATE = """
+                    <tr>
+                        <td>{name}</td>
+                        <td>{mean}</td>
+                        <td>{min} - {max}</td>
+                        <td>{std}</td>
+                    </tr>"""
+
+TRACK_START_TEMPLATE = """
+            <div class="track-section">
+                <h3>🎵 {filename}</h3>
+                <div class="score-badge" style="background-color: {score_color};">
+                    Match Score: {score}%
+                </div>{charts}
+                <div class="recommendations">"""
+
+CHARTS_START = """
+                <div class="charts">"""
+
+CHART_TEMPLATE = """
+                    <img src="{src}" alt="{alt}">"""
+
+CHARTS_END = """
+                </div>"""
+
+RECOMMENDATION_TEMPLATE = """
+                    <div class="recommendation-item" style="border-left-color: {color};">
+                        <span class="status-icon">{icon}</span>
+                        <span class="rec-message">{message}</span>
+                    </div>"""
+
+TRACK_END = """
+                </div>
+            </div>"""
+
+
+def compile_template(template: str) -> List[Tuple[str, str]]:
+    """
+    Split a page template into (literal text, section name) pairs once
+
+    Args:
+        template: str.format style template with plain {name} fields
+
+    Returns:
+        Pairs in document order; the section name is '' after the last literal
+    """
+    compiled, pending = [], []
+    for literal, field, _, _ in Formatter().parse(template):
+        # Escaped braces ({{ }}) split the literal text - merge it back
+        pending.append(literal)
+        if field:
+            compiled.append((''.join(pending), field))
+            pending = []
+    compiled.append((''.join(pending), ''))
+    return compiled
+
+
+_PAGE = compile_template(PAGE_TEMPLATE)
+
+# Changes whenever any template changes, so cached reports are re-rendered after an upgrade
+TEMPLATE_VERSION = hashlib.sha1("".join((
+    PAGE_TEMPLATE, PROFILE_ROW_TEMPLATE, TRACK_START_TEMPLATE, CHARTS_START, CHART_TEMPLATE, CHARTS_END,
+    RECOMMENDATION_TEMPLATE, TRACK_END
+)).encode('utf-8')).hexdigest()[:12]
+
+# Comment at the start of <head> identifying the data a report was rendered from
+# (after the doctype: a comment before it can switch browsers to quirks mode)
+VERSION_MARKER = "\n    <!-- report-version: {} -->"
+# read_version looks for the marker in this many leading characters of a report
+VERSION_MARKER_SCAN = 256
+
+
+def _number(value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"{value:.2f}"
+    return "-"
+
+
+def _chunked(pieces: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Join small pieces into chunks of about `size` characters"""
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class ReportGenerator:
+    """Generate HTML reports"""
+
+    def build_html(self, target_profile: Dict, recommendations: List[Dict],
+                   track_features: Optional[Dict[str, Dict]] = None) -> str:
+        """Build HTML content"""
+        return "".join(self.render(target_profile, recommendations, track_features=track_features))
+
+    @staticmethod
+    def report_version(target_profile: Dict, recommendations: List[Dict],
+                       track_features: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Identify the content of a report
+
+        Args:
+            target_profile: Target playlist profile
+            recommendations: Per-track results
+            track_features: Features per filename (charts)
+
+        Returns:
+            Hash of the profile, recommendations, features and templates
+        """
+        state = [target_profile, recommendations, track_features or {}, CHART_TRACKS]
+        if orjson is not None:
+            data = orjson.dumps(state, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            data = json.dumps(state, sort_keys=True, default=str, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(TEMPLATE_VERSION.encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()[:32]
+
+    @staticmethod
+    def read_version(path) -> Optional[str]:
+        """Return the version a report on disk was rendered from (None if missing or unversioned)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                head = f.read(VERSION_MARKER_SCAN)
+        except OSError:
+            return None
+        prefix, suffix = VERSION_MARKER.strip().split('{}')
+        start = head.find(prefix)
+        if start < 0:
+            return None
+        start += len(prefix)
+        end = head.find(suffix, start)
+        return head[start:end] if end >= 0 else None
+
+    def render(self, target_profile: Dict, recommendations: List[Dict],
+               version: Optional[str] = None,
+               track_features: Optional[Dict[str, Dict]] = None) -> Iterator[str]:
+        """
+        Render the report as a stream of HTML chunks
+
+        Args:
+            target_profile: Target playlist profile ({param: {'mean', 'std', 'min', 'max'}})
+            recommendations: Per-track results as stored by /api/compare/batch
+                ({filename, comparison, recommendations})
+            version: Optional report_version, written as a comment at the start of <head>
+            track_features: Features per filename; tracks listed here get charts
+
+        Yields:
+            HTML text chunks (about CHUNK_SIZE characters each)
+        """
+        now = datetime.now()
+        sections = {
+            'version_marker': lambda: iter([VERSION_MARKER.format(version)] if version else []),
+            'title_time': lambda: iter([now.strftime("%Y-%m-%d %H:%M")]),
+            'generated': lambda: iter([now.strftime("%Y-%m-%d %H:%M:%S")]),
+            'profile_rows': lambda: self._profile_rows(target_profile or {}),
+            'track_sections': lambda: self._track_sections(
+                recommendations or [], target_profile or {}, track_features or {}
+            )
+        }
+
+        def pieces():
+            for literal, section in _PAGE:
+                yield literal
+                if section:
+                    yield from sections[section]()
+
+        return _chunked(pieces())
+
+    def write_report(self, path, target_profile: Dict, recommendations: List[Dict],
+                     version: Optional[str] = None,
+                     track_features: Optional[Dict[str, Dict]] = None) -> int:
+        """
+        Render a report straight to disk
+
+        The file is written under a temporary name and moved into place,
+        so a concurrent download never sees a partial report.
+
+        Returns:
+            Number of bytes written
+        """
+        chunks = self.stream_to_file(path, target_profile, recommendations, version, track_features)
+        return sum(len(chunk) for chunk in chunks)
+
+    def stream_to_file(self, path, target_profile: Dict, recommendations: List[Dict],
+                       version: Optional[str] = None,
+                       track_features: Optional[Dict[str, Dict]] = None) -> Iterator[bytes]:
+        """
+        Render a report, writing it to disk while yielding the same encoded chunks
+
+        Args:
+            path: Destination file
+            target_profile: Target playlist profile
+            recommendations: Per-track results
+            version: Optional report_version, written as a comment at the start of <head>
+            track_features: Features per filename, for the charts
+
+        Yields:
+            UTF-8 encoded HTML chunks
+        """
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in self.render(target_profile, recommendations, version, track_features):
+                    data = chunk.encode('utf-8')
+                    f.write(data)
+                    yield data
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _profile_rows(self, target_profile: Dict) -> Iterator[str]:
+        for key, stats in target_profile.items():
+            if not isinstance(stats, dict):
+                continue
+            yield PROFILE_ROW_TEMPLATE.format(
+                name=escape(FEATURE_NAMES.get(key, key)),
+                mean=_number(stats.get('mean')),
+                min=_number(stats.get('min')),
+                max=_number(stats.get('max')),
+                std=_number(stats.get('std'))
+            )
+
+    def _charts(self, target_profile: Dict, features: Dict) -> str:
+        """Chart block for one track ('' if nothing can be plotted)"""
+        # matplotlib/PIL load on the first chart, not when main imports this module
+        from .charts import charts
+
+        radar_params = [param for param in FEATURE_NAMES if param in target_profile]
+        if len(radar_params) < 3:
+            radar_params = list(target_profile)[:RADAR_MAX_AXES]
+        radar_profile = {param: target_profile[param] for param in radar_params}
+
+        images = [
+            (charts.zscore_chart(target_profile, features, FEATURE_NAMES),
+             "Deviation from the playlist average per feature"),
+            (charts.radar_chart(radar_profile, features, FEATURE_NAMES),
+             "Track against the playlist average")
+        ]
+        tags = [CHART_TEMPLATE.format(src=src, alt=alt) for src, alt in images if src]
+        if not tags:
+            return ""
+        return CHARTS_START + "".join(tags) + CHARTS_END
+
+    def _track_sections(self, recommendations: List[Dict], target_profile: Dict,
+                        track_features: Dict[str, Dict]) -> Iterator[str]:
+        for position, track_rec in enumerate(recommendations):
+            # 'comparison' carries status/message/score; older entries only have 'recommendations'
+            items = track_rec.get('comparison') or track_rec.get('recommendations') or []
+            score = next((item['score'] for item in items if 'score' in item), 0)
+            features = track_features.get(track_rec.get('filename'))
+
+            yield TRACK_START_TEMPLATE.format(
+                filename=escape(str(track_rec.get('filename', ''))),
+                score_color=self.get_score_color(score),
+                score=score,
+                charts=self._charts(target_profile, features) if features and position < CHART_TRACKS else ""
+            )
+            for item in items:
+                status = item.get('status', '')
+                yield RECOMMENDATION_TEMPLATE.format(
+                    color=self.get_status_color_hex(status),
+                    icon=self.get_status_icon(status),
+                    message=escape(str(item.get('message') or item.get('suggestion') or ''))
+                )
+            yield TRACK_END
 
     def get_status_icon(self, status: str) -> str:
         """Get emoji icon for status"""
@@ -0,0 +1,108 @@
+"""
+Resampling strategies for decoding to the analysis rate
+soxr at several quality levels and scipy polyphase, with the measured error
+each one introduces per feature; 'auto' picks the fastest strategy that keeps
+every selected parameter within tolerance
+"""
+
+from math import gcd
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+DEFAULT = 'soxr_hq'
+
+# Names follow librosa's res_type, so librosa.load accepts them too
+STRATEGIES = ('soxr_vhq', 'soxr_hq', 'soxr_mq', 'soxr_lq', 'soxr_qq', 'polyphase')
+
+# Considered by 'auto', fastest first. Mono 3 min 44.1k -> 11.025k:
+# qq 9 ms, lq 14 ms, hq 15 ms (mq is no faster than hq; vhq 31 ms, polyphase 64 ms)
+AUTO_CANDIDATES = ('soxr_qq', 'soxr_lq')
+
+# Largest relative parameter change allowed for 'auto'
+AUTO_TOLERANCE = 0.01
+
+# Max relative error against soxr_hq per parameter, measured with
+# `python -m benchmarks.run --suite resampling` on the 30 s and 3 min fixtures.
+# Parameters not listed changed by less than 0.01 %.
+FEATURE_ERROR: Dict[str, Dict[str, float]] = {
+    'soxr_mq': {
+        'spectral_flatness': 0.0465, 'high_energy': 0.005, 'spectral_rolloff': 0.0021,
+        'spectral_centroid': 0.0008, 'frequency_occupancy': 0.0008, 'beat_strength': 0.0007,
+        'stereo_width': 0.0006,
+    },
+    'soxr_lq': {
+        'spectral_flatness': 0.6056, 'high_energy': 0.5324, 'stereo_width': 0.1455, 'spectral_rolloff': 0.108,
+        'spectral_centroid': 0.0779, 'frequency_occupancy': 0.0747, 'beat_strength': 0.0445,
+        'true_peak': 0.0092, 'low_energy': 0.0069, 'mid_energy': 0.0069, 'sub_bass_presence': 0.0068,
+        'vocal_instrumental_ratio': 0.0068, 'valence': 0.0068, 'call_response_presence': 0.0058,
+        'rhythmic_density': 0.0029, 'zero_crossing_rate': 0.0026, 'dynamic_range': 0.0004,
+        'crest_factor': 0.0004, 'harmonic_to_noise_ratio': 0.0002, 'transient_energy': 0.0002,
+    },
+    'soxr_qq': {
+        'spectral_flatness': 49.09, 'stereo_width': 3.197, 'high_energy': 3.149, 'spectral_rolloff': 1.16,
+        'frequency_occupancy': 0.8824, 'beat_strength': 0.5964, 'spectral_centroid': 0.5834,
+        'sub_bass_presence': 0.1433, 'low_energy': 0.1421, 'zero_crossing_rate': 0.0833,
+        'call_response_presence': 0.0624, 'valence': 0.0507, 'mid_energy': 0.0387, 'rhythmic_density': 0.0282,
+        'harmonic_to_noise_ratio': 0.0125, 'vocal_instrumental_ratio': 0.0075, 'key_confidence': 0.0072,
+        'energy': 0.0062, 'rms': 0.0036, 'loudness': 0.0033, 'transient_energy': 0.0024,
+        'harmonic_complexity': 0.0021, 'dynamic_range': 0.0019, 'crest_factor': 0.0019,
+        'energy_curve': 0.0005, 'repetition_score': 0.0005, 'arrangement_density': 0.0004,
+        'true_peak': 0.0003, 'loudness_range': 0.0003,
+    },
+    'polyphase': {
+        'spectral_flatness': 0.3832, 'high_energy': 0.104, 'spectral_rolloff': 0.0473,
+        'spectral_centroid': 0.0175, 'frequency_occupancy': 0.0166, 'stereo_width': 0.0127,
+        'rhythmic_density': 0.0116, 'beat_strength': 0.0056, 'true_peak': 0.0027,
+        'sub_bass_presence': 0.0019, 'low_energy': 0.0017, 'valence': 0.0015,
+        'call_response_presence': 0.0013, 'vocal_instrumental_ratio': 0.0011, 'mid_energy': 0.0011,
+        'energy': 0.0011, 'harmonic_to_noise_ratio': 0.001,
+    },
+}
+
+
+def resample(y: np.ndarray, orig_sr: int, target_sr: int, strategy: str = DEFAULT) -> np.ndarray:
+    """
+    Resample along the first axis
+
+    Args:
+        y: Signal (samples,) or (samples, channels)
+        orig_sr: Sample rate of y
+        target_sr: Wanted sample rate
+        strategy: One of STRATEGIES
+
+    Returns:
+        float32 signal at target_sr, same layout as y
+    """
+    if orig_sr == target_sr:
+        return y
+    if strategy == 'polyphase':
+        from scipy.signal import resample_poly
+        divisor = gcd(int(orig_sr), int(target_sr))
+        return resample_poly(y, target_sr // divisor, orig_sr // divisor, axis=0).astype(np.float32, copy=False)
+    if strategy not in STRATEGIES:
+        raise ValueError(f"resampling must be one of {STRATEGIES}, got {strategy!r}")
+
+    import soxr
+    return soxr.resample(y, orig_sr, target_sr, quality=strategy[len('soxr_'):].upper())
+
+
+def strategy_for(params: Optional[Iterable[str]], tolerance: float = AUTO_TOLERANCE) -> str:
+    """
+    Fastest strategy whose recorded error stays within tolerance for every parameter
+
+    Args:
+        params: Parameter selection (None: unknown, e.g. section profiles)
+        tolerance: Largest relative error allowed per parameter
+
+    Returns:
+        Strategy name (DEFAULT if no faster one qualifies)
+    """
+    if params is None:
+        return DEFAULT
+    params = list(params)
+    for strategy in AUTO_CANDIDATES:
+        errors = FEATURE_ERROR[strategy]
+        if all(errors.get(param, 0.0) <= tolerance for param in params):
+            return strategy
+    return DEFAULT
@@ -0,0 +1,337 @@
+"""
+Section Comparator - Time-aligned section-by-section comparison of two tracks
+Sections come from novelty boundaries on beat-synchronous features; the two tracks
+are aligned with a banded DTW whose memory grows linearly with track length
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Beats on each side of a candidate boundary when measuring novelty
+NOVELTY_WINDOW = 8
+# Shortest section, in beats
+MIN_SECTION_BEATS = 16
+MAX_SECTIONS = 12
+# Sakoe-Chiba band around the (length-scaled) diagonal, as a fraction of the longer track
+DTW_BAND = 0.15
+DTW_MIN_RADIUS = 16
+
+
+class SectionProfile:
+    """Beat-synchronous features of one track"""
+
+    def __init__(self, times: np.ndarray, chroma: np.ndarray, onset: np.ndarray,
+                 centroid: np.ndarray, power: np.ndarray):
+        """
+        Initialize from per-beat arrays
+
+        Args:
+            times: Beat boundaries in seconds (beats + 1 values)
+            chroma: Mean chroma per beat (beats, 12)
+            onset: Mean onset strength per beat
+            centroid: Mean spectral centroid per beat in Hz
+            power: Mean square of the K-weighted signal per beat (BS.1770 loudness before the log)
+        """
+        self.times = np.asarray(times, dtype=np.float64)
+        self.chroma = np.asarray(chroma, dtype=np.float32)
+        self.onset = np.asarray(onset, dtype=np.float32)
+        self.centroid = np.asarray(centroid, dtype=np.float32)
+        self.power = np.asarray(power, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.onset)
+
+    @property
+    def durations(self) -> np.ndarray:
+        return np.diff(self.times)
+
+    def alignment_features(self) -> np.ndarray:
+        """
+        Low-dimensional per-beat vectors for alignment (unit length)
+
+        Chroma carries harmony, onset strength and loudness carry arrangement;
+        the latter two are standardized per track so a quieter master still aligns.
+        """
+        def standardized(values):
+            values = np.asarray(values, dtype=np.float32)
+            return (values - values.mean()) / (values.std() + 1e-6)
+
+        chroma = self.chroma / (np.linalg.norm(self.chroma, axis=1, keepdims=True) + 1e-6)
+        level = standardized(10 * np.log10(self.power + 1e-12))
+        features = np.column_stack([chroma, 0.25 * standardized(self.onset), 0.25 * level])
+        return features / (np.linalg.norm(features, axis=1, keepdims=True) + 1e-6)
+
+    def summarize(self, start: int, end: int) -> Dict:
+        """
+        Statistics of the beats [start, end)
+
+        Returns:
+            {'start', 'end' (seconds), 'loudness' (ungated LUFS), 'brightness' (Hz), 'onset_strength'}
+        """
+        weights = self.durations[start:end]
+        total = weights.sum()
+        power = float(np.dot(self.power[start:end], weights) / total) if total > 0 else 0.0
+        return {
+            'start': float(self.times[start]),
+            'end': float(self.times[end]),
+            'loudness': float(-0.691 + 10 * np.log10(power)) if power > 0 else -70.0,
+            'brightness': float(np.dot(self.centroid[start:end], weights) / total) if total > 0 else 0.0,
+            'onset_strength': float(np.dot(self.onset[start:end], weights) / total) if total > 0 else 0.0
+        }
+
+
+def section_boundaries(profile: SectionProfile, min_beats: int = MIN_SECTION_BEATS,
+                       max_sections: int = MAX_SECTIONS) -> List[int]:
+    """
+    Split a track into sections at the strongest novelty peaks
+
+    Novelty at a beat is the distance between the mean features of the
+    NOVELTY_WINDOW beats before and after it (a cheap checkerboard kernel).
+
+    Args:
+        profile: Beat-synchronous features
+        min_beats: Minimum section length in beats
+        max_sections: Maximum number of sections
+
+    Returns:
+        Beat indices of the section starts, plus len(profile) as the final end
+    """
+    beats = len(profile)
+    if beats < 2 * min_beats:
+        return [0, beats]
+
+    features = profile.alignment_features()
+    cumulative = np.vstack([np.zeros((1, features.shape[1])), np.cumsum(features, axis=0)])
+    w = NOVELTY_WINDOW
+    candidates = np.arange(w, beats - w + 1)
+    before = (cumulative[candidates] - cumulative[candidates - w]) / w
+    after = (cumulative[candidates + w] - cumulative[candidates]) / w
+    novelty = np.linalg.norm(after - before, axis=1)
+
+    chosen = []
+    for i in np.argsort(novelty)[::-1]:
+        beat = int(candidates[i])
+        if beat < min_beats or beats - beat < min_beats:
+            continue
+        if all(abs(beat - other) >= min_beats for other in chosen):
+            chosen.append(beat)
+            if len(chosen) == max_sections - 1:
+                break
+    return [0] + sorted(chosen) + [beats]
+
+
+def banded_dtw(x: np.ndarray, y: np.ndarray, band: float = DTW_BAND,
+               min_radius: int = DTW_MIN_RADIUS) -> Tuple[np.ndarray, float]:
+    """
+    Align two feature sequences with DTW restricted to a band around the diagonal
+
+    Only the band is evaluated and stored (one int8 step per cell), so memory is
+    O(len(x) * radius) instead of O(len(x) * len(y)). Each row is computed with
+    vector operations: the left-neighbour recursion is a prefix minimum.
+
+    Args:
+        x: Reference features (n, d), rows of unit length
+        y: Features to align (m, d), rows of unit length
+        band: Band half-width as a fraction of max(n, m)
+        min_radius: Minimum band half-width in rows
+
+    Returns:
+        (path as an (k, 2) array of (i, j) pairs from start to end, mean cost along the path)
+    """
+    n, m = len(x), len(y)
+    # The band centre moves (m - 1) / (n - 1) columns per row; consecutive bands must
+    # overlap for a path to exist (a short reference against a long track)
+    radius = max(min_radius, int(band * max(n, m)), math.ceil((m - 1) / max(n - 1, 1)) + 1)
+    centers = np.round(np.arange(n) * ((m - 1) / max(n - 1, 1))).astype(np.intp)
+    lows = np.clip(centers - radius, 0, m - 1)
+    highs = np.clip(centers + radius + 1, 1, m)
+    width = int((highs - lows).max())
+
+    # 0 = diagonal, 1 = from the row above, 2 = from the left
+    steps = np.zeros((n, width), dtype=np.int8)
+    previous, previous_low = None, 0
+
+    for i in range(n):
+        low, high = lows[i], highs[i]
+        cost = 1.0 - y[low:high] @ x[i]
+
+        if previous is None:
+            arrival = np.full(high - low, np.inf)
+            arrival[0] = 0.0
+            diagonal_wins = np.ones(high - low, dtype=bool)
+        else:
+            # D[i-1, j] and D[i-1, j-1] for the columns of this row (inf outside the previous band)
+            padded = np.concatenate([[np.inf], previous, [np.inf]])
+            columns = np.arange(low, high) - previous_low
+            up = padded[np.clip(columns + 1, 0, len(padded) - 1)]
+            up[(columns < 0) | (columns >= len(previous))] = np.inf
+            diagonal = padded[np.clip(columns, 0, len(padded) - 1)]
+            diagonal[(columns < 1) | (columns > len(previous))] = np.inf
+            diagonal_wins = diagonal <= up
+            arrival = np.minimum(diagonal, up)
+
+        # D[j] = S[j] + min over k <= j of (arrival[k] - S[k-1])
+        cumulative = np.cumsum(cost)
+        offsets = arrival - (cumulative - cost)
+        best = np.minimum.accumulate(offsets)
+        row = cumulative + best
+        steps[i, :high - low] = np.where(offsets > best, 2, np.where(diagonal_wins, 0, 1))
+        previous, previous_low = row, low
+
+    total = previous[m - 1 - previous_low]
+
+    path = []
+    i, j = n - 1, m - 1
+    while True:
+        path.append((i, j))
+        if i == 0 and j == 0:
+            break
+        step = steps[i, j - lows[i]]
+        if i == 0 or step == 2:
+            j -= 1
+        elif step == 1:
+            i -= 1
+        else:
+            i, j = i - 1, j - 1
+    path = np.array(path[::-1], dtype=np.intp)
+    return path, float(total / len(path))
+
+
+def _clock(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+class SectionComparator:
+    """Compare two tracks section by section"""
+
+    def __init__(self, reference: SectionProfile):
+        """
+        Initialize comparator with the reference track
+
+        Args:
+            reference: Beat-synchronous features of the reference track
+        """
+        self.reference = reference
+        self.boundaries = section_boundaries(reference)
+
+        # Loudness difference (LU) limits per status
+        self.loudness_tolerance = {'perfect': 1.0, 'good': 2.0, 'warning': 4.0}
+        # Brightness difference (%) limits per status
+        self.brightness_tolerance = {'perfect': 5, 'good': 15, 'warning': 30}
+
+    def compare(self, your_track: SectionProfile) -> Dict:
+        """
+        Align your track to the reference and compare matching sections
+
+        Args:
+            your_track: Beat-synchronous features of your track
+
+        Returns:
+            {'sections': per-section statistics and differences,
+             'alignment': {'cost'}, 'recommendations': status/message list}
+        """
+        if len(self.reference) < 2 or len(your_track) < 2:
+            return {
+                'sections': [],
+                'alignment': None,
+                'recommendations': [{
+                    'status': 'warning',
+                    'message': "Not enough beats detected to compare sections"
+                }]
+            }
+
+        path, cost = banded_dtw(self.reference.alignment_features(), your_track.alignment_features())
+        first = np.full(len(self.reference), len(your_track), dtype=np.intp)
+        last = np.zeros(len(self.reference), dtype=np.intp)
+        np.minimum.at(first, path[:, 0], path[:, 1])
+        np.maximum.at(last, path[:, 0], path[:, 1])
+
+        sections = []
+        for number, (start, end) in enumerate(zip(self.boundaries[:-1], self.boundaries[1:]), 1):
+            your_start = int(first[start])
+            your_end = max(int(last[end - 1]) + 1, your_start + 1)
+            sections.append(self.compare_section(
+                number, self.reference.summarize(start, end), your_track.summarize(your_start, your_end)
+            ))
+
+        return {
+            'sections': sections,
+            'alignment': {'cost': round(cost, 4)},
+            'recommendations': self.generate_recommendations(sections)
+        }
+
+    def compare_section(self, number: int, reference: Dict, yours: Dict) -> Dict:
+        """Differences of one aligned section pair"""
+        loudness_diff = yours['loudness'] - reference['loudness']
+        brightness_diff = (
+            (yours['brightness'] - reference['brightness']) / reference['brightness'] * 100
+            if reference['brightness'] > 0 else 0.0
+        )
+        onset_diff = (
+            (yours['onset_strength'] - reference['onset_strength']) / reference['onset_strength'] * 100
+            if reference['onset_strength'] > 0 else 0.0
+        )
+        return {
+            'section': number,
+            'reference': reference,
+            'yours': yours,
+            'loudness_diff': round(float(loudness_diff), 2),
+            'brightness_diff_pct': round(float(brightness_diff), 1),
+            'onset_diff_pct': round(float(onset_diff), 1),
+            'status': self.get_status(abs(loudness_diff), abs(brightness_diff))
+        }
+
+    def get_status(self, loudness_diff: float, brightness_diff: float) -> str:
+        """Worst status of the loudness and brightness differences"""
+        order = ['perfect', 'good', 'warning', 'critical']
+
+        def level(value, tolerance):
+            for status in order[:-1]:
+                if value <= tolerance[status]:
+                    return order.index(status)
+            return len(order) - 1
+
+        return order[max(level(loudness_diff, self.loudness_tolerance),
+                         level(brightness_diff, self.brightness_tolerance))]
+
+    def generate_recommendations(self, sections: List[Dict]) -> List[Dict]:
+        """
+        One message per section that is off (warning or critical)
+
+        Args:
+            sections: Output of compare_section
+
+        Returns:
+            Recommendations with status, message and section number
+        """
+        recommendations = []
+        for section in sections:
+            if section['status'] in ('perfect', 'good'):
+                continue
+            reference, yours = section['reference'], section['yours']
+            where = (f"Section {section['section']} ({_clock(yours['start'])}-{_clock(yours['end'])}, "
+                     f"reference {_clock(reference['start'])}-{_clock(reference['end'])})")
+
+            issues = []
+            loudness = section['loudness_diff']
+            if abs(loudness) > self.loudness_tolerance['good']:
+                issues.append(f"{abs(loudness):.1f} LU {'louder' if loudness > 0 else 'quieter'} than the reference")
+            brightness = section['brightness_diff_pct']
+            if abs(brightness) > self.brightness_tolerance['good']:
+                issues.append(f"{abs(brightness):.0f}% {'brighter' if brightness > 0 else 'darker'}")
+
+            recommendations.append({
+                'status': section['status'],
+                'message': f"{where}: {', '.join(issues)}",
+                'section': section['section']
+            })
+
+        if not recommendations:
+            recommendations.append({
+                'status': 'perfect',
+                'message': "Every section is within 2 LU and 15% brightness of the reference"
+            })
+        return recommendations
@@ -0,0 +1,139 @@
+"""
+Background warm-up for the analysis stack
+Imports librosa/scipy/numba, decodes a file through the request-path decoders,
+runs every extractor once to compile librosa's JIT kernels off the request path,
+and keeps numba's compile cache on disk
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default on-disk numba cache (override with NUMBA_CACHE_DIR, e.g. a mounted volume)
+DEFAULT_NUMBA_CACHE_DIR = Path(__file__).parent.parent / ".numba_cache"
+
+_lock = threading.Lock()
+_done = threading.Event()
+_thread: Optional[threading.Thread] = None
+_status: Dict = {'state': 'idle', 'seconds': None, 'error': None}
+
+
+def configure_numba_cache(cache_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Point numba's compile cache at a persistent directory
+
+    Must run before numba is first imported (numba reads NUMBA_CACHE_DIR once).
+    Kernels declared with cache=True are then loaded from disk by later workers
+    instead of being recompiled.
+
+    Args:
+        cache_dir: Cache directory, defaults to NUMBA_CACHE_DIR env or backend/.numba_cache
+
+    Returns:
+        The cache directory in use, or None if it cannot be created
+    """
+    cache_dir = cache_dir or os.environ.get("NUMBA_CACHE_DIR") or str(DEFAULT_NUMBA_CACHE_DIR)
+    try:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning("warmup.numba_cache_unavailable", extra={'cache_dir': cache_dir, 'error': str(e)})
+        return None
+    os.environ["NUMBA_CACHE_DIR"] = cache_dir
+    return cache_dir
+
+
+def _synthetic_signal(seconds: float, sr: int):
+    """Pulsed two-note chord with a panned overtone - exercises beat, pitch and stereo paths"""
+    import numpy as np
+
+    t = np.arange(int(seconds * sr)) / sr
+    pulse = 0.5 + 0.5 * (np.mod(t, 0.5) < 0.1)
+    left = (0.3 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 330 * t)) * pulse
+    right = left + 0.1 * np.sin(2 * np.pi * 440 * t)
+    return np.stack([left, right]).astype(np.float32)
+
+
+def warm_up(sr: int = 11025, resampling: Optional[str] = None):
+    """
+    Import the scientific stack, decode a file and run every registered extractor once
+
+    Args:
+        sr: Analysis sample rate (same as AudioProcessor)
+        resampling: Resampling strategy of the request path (default: core.resampling.DEFAULT)
+    """
+    import tempfile
+    import soundfile as sf
+    from .audio_processor import AudioProcessor
+    from .instrumentation import Timings
+    from .resampling import DEFAULT
+
+    processor = AudioProcessor(sr, resampling=resampling or DEFAULT)
+    strategy = processor.resampling_for(AudioProcessor.ALL_PARAMS)
+
+    # Decode + resample through the same backends as uploads (decoders, core.resampling)
+    native_sr = 44100
+    handle, path = tempfile.mkstemp(suffix='.wav', prefix='warmup_')
+    os.close(handle)
+    try:
+        sf.write(path, _synthetic_signal(4.0, native_sr).T, native_sr, format='WAV')
+        y, _ = processor._load(path, True, Timings(), resampling=strategy)
+        y_stereo, _ = processor._load(path, False, Timings(), resampling=strategy)
+    finally:
+        os.remove(path)
+
+    # Four seconds covers the windowed extractors (loudness, energy curve) as well;
+    # compiles the beat/onset/pitch kernels and fills the numba disk cache
+    processor.analyze_signal(y, sr, AudioProcessor.ALL_PARAMS, y_stereo)
+
+
+def _run(sr: int, resampling: Optional[str]):
+    start = time.perf_counter()
+    try:
+        warm_up(sr, resampling)
+        _status.update(state='done', seconds=round(time.perf_counter() - start, 3))
+        logger.info("warmup.done", extra={'seconds': _status['seconds']})
+    except Exception as e:
+        _status.update(state='failed', error=str(e))
+        logger.warning("warmup.failed", extra={'error': str(e)})
+    finally:
+        _done.set()
+
+
+def start_background_warmup(sr: int = 11025, resampling: Optional[str] = None) -> threading.Thread:
+    """
+    Start warm-up in a daemon thread (only once per process)
+
+    Args:
+        sr: Analysis sample rate
+        resampling: Resampling strategy of the request path
+
+    Returns:
+        The warm-up thread
+    """
+    global _thread
+    with _lock:
+        if _thread is None:
+            _status['state'] = 'running'
+            _thread = threading.Thread(target=_run, args=(sr, resampling), name="analysis-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def is_warm() -> bool:
+    """True once warm-up has finished (successfully or not)"""
+    return _done.is_set()
+
+
+def wait_until_warm(timeout: Optional[float] = None) -> bool:
+    """Block until warm-up has finished; returns False on timeout"""
+    return _done.wait(timeout)
+
+
+def warmup_status() -> Dict:
+    """Return warm-up state ('idle', 'running', 'done', 'failed') and duration"""
+    return dict(_status)
@@ -0,0 +1,185 @@
+"""
+HTTP caching for the frontend and reports
+
+Static assets are referenced with a content hash (/static/js/app.js?v=<hash>);
+a request carrying the current hash is cached for a year as immutable, any
+other request revalidates. index.html is served with those URLs, an ETag and
+the newest mtime of the page and its assets as Last-Modified. Conditional
+requests (If-None-Match / If-Modified-Since) are answered with 304.
+"""
+
+import hashlib
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# src="/static/..." and href="/static/..." (an existing ?v=... is replaced)
+_STATIC_REF = re.compile(r'(?P<attr>(?:src|href)=")/static/(?P<path>[^"?#]+)(?:\?[^"#]*)?"')
+
+
+def content_hash(data: bytes) -> str:
+    """Short content hash used in asset URLs and ETags"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def is_not_modified(request_headers: Headers, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """
+    Decide whether a conditional request can be answered with 304
+
+    Args:
+        request_headers: Headers of the incoming request
+        etag: Current (quoted) ETag of the resource
+        last_modified: Current Last-Modified (HTTP date) of the resource
+
+    Returns:
+        True if the client's copy is still current
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag is not None and (etag in candidates or "*" in candidates)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 carrying the validators and caching headers of the full response"""
+    keep = ("etag", "last-modified", "cache-control", "vary")
+    return Response(status_code=304, headers={k: v for k, v in headers.items() if k.lower() in keep})
+
+
+class AssetManifest:
+    """Content hashes of the files under the static directory"""
+
+    def __init__(self, static_dir: Path):
+        """
+        Initialize manifest
+
+        Args:
+            static_dir: Directory mounted at /static
+        """
+        self.static_dir = Path(static_dir)
+        self._hashes: Dict[str, tuple] = {}
+
+    def version(self, path: str) -> Optional[str]:
+        """
+        Content hash of a static file (recomputed only when its mtime/size change)
+
+        Args:
+            path: Path relative to the static directory
+
+        Returns:
+            Hash, or None if the file does not exist
+        """
+        full_path = self.static_dir / path
+        try:
+            stat = full_path.stat()
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, content_hash(full_path.read_bytes()))
+            self._hashes[path] = cached
+        return cached[1]
+
+    def url(self, path: str) -> str:
+        """Versioned URL of a static file"""
+        version = self.version(path)
+        return f"/static/{path}?v={version}" if version else f"/static/{path}"
+
+    def last_modified(self, html: str) -> float:
+        """Latest modification time (seconds) of the static files an HTML page references"""
+        mtimes = [0.0]
+        for match in _STATIC_REF.finditer(html):
+            try:
+                mtimes.append((self.static_dir / match.group("path")).stat().st_mtime)
+            except OSError:
+                continue
+        return max(mtimes)
+
+    def render(self, html: str) -> str:
+        """Point every /static reference in an HTML page at its versioned URL"""
+        return _STATIC_REF.sub(lambda m: f'{m.group("attr")}{self.url(m.group("path"))}"', html)
+
+
+class HTMLPage:
+    """An HTML file served with versioned asset URLs"""
+
+    def __init__(self, path: Path, manifest: AssetManifest):
+        """
+        Initialize page
+
+        Args:
+            path: HTML file
+            manifest: Asset hashes used to version its /static references
+        """
+        self.path = Path(path)
+        self.manifest = manifest
+        self._source = ""
+        self._source_signature = None
+        self.body = b""
+        self.etag = ""
+        self.last_modified = ""
+        self._mtime = 0.0
+
+    def refresh(self):
+        """Re-read the page if it changed on disk and re-apply the current asset versions"""
+        stat = self.path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._source_signature:
+            self._source = self.path.read_text(encoding="utf-8")
+            self._source_signature = signature
+
+        body = self.manifest.render(self._source).encode("utf-8")
+        if body != self.body:
+            self.body = body
+            self.etag = f'"{content_hash(body)}"'
+            # The body embeds the asset versions: a changed asset changes the page even
+            # when index.html itself is older (If-Modified-Since must not answer 304).
+            # Never moves back, e.g. when an asset is replaced by an older file
+            self._mtime = max(self._mtime, stat.st_mtime, self.manifest.last_modified(self._source))
+            self.last_modified = formatdate(self._mtime, usegmt=True)
+
+    def response(self, request_headers: Headers) -> Response:
+        """Full page or 304"""
+        self.refresh()
+        headers = {"ETag": self.etag, "Last-Modified": self.last_modified, "Cache-Control": REVALIDATE}
+        if is_not_modified(request_headers, self.etag, self.last_modified):
+            return not_modified_response(headers)
+        return Response(self.body, media_type="text/html", headers=headers)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks content-hashed requests as immutable"""
+
+    def __init__(self, *args, manifest: AssetManifest, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        requested = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("v", [None])[0]
+        relative = os.path.relpath(full_path, self.manifest.static_dir).replace(os.sep, "/")
+        if requested and requested == self.manifest.version(relative):
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            response.headers["Cache-Control"] = REVALIDATE
+        return response
@@ -0,0 +1,270 @@
+"""
+Background cleanup of sessions, uploads and reports
+
+Sessions expire after SESSION_TTL_SECONDS without access; their upload
+directory and report are deleted with them. Upload directories and reports
+no worker knows about (other worker, previous process) expire by mtime.
+When uploads + reports exceed DISK_QUOTA_MB, the least recently used
+entries are evicted. Persisted results (database) are kept, so an expired
+analysis can still be re-opened.
+
+Environment:
+    SESSION_TTL_SECONDS       idle time before a session expires (default 7200)
+    DISK_QUOTA_MB             limit for uploads + reports (default 2048)
+    JANITOR_INTERVAL_SECONDS  time between sweeps (default 300)
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.decode_cache import DecodeCache
+from core.instrumentation import metrics
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", 2 * 3600))
+DISK_QUOTA_BYTES = int(float(os.environ.get("DISK_QUOTA_MB", 2048)) * 1024 * 1024)
+JANITOR_INTERVAL_SECONDS = int(os.environ.get("JANITOR_INTERVAL_SECONDS", 300))
+
+# Entries used this recently are never evicted for quota (their analysis may still be running)
+QUOTA_GRACE_SECONDS = 120
+# Upload directories are re-stamped at most this often, so other workers see them as in use
+TOUCH_INTERVAL_SECONDS = 60
+
+
+class SessionStore(dict):
+    """In-memory sessions that remember when each one was last used"""
+
+    def __init__(self, upload_dir: Optional[Path] = None):
+        super().__init__()
+        self.upload_dir = upload_dir
+        self.last_access: Dict[str, float] = {}
+        self._touched_dir: Dict[str, float] = {}
+
+    def touch(self, session_id: str):
+        """Mark a session as used now"""
+        now = time.time()
+        self.last_access[session_id] = now
+        if self.upload_dir is not None and now - self._touched_dir.get(session_id, 0) > TOUCH_INTERVAL_SECONDS:
+            self._touched_dir[session_id] = now
+            try:
+                os.utime(self.upload_dir / session_id)
+            except OSError:
+                pass
+
+    def __setitem__(self, session_id, session):
+        super().__setitem__(session_id, session)
+        self.touch(session_id)
+
+    def __getitem__(self, session_id):
+        session = super().__getitem__(session_id)
+        self.touch(session_id)
+        return session
+
+    def get(self, session_id, default=None):
+        if session_id in self:
+            return self[session_id]
+        return default
+
+    def __delitem__(self, session_id):
+        super().__delitem__(session_id)
+        self.last_access.pop(session_id, None)
+        self._touched_dir.pop(session_id, None)
+
+    def pop(self, session_id, *default):
+        self.last_access.pop(session_id, None)
+        self._touched_dir.pop(session_id, None)
+        return super().pop(session_id, *default)
+
+
+def _path_size(path: Path) -> int:
+    """Total size in bytes of a file or directory tree"""
+    try:
+        if path.is_file():
+            return path.stat().st_size
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.stat(os.path.join(root, name)).st_size
+                except OSError:
+                    pass
+        return total
+    except OSError:
+        return 0
+
+
+def _remove(path: Path) -> int:
+    """Delete a file or directory tree, returning the bytes freed"""
+    size = _path_size(path)
+    try:
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+        else:
+            return 0
+    except OSError as e:
+        logger.warning("janitor.remove_failed", extra={"path": str(path), "error": str(e)})
+        return 0
+    return size
+
+
+class Janitor:
+    """Periodically expire sessions and keep uploads + reports under the disk quota"""
+
+    def __init__(self, sessions: SessionStore, upload_dir: Path, reports_dir: Path,
+                 ttl_seconds: int = SESSION_TTL_SECONDS, quota_bytes: int = DISK_QUOTA_BYTES,
+                 interval_seconds: int = JANITOR_INTERVAL_SECONDS,
+                 decode_cache: Optional[DecodeCache] = None):
+        """
+        Initialize janitor
+
+        Args:
+            sessions: Session store of this worker
+            upload_dir: Root of per-session upload directories
+            reports_dir: Directory of generated reports ({session_id}_report.html)
+            ttl_seconds: Idle time before a session expires
+            quota_bytes: Disk limit for uploads + reports
+            interval_seconds: Time between sweeps
+            decode_cache: Decoded audio cache whose index must forget deleted upload directories
+        """
+        self.sessions = sessions
+        self.upload_dir = upload_dir
+        self.reports_dir = reports_dir
+        self.ttl_seconds = ttl_seconds
+        self.quota_bytes = quota_bytes
+        self.interval_seconds = interval_seconds
+        self.decode_cache = decode_cache
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def report_path(self, session_id: str) -> Path:
+        return self.reports_dir / f"{session_id}_report.html"
+
+    def purge_session(self, session_id: str, reason: str = "deleted") -> int:
+        """
+        Drop a session with its uploads and report
+
+        Args:
+            session_id: Session to remove
+            reason: Metrics label ('deleted', 'expired', 'quota')
+
+        Returns:
+            Bytes reclaimed
+        """
+        self.sessions.pop(session_id, None)
+        reclaimed = self._remove_uploads(session_id) + _remove(self.report_path(session_id))
+        self._record(reclaimed, reason)
+        return reclaimed
+
+    def _remove_uploads(self, session_id: str) -> int:
+        """Delete a session's upload directory and drop its decoded signals from the cache index"""
+        freed = _remove(self.upload_dir / session_id)
+        if self.decode_cache is not None:
+            self.decode_cache.evict_session(session_id)
+        return freed
+
+    def _remove_entry(self, session_id: str, path: Path) -> int:
+        """Delete an upload directory or report found on disk"""
+        if path.parent == self.upload_dir:
+            return self._remove_uploads(session_id)
+        return _remove(path)
+
+    def _record(self, reclaimed: int, reason: str):
+        metrics.inc("janitor_reclaimed_bytes_total", reclaimed,
+                    "Bytes of uploads and reports deleted by the janitor", {"reason": reason})
+        metrics.inc("janitor_removed_entries_total", 1,
+                    "Sessions, upload directories and reports removed by the janitor", {"reason": reason})
+
+    def _entries(self) -> List[Tuple[float, str, Path]]:
+        """All upload directories and reports as (last use, session id, path)"""
+        entries = []
+        for root, suffix in ((self.upload_dir, ""), (self.reports_dir, "_report.html")):
+            try:
+                children = list(root.iterdir())
+            except OSError:
+                continue
+            for path in children:
+                if suffix and not path.name.endswith(suffix):
+                    continue
+                session_id = path.name[:-len(suffix)] if suffix else path.name
+                try:
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    continue
+                entries.append((max(mtime, self.sessions.last_access.get(session_id, 0)), session_id, path))
+        return entries
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Run one cleanup pass
+
+        Returns:
+            Bytes reclaimed per reason
+        """
+        now = now or time.time()
+        reclaimed = {"expired": 0, "orphan": 0, "quota": 0}
+
+        # 1. Sessions of this worker idle for longer than the TTL
+        for session_id, last_access in list(self.sessions.last_access.items()):
+            if now - last_access > self.ttl_seconds:
+                reclaimed["expired"] += self.purge_session(session_id, "expired")
+
+        # 2. Files nobody here owns (other worker, earlier process) and not modified within the TTL
+        entries = []
+        for last_use, session_id, path in self._entries():
+            if session_id not in self.sessions and now - last_use > self.ttl_seconds:
+                freed = self._remove_entry(session_id, path)
+                self._record(freed, "orphan")
+                reclaimed["orphan"] += freed
+            else:
+                entries.append((last_use, session_id, path))
+
+        # 3. Disk quota - evict least recently used first
+        usage = sum(_path_size(path) for _, _, path in entries)
+        if usage > self.quota_bytes:
+            for last_use, session_id, path in sorted(entries, key=lambda entry: entry[0]):
+                if usage <= self.quota_bytes:
+                    break
+                # A session's report may already be gone with its upload directory
+                if now - last_use < QUOTA_GRACE_SECONDS or not path.exists():
+                    continue
+                if session_id in self.sessions:
+                    freed = self.purge_session(session_id, "quota")
+                else:
+                    freed = self._remove_entry(session_id, path)
+                    self._record(freed, "quota")
+                reclaimed["quota"] += freed
+                usage -= freed
+
+        metrics.set_gauge("janitor_disk_usage_bytes", max(0, usage),
+                          "Bytes used by uploads and reports after the last sweep")
+        metrics.set_gauge("janitor_sessions", len(self.sessions), "Sessions held in memory by this worker")
+        if any(reclaimed.values()):
+            logger.info("janitor.swept", extra={"reclaimed_bytes": reclaimed, "disk_usage_bytes": usage,
+                                                "sessions": len(self.sessions)})
+        return reclaimed
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("janitor.sweep_failed")
+
+    def start(self) -> threading.Thread:
+        """Start sweeping in a daemon thread (only once)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="janitor", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Stop the sweeping thread"""
+        self._stop.set()
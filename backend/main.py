@@ -3,30 +3,52 @@ FastAPI Backend for Audio Playlist Analyzer
 Web version of THE ALGORITHM
 """
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from typing import List, Optional
 import os
-import shutil
 import json
+import logging
+import threading
+import time
 from pathlib import Path
 import uuid
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 
 # Import database and models for authentication
-import models, database, schemas, auth
+import models, database, schemas, auth, results_store
+from responses import NumpyJSONResponse
+from http_cache import AssetManifest, CachedStaticFiles, HTMLPage, is_not_modified, not_modified_response
+from logging_config import configure_logging, bind_job, request_id_var
+from janitor import Janitor, SessionStore
 
 # Import analysis modules
-from core.audio_processor import AudioProcessor
+# core.audio_processor (librosa, scipy, numba, pyloudnorm) is imported lazily by
+# get_audio_processor() so workers boot and answer /health immediately
+from core.feature_matrix import FeatureMatrix
 from core.playlist_comparator import PlaylistComparator
 from core.track_comparator import TrackComparator
+from core.section_comparator import SectionComparator
 from core.report_generator import ReportGenerator
+from core.instrumentation import Timings, metrics
+from core.curves import CurveRecorder
+from core.decode_cache import DecodeCache
+from core import warmup
 
-app = FastAPI(title="The Algorithm", description="Decode Spotify's DNA")
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Persistent numba compile cache - set before the analysis stack is first imported
+warmup.configure_numba_cache()
+
+app = FastAPI(title="The Algorithm", description="Decode Spotify's DNA",
+              default_response_class=NumpyJSONResponse)
 
 # CORS middleware for development
 app.add_middleware(
@@ -37,11 +59,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database initialization
-# TEMPORARILY DISABLED: Authentication suspended for public beta
-# @app.on_event("startup")
-# def on_startup():
-#     models.Base.metadata.create_all(bind=database.engine)
+# Response compression - analysis/comparison JSON shrinks ~5-10x. Brotli is used when
+# brotli-asgi is installed (falls back to gzip for clients without br support)
+COMPRESSION_MIN_SIZE = 1024
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=6)
+
+
+@app.middleware("http")
+async def request_context(request, call_next):
+    """Assign a correlation id to every request and log its total latency"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        logger.info("request.completed", extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+        request_id_var.reset(token)
+
+@app.on_event("startup")
+def start_warmup():
+    """Pre-load the analysis stack and compile numba kernels in the background"""
+    if os.environ.get("WARMUP_ON_STARTUP", "1") != "0":
+        warmup.start_background_warmup(resampling=results_store.RESAMPLING)
+
+
+# Database initialization (users and persisted analysis results)
+@app.on_event("startup")
+def on_startup():
+    try:
+        models.Base.metadata.create_all(bind=database.engine)
+    except SQLAlchemyError as e:
+        # Both workers start at once; the loser of the CREATE TABLE race finds the tables in place
+        logger.warning("database.init_failed", extra={"error": str(e)})
 
 # AUTHENTICATION ENDPOINTS
 @app.post("/auth/register", response_model=schemas.User)
@@ -78,31 +141,258 @@ def login_for_access_token(
 BASE_DIR = Path(__file__).parent
 FRONTEND_DIR = BASE_DIR.parent / "frontend"
 
+# Content-hashed /static URLs, substituted into index.html when it is served
+asset_manifest = AssetManifest(FRONTEND_DIR / "static")
+index_page = HTMLPage(FRONTEND_DIR / "index.html", asset_manifest)
+
 # Create necessary directories
 UPLOAD_DIR = BASE_DIR / "uploads"
 REPORTS_DIR = BASE_DIR / "reports"
 UPLOAD_DIR.mkdir(exist_ok=True)
 REPORTS_DIR.mkdir(exist_ok=True)
 
-# Initialize processors
-audio_processor = AudioProcessor()
+# Ephemeral upload mode: audio is deleted right after feature extraction; only
+# features and content hashes are kept. Re-analysis with other parameters is
+# served from the feature cache or asks for a re-upload (410).
+EPHEMERAL_UPLOADS = os.environ.get("EPHEMERAL_UPLOADS", "0") == "1"
 
-# In-memory storage for session data - TODO: Move to database later
-sessions = {}
+# Preview batches analyze only this many seconds (the highest-energy excerpt) per track
+PREVIEW_SECONDS = float(os.environ.get("PREVIEW_SECONDS", 30))
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the frontend"""
-    frontend_path = FRONTEND_DIR / "index.html"
-    if frontend_path.exists():
-        return FileResponse(
-            frontend_path,
-            headers={
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0"
+# Playlist tracks decoded and analyzed together (AudioProcessor.analyze_files); every
+# signal of a batch and its stacked spectrograms are held in memory at once. 1 analyzes
+# track by track, which is faster and leaner on the benchmarks so far
+PLAYLIST_BATCH_SIZE = max(1, int(os.environ.get("PLAYLIST_BATCH_SIZE", 1)))
+
+# Decoded, resampled signals kept per session (memory-mapped .npy) so re-analysis skips decoding
+decode_cache = DecodeCache(int(float(os.environ.get("DECODE_CACHE_MB", 1024)) * 1024 * 1024))
+
+# Initialize processors lazily - the first analysis (or the warm-up thread) pays the import cost
+_audio_processor = None
+_audio_processor_lock = threading.Lock()
+
+
+def get_audio_processor():
+    """Return the shared AudioProcessor, importing the scientific stack on first use"""
+    global _audio_processor
+    if _audio_processor is None:
+        with _audio_processor_lock:
+            if _audio_processor is None:
+                from core.audio_processor import AudioProcessor
+                _audio_processor = AudioProcessor(aggregation=results_store.FEATURE_AGGREGATION,
+                                                  decode_cache=decode_cache,
+                                                  resampling=results_store.RESAMPLING)
+    return _audio_processor
+
+# In-memory storage for session data (results are persisted via results_store);
+# idle sessions and their files are expired by the janitor
+sessions = SessionStore(UPLOAD_DIR)
+janitor = Janitor(sessions, UPLOAD_DIR, REPORTS_DIR, decode_cache=decode_cache)
+
+
+@app.on_event("startup")
+def start_janitor():
+    """Expire idle sessions and enforce the upload/report disk quota in the background"""
+    if os.environ.get("JANITOR_ENABLED", "1") != "0":
+        janitor.start()
+
+
+@app.on_event("shutdown")
+def stop_janitor():
+    janitor.stop()
+
+
+def flag(value) -> bool:
+    """Interpret an optional boolean flag (timings, curves, preview) from JSON bodies and form fields"""
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def parse_fields(value) -> list:
+    """Accept a list or a comma-separated string of field names"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(field).strip() for field in value if str(field).strip()]
+
+
+def select_fields(payload, fields: list):
+    """
+    Keep only the requested fields of a response
+
+    Dotted names select inside nested objects and apply to every item of a list,
+    e.g. ["recommendations.filename", "recommendations.recommendations"].
+    Without fields the payload is returned unchanged.
+    """
+    if not fields:
+        return payload
+
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = field.split(".")
+        for i, part in enumerate(parts):
+            if node.get(part, {}) is None:
+                break  # parent already selected whole
+            if i == len(parts) - 1:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})
+
+    def pick(value, spec):
+        if spec is None:
+            return value
+        if isinstance(value, list):
+            return [pick(item, spec) for item in value]
+        if isinstance(value, dict):
+            return {key: pick(value[key], sub) for key, sub in spec.items() if key in value}
+        return value
+
+    return pick(payload, tree)
+
+
+def timings_entry(filename: str, timings: Timings) -> dict:
+    """Format one track's stage timings for the API response"""
+    return {
+        "filename": filename,
+        "totals_ms": timings.totals(),
+        "stages": timings.as_list()
+    }
+
+
+def lookup_cached_features(db: Session, content_hashes, params: list) -> dict:
+    """Features and durations stored for these files and parameters (empty if the database is unavailable)"""
+    try:
+        return results_store.cached_features(db, content_hashes, params)
+    except SQLAlchemyError as e:
+        logger.warning("store.read_failed", extra={"error": str(e)})
+        return {}
+    finally:
+        # Return the connection to the pool while the (long) analysis runs
+        db.close()
+
+
+def is_upload_id(session_id: str) -> bool:
+    """True for ids in the form the upload endpoints issue (uuid4 strings)"""
+    try:
+        return str(uuid.UUID(session_id)) == session_id
+    except ValueError:
+        return False
+
+
+def decode_key(session_id: str, content_hash: Optional[str]) -> Optional[str]:
+    """Decode cache key of an uploaded file (None if its content hash is unknown)"""
+    return DecodeCache.key(UPLOAD_DIR / session_id, content_hash) if content_hash else None
+
+
+def analyze_or_cached(file_path, content_hash: Optional[str], params: list, cached: dict, timings: Timings,
+                      curves: Optional[CurveRecorder] = None, preview_seconds: Optional[float] = None,
+                      cache_key: Optional[str] = None):
+    """Return stored features for an already analyzed file, otherwise analyze it (or a preview excerpt)"""
+    if content_hash in cached:
+        return dict(cached[content_hash]["features"])
+    return get_audio_processor().analyze_file(str(file_path), additional_params=params, timings=timings,
+                                              curves=curves, preview_seconds=preview_seconds,
+                                              cache_key=cache_key)
+
+
+def without_curve_tracks(cached: dict, file_hashes: dict) -> dict:
+    """
+    Stored features to use when curves are requested
+
+    Curves come out of the analysis pass, and stored features have none: files whose
+    audio is still on disk are analyzed again. Files already deleted (ephemeral mode)
+    keep their stored features and are reported without curves.
+
+    Args:
+        cached: Stored features by content hash (lookup_cached_features)
+        file_hashes: Content hash by file path
+
+    Returns:
+        The stored features of the files without audio
+    """
+    on_disk = {content_hash for file_path, content_hash in file_hashes.items() if Path(file_path).exists()}
+    return {content_hash: stored for content_hash, stored in cached.items() if content_hash not in on_disk}
+
+
+def require_audio(file_paths: list, file_hashes: dict, cached: dict):
+    """Raise 410 if files that still need analysis were already deleted (ephemeral mode)"""
+    missing = [
+        Path(file_path).name for file_path in file_paths
+        if file_hashes.get(file_path) not in cached and not Path(file_path).exists()
+    ]
+    if missing:
+        raise HTTPException(
+            status_code=410,
+            detail={
+                "message": "Audio was discarded after analysis. Please re-upload these tracks to analyze new parameters.",
+                "missing": missing
             }
         )
+
+
+def release_audio(file_path, cache_key: Optional[str] = None):
+    """Delete an uploaded file and its decoded signals once its features are extracted (ephemeral mode only)"""
+    if not EPHEMERAL_UPLOADS:
+        return
+    if cache_key:
+        decode_cache.discard(cache_key)
+    try:
+        size = os.path.getsize(file_path)
+        os.remove(file_path)
+    except OSError:
+        return
+    metrics.inc("ephemeral_released_bytes_total", size, "Bytes of uploaded audio deleted right after extraction")
+
+
+def stored_records(records: list, cached: dict) -> list:
+    """Track records to store: those whose features were not read from the database"""
+    return [record for record in records if record["content_hash"] not in cached]
+
+
+def track_record(file_path, content_hash: Optional[str], features: dict, cached: dict,
+                 role: str = "playlist") -> dict:
+    """
+    Describe an analyzed track for results_store
+
+    Tracks served from the feature cache keep their stored duration: their upload may be
+    deleted already (ephemeral mode), and reading it back is DSP work they otherwise skip.
+    """
+    if content_hash in cached:
+        duration = cached[content_hash]["duration"]
+    else:
+        duration = get_audio_processor().get_duration(str(file_path))
+    return {
+        "content_hash": content_hash or results_store.file_hash(file_path),
+        "filename": features["filename"],
+        "role": role,
+        "duration": duration,
+        "features": {k: v for k, v in features.items() if k != "filename"}
+    }
+
+
+def session_comparator(session: dict) -> PlaylistComparator:
+    """PlaylistComparator for a session, built once from its stored profile"""
+    comparator = session.get("comparator")
+    if comparator is None:
+        comparator = PlaylistComparator.from_profile(session["playlist_profile"], session.get("playlist_matrix"))
+        session["comparator"] = comparator
+    return comparator
+
+
+def persist(db: Session, write, *args, **kwargs):
+    """Store analysis results; a storage error is logged and never fails the request"""
+    try:
+        write(db, *args, **kwargs)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning("store.write_failed", extra={"operation": write.__name__, "error": str(e)})
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the frontend (asset URLs carry content hashes; revalidated via ETag)"""
+    if index_page.path.exists():
+        return index_page.response(request.headers)
     return {"message": "The Algorithm API is running. Frontend not found."}
 
 
@@ -127,21 +417,22 @@ async def upload_playlist(
     session_dir = UPLOAD_DIR / session_id / "playlist"
     session_dir.mkdir(parents=True, exist_ok=True)
 
-    # Save files
+    # Save files (hashed while writing - the hash keys stored features)
     saved_files = []
+    file_hashes = {}
     for file in files:
         if not file.filename.lower().endswith(('.mp3', '.wav', '.flac')):
             continue
 
         file_path = session_dir / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_hashes[str(file_path)] = results_store.save_upload(file.file, file_path)
         saved_files.append(str(file_path))
 
     # Initialize session
     sessions[session_id] = {
         "playlist_files": saved_files,
         "user_files": [],
+        "file_hashes": file_hashes,
         "playlist_profile": None
     }
 
@@ -169,13 +460,13 @@ async def upload_user_tracks(
     session_dir.mkdir(parents=True, exist_ok=True)
 
     saved_files = []
+    file_hashes = sessions[session_id].setdefault("file_hashes", {})
     for file in files:
         if not file.filename.lower().endswith(('.mp3', '.wav', '.flac')):
             continue
 
         file_path = session_dir / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_hashes[str(file_path)] = results_store.save_upload(file.file, file_path)
         saved_files.append(str(file_path))
 
     sessions[session_id]["user_files"] = saved_files
@@ -189,6 +480,7 @@ async def upload_user_tracks(
 @app.post("/api/analyze/playlist")
 async def analyze_playlist(
     request: dict,
+    db: Session = Depends(database.get_db),
     # TEMPORARILY DISABLED: Authentication suspended for public beta
     # current_user: models.User = Depends(auth.get_current_user)
 ):
@@ -197,6 +489,8 @@ async def analyze_playlist(
     """
     session_id = request.get("session_id")
     additional_params = request.get("additional_params", [])
+    include_timings = flag(request.get("timings"))
+    fields = parse_fields(request.get("fields"))
 
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -212,20 +506,64 @@ async def analyze_playlist(
             detail="Please select at least one parameter to analyze"
         )
 
-    # Analyze all tracks
+    # Analyze all tracks (files analyzed before with the same parameters are read from the database)
     results = []
     errors = []
-
-    for i, file_path in enumerate(playlist_files):
-        try:
-            features = audio_processor.analyze_file(file_path, additional_params=additional_params)
-            if features:
-                features['filename'] = Path(file_path).name
-                results.append(features)
-            else:
-                errors.append(f"{Path(file_path).name}: No parameters selected")
-        except Exception as e:
-            errors.append(f"{Path(file_path).name}: {str(e)}")
+    track_timings = []
+    stored_tracks = []
+    file_hashes = sessions[session_id].get("file_hashes", {})
+    cached = lookup_cached_features(db, file_hashes.values(), additional_params)
+    require_audio(playlist_files, file_hashes, cached)
+
+    with bind_job(session_id):
+        # With PLAYLIST_BATCH_SIZE > 1, tracks without stored features are analyzed in
+        # batches sharing the stacked mel/chroma filterbank projections
+        track_timings_by_file = {file_path: Timings(trace_memory=include_timings) for file_path in playlist_files}
+        analyzed = {}
+        if PLAYLIST_BATCH_SIZE > 1:
+            pending = [file_path for file_path in playlist_files if file_hashes.get(file_path) not in cached]
+            for start in range(0, len(pending), PLAYLIST_BATCH_SIZE):
+                batch = pending[start:start + PLAYLIST_BATCH_SIZE]
+                try:
+                    analyzed.update(zip(batch, get_audio_processor().analyze_files(
+                        batch, additional_params,
+                        [track_timings_by_file[file_path] for file_path in batch],
+                        [decode_key(session_id, file_hashes.get(file_path)) for file_path in batch]
+                    )))
+                except Exception as e:
+                    analyzed.update((file_path, e) for file_path in batch)
+
+        for i, file_path in enumerate(playlist_files):
+            try:
+                timings = track_timings_by_file[file_path]
+                content_hash = file_hashes.get(file_path)
+                cache_key = decode_key(session_id, content_hash)
+                if file_path in analyzed:
+                    features = analyzed[file_path]
+                    if isinstance(features, Exception):
+                        raise features
+                else:
+                    features = analyze_or_cached(file_path, content_hash, additional_params, cached,
+                                                 timings, cache_key=cache_key)
+                if include_timings:
+                    track_timings.append(timings_entry(Path(file_path).name, timings))
+                if features:
+                    features['filename'] = Path(file_path).name
+                    results.append(features)
+                    stored_tracks.append(track_record(file_path, content_hash, features, cached))
+                    release_audio(file_path, cache_key)
+                else:
+                    errors.append(f"{Path(file_path).name}: No parameters selected")
+            except Exception as e:
+                errors.append(f"{Path(file_path).name}: {str(e)}")
+
+    logger.info("playlist.analyzed", extra={
+        "session_id": session_id,
+        "tracks": len(results),
+        "errors": len(errors),
+        "cached": sum(1 for h in file_hashes.values() if h in cached),
+        "param_count": len(additional_params)
+    })
 
     if not results:
         raise HTTPException(
@@ -234,33 +572,52 @@ async def analyze_playlist(
         )
 
     # Create playlist profile
-    comparator = PlaylistComparator(results)
+    matrix = FeatureMatrix.from_tracks(results)
+    comparator = PlaylistComparator(matrix)
     profile = comparator.get_playlist_profile()
 
     # Store in session
     sessions[session_id]["playlist_profile"] = profile
-    sessions[session_id]["playlist_analysis"] = results
+    sessions[session_id]["playlist_matrix"] = matrix
+    sessions[session_id]["comparator"] = comparator
+    persist(db, results_store.save_playlist, session_id, additional_params, profile, stored_tracks)
 
-    return {
+    response = {
         "tracks_analyzed": len(results),
         "errors": errors,
         "profile": profile,
         "message": "Playlist analysis complete"
     }
+    if include_timings:
+        response["timings"] = track_timings
+    return NumpyJSONResponse(select_fields(response, fields))
 
 
 @app.post("/api/compare/batch")
 async def compare_batch(
     request: dict,
+    db: Session = Depends(database.get_db),
     # TEMPORARILY DISABLED: Authentication suspended for public beta
     # current_user: models.User = Depends(auth.get_current_user)
 ):
     """
     Compare user tracks against playlist profile
     Returns recommendations for all tracks
+    With {"curves": true}, also returns delta-encoded time-series curves per filename
+    (tracks are then analyzed even if their features are stored). Tracks whose audio was
+    discarded (ephemeral mode) are compared from stored features and listed in
+    "curves_unavailable" instead.
+    With {"preview": true}, tracks without stored features are analyzed on their
+    highest-energy 30 s only; their recommendations are marked approximate. Running
+    the batch again without the flag upgrades them to full analyses from the signal
+    the preview already decoded.
     """
     session_id = request.get("session_id")
     additional_params = request.get("additional_params", [])
+    include_timings = flag(request.get("timings"))
+    include_curves = flag(request.get("curves"))
+    preview_seconds = PREVIEW_SECONDS if flag(request.get("preview")) else None
+    fields = parse_fields(request.get("fields"))
 
     # Validate that parameters are selected
     if not additional_params or len(additional_params) == 0:
@@ -286,33 +643,82 @@ async def compare_batch(
 
     # Analyze user tracks with additional parameters
     user_results = []
-    for file_path in user_files:
-        try:
-            features = audio_processor.analyze_file(file_path, additional_params=additional_params)
-            if features:
-                features['filename'] = Path(file_path).name
-                user_results.append(features)
-        except Exception as e:
-            print(f"Error analyzing {file_path}: {e}")
+    track_timings = []
+    track_curves = {}
+    curves_unavailable = []
+    stored_tracks = []
+    excerpts = {}
+    file_hashes = session.get("file_hashes", {})
+    cached = lookup_cached_features(db, file_hashes.values(), additional_params)
+    if include_curves:
+        cached = without_curve_tracks(cached, file_hashes)
+    require_audio(user_files, file_hashes, cached)
+    with bind_job(session_id):
+        for file_path in user_files:
+            try:
+                timings = Timings(trace_memory=include_timings)
+                curves = CurveRecorder() if include_curves else None
+                content_hash = file_hashes.get(file_path)
+                cache_key = decode_key(session_id, content_hash)
+                features = analyze_or_cached(file_path, content_hash, additional_params, cached, timings, curves,
+                                             preview_seconds, cache_key)
+                if include_timings:
+                    track_timings.append(timings_entry(Path(file_path).name, timings))
+                if features:
+                    features['filename'] = Path(file_path).name
+                    user_results.append(features)
+                    if curves is not None and content_hash in cached:
+                        curves_unavailable.append(features['filename'])
+                    elif curves is not None:
+                        track_curves[features['filename']] = curves.as_dict()
+                    stored_tracks.append(track_record(file_path, content_hash, features, cached, role="user"))
+                    if 'preview' in features:
+                        # Keep the upload and its decoded signal for the upgrade
+                        excerpts[features['filename']] = features['preview']
+                    else:
+                        release_audio(file_path, cache_key)
+            except Exception as e:
+                logger.warning("batch.track_failed", extra={"file": Path(file_path).name, "error": str(e)})
 
     # Compare against playlist
-    comparator = PlaylistComparator(session["playlist_analysis"])
+    comparator = session_comparator(session)
+    user_matrix = FeatureMatrix.from_tracks(user_results)
     recommendations = []
 
-    for track in user_results:
-        comparison = comparator.compare_track(track)
+    for filename, comparison in zip(user_matrix.filenames, comparator.compare_tracks(user_matrix)):
         recommendations.append({
-            "filename": track["filename"],
+            "filename": filename,
             "comparison": comparison,
             "recommendations": comparator.generate_recommendations(comparison)
         })
+        if filename in excerpts:
+            recommendations[-1].update(approximate=True, excerpt=excerpts[filename])
 
     session["recommendations"] = recommendations
-
-    return {
+    session["user_matrix"] = user_matrix
+    # Preview features are never stored as the tracks' features, so a later run analyzes them in full;
+    # features read from the database are stored already
+    persist(db, results_store.save_comparisons, session_id, "preview" if excerpts else "batch", additional_params,
+            [track for track in stored_tracks
+             if track["filename"] not in excerpts and track["content_hash"] not in cached], [{
+                "content_hash": track["content_hash"],
+                "filename": track["filename"],
+                "result": result
+            } for track, result in zip(stored_tracks, recommendations)])
+
+    response = {
         "tracks_compared": len(recommendations),
         "recommendations": recommendations
     }
+    if excerpts:
+        response["approximate"] = sorted(excerpts)
+    if include_timings:
+        response["timings"] = track_timings
+    if include_curves:
+        response["curves"] = track_curves
+        if curves_unavailable:
+            response["curves_unavailable"] = sorted(curves_unavailable)
+    return NumpyJSONResponse(select_fields(response, fields))
 
 
 @app.post("/api/compare/single")
@@ -322,36 +728,51 @@ async def compare_single(
     reference_track: Optional[UploadFile] = File(None),
     session_id: Optional[str] = Form(None),
     additional_params: Optional[str] = Form(None),
+    timings: Optional[str] = Form(None),
+    curves: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+    db: Session = Depends(database.get_db),
     # TEMPORARILY DISABLED: Authentication suspended for public beta
     # current_user: models.User = Depends(auth.get_current_user)
 ):
     """
     Compare single track vs playlist or vs another track
-    Modes: 'playlist' or 'track'
+    Modes: 'playlist', 'track' or 'sections' (time-aligned section-by-section vs a reference track;
+    additional_params is not needed)
+    The playlist profile is not echoed back (the client has it from analyze/preset load)
+    curves=true adds time-series curves for the user (and reference) track
+    Track and sections responses carry the session_id the uploads were stored under; sending
+    it with the next comparison reuses the decoded signals of tracks compared before
     """
+    include_timings = flag(timings)
+    include_curves = flag(curves)
+    fields = parse_fields(fields)
+    track_timings = []
+    track_curves = {}
+
     # Parse additional parameters if provided
     params_list = []
     if additional_params:
         try:
             params_list = json.loads(additional_params)
-            print(f"DEBUG: Received additional_params: {additional_params}")
-            print(f"DEBUG: Parsed params_list: {params_list}")
         except json.JSONDecodeError:
-            print(f"DEBUG: Failed to parse additional_params: {additional_params}")
+            logger.warning("compare_single.bad_params", extra={"raw_length": len(additional_params)})
             params_list = []
-    else:
-        print(f"DEBUG: No additional_params received")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("compare_single.start", extra={"mode": mode, "param_count": len(params_list)})
 
     # Validate that parameters are selected
-    if not params_list or len(params_list) == 0:
+    if mode != "sections" and (not params_list or len(params_list) == 0):
         raise HTTPException(
             status_code=400,
             detail="Please select at least one parameter to analyze"
         )
 
-    # For track mode, create temporary session if needed
-    if mode == "track":
-        if not session_id or session_id == "null":
+    # For track and sections mode, create temporary session if needed (an id returned by an
+    # earlier comparison is reused, so the decoded signals kept under it are found again)
+    if mode in ("track", "sections"):
+        if not session_id or session_id == "null" or (session_id not in sessions and not is_upload_id(session_id)):
             session_id = str(uuid.uuid4())
 
     # For playlist mode, require existing session
@@ -365,15 +786,70 @@ async def compare_single(
     session_dir.mkdir(parents=True, exist_ok=True)
 
     user_path = session_dir / f"user_{user_track.filename}"
-    with open(user_path, "wb") as buffer:
-        shutil.copyfileobj(user_track.file, buffer)
+    user_hash = results_store.save_upload(user_track.file, user_path)
+
+    if mode == "sections":
+        # Section-by-section vs reference track (beat-level profiles, no whole-track features)
+        if not reference_track:
+            raise HTTPException(
+                status_code=400,
+                detail="Reference track required for section comparison"
+            )
+
+        ref_path = session_dir / f"ref_{reference_track.filename}"
+        ref_hash = results_store.save_upload(reference_track.file, ref_path)
+
+        profiles = []
+        for filename, path, content_hash in ((user_track.filename, user_path, user_hash),
+                                             (reference_track.filename, ref_path, ref_hash)):
+            section_timings = Timings(trace_memory=include_timings)
+            cache_key = decode_key(session_id, content_hash)
+            profiles.append(get_audio_processor().analyze_sections(str(path), section_timings, cache_key))
+            if include_timings:
+                track_timings.append(timings_entry(filename, section_timings))
+            release_audio(path, cache_key)
+
+        user_profile, ref_profile = profiles
+        if user_profile is None or ref_profile is None:
+            raise HTTPException(status_code=500, detail="Failed to analyze tracks for section comparison")
+
+        result = SectionComparator(ref_profile).compare(user_profile)
+        response = {
+            "mode": "sections",
+            "session_id": session_id,
+            "user_track": {"filename": user_track.filename, "duration": float(user_profile.times[-1])},
+            "reference_track": {"filename": reference_track.filename, "duration": float(ref_profile.times[-1])},
+            **result
+        }
+        persist(db, results_store.save_comparisons, session_id, "sections", [], [], [{
+            "content_hash": user_hash,
+            "filename": user_track.filename,
+            "result": result
+        }])
+        if include_timings:
+            response["timings"] = track_timings
+        return NumpyJSONResponse(select_fields(response, fields))
+
+    cached = lookup_cached_features(db, [user_hash], params_list)
+    if include_curves:
+        cached = without_curve_tracks(cached, {str(user_path): user_hash})
 
     # Analyze user track with additional parameters
-    user_features = audio_processor.analyze_file(str(user_path), additional_params=params_list)
+    user_timings = Timings(trace_memory=include_timings)
+    user_curves = CurveRecorder() if include_curves else None
+    user_key = decode_key(session_id, user_hash)
+    user_features = analyze_or_cached(user_path, user_hash, params_list, cached, user_timings, user_curves,
+                                      cache_key=user_key)
+    if include_timings:
+        track_timings.append(timings_entry(user_track.filename, user_timings))
     if not user_features:
         raise HTTPException(status_code=500, detail="Failed to analyze user track")
+    if user_curves is not None:
+        track_curves["user_track"] = user_curves.as_dict()
 
     user_features['filename'] = user_track.filename
+    user_record = track_record(user_path, user_hash, user_features, cached, role="user")
+    release_audio(user_path, user_key)
 
     if mode == "playlist":
         # Compare vs playlist profile
@@ -385,21 +861,29 @@ async def compare_single(
             )
 
         try:
-            comparator = PlaylistComparator(session["playlist_analysis"])
+            comparator = session_comparator(session)
             comparison = comparator.compare_track(user_features)
             recommendations = comparator.generate_recommendations(comparison)
 
-            return {
+            response = {
                 "mode": "playlist",
                 "user_track": user_features,
-                "playlist_profile": session["playlist_profile"],
                 "comparison": comparison,
                 "recommendations": recommendations
             }
+            persist(db, results_store.save_comparisons, session_id, "playlist", params_list,
+                    stored_records([user_record], cached), [{
+                "content_hash": user_hash,
+                "filename": user_track.filename,
+                "result": {"comparison": comparison, "recommendations": recommendations}
+            }])
+            if include_timings:
+                response["timings"] = track_timings
+            if include_curves:
+                response["curves"] = track_curves
+            return NumpyJSONResponse(select_fields(response, fields))
         except Exception as e:
-            print(f"Error during playlist comparison: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("compare_single.failed", extra={"mode": "playlist"})
             raise HTTPException(
                 status_code=500,
                 detail=f"Playlist comparison failed: {str(e)}"
@@ -415,53 +899,151 @@ async def compare_single(
 
         # Save reference track
         ref_path = session_dir / f"ref_{reference_track.filename}"
-        with open(ref_path, "wb") as buffer:
-            shutil.copyfileobj(reference_track.file, buffer)
+        ref_hash = results_store.save_upload(reference_track.file, ref_path)
+        ref_cached = lookup_cached_features(db, [ref_hash], params_list)
+        if include_curves:
+            ref_cached = without_curve_tracks(ref_cached, {str(ref_path): ref_hash})
+        cached.update(ref_cached)
 
         # Analyze reference track with additional parameters
-        ref_features = audio_processor.analyze_file(str(ref_path), additional_params=params_list)
+        ref_timings = Timings(trace_memory=include_timings)
+        ref_curves = CurveRecorder() if include_curves else None
+        ref_key = decode_key(session_id, ref_hash)
+        ref_features = analyze_or_cached(ref_path, ref_hash, params_list, cached, ref_timings, ref_curves,
+                                         cache_key=ref_key)
+        if include_timings:
+            track_timings.append(timings_entry(reference_track.filename, ref_timings))
         if not ref_features:
             raise HTTPException(
                 status_code=500,
                 detail="Failed to analyze reference track"
             )
+        if ref_curves is not None:
+            track_curves["reference_track"] = ref_curves.as_dict()
 
         ref_features['filename'] = reference_track.filename
+        ref_record = track_record(ref_path, ref_hash, ref_features, cached, role="reference")
+        release_audio(ref_path, ref_key)
 
         # Compare tracks (TrackComparator needs reference track in __init__)
         try:
             track_comparator = TrackComparator(ref_features)
             recommendations = track_comparator.compare_track(user_features)
 
-            return {
+            response = {
                 "mode": "track",
+                "session_id": session_id,
                 "user_track": user_features,
                 "reference_track": ref_features,
-                "comparison": recommendations,  # compare_track already returns recommendations
                 "recommendations": recommendations
             }
+            persist(db, results_store.save_comparisons, session_id, "track", params_list,
+                    stored_records([user_record, ref_record], cached), [{
+                        "content_hash": user_hash,
+                        "filename": user_track.filename,
+                        "result": recommendations
+                    }])
+            if include_timings:
+                response["timings"] = track_timings
+            if include_curves:
+                response["curves"] = track_curves
+            return NumpyJSONResponse(select_fields(response, fields))
         except Exception as e:
-            print(f"Error during track comparison: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("compare_single.failed", extra={"mode": "track"})
             raise HTTPException(
                 status_code=500,
                 detail=f"Track comparison failed: {str(e)}"
             )
 
     else:
-        raise HTTPException(status_code=400, detail="Invalid mode. Use 'playlist' or 'track'")
+        raise HTTPException(status_code=400, detail="Invalid mode. Use 'playlist', 'track' or 'sections'")
+
+
+@app.get("/api/analysis/{session_id}")
+async def get_analysis(
+    session_id: str,
+    db: Session = Depends(database.get_db),
+    # TEMPORARILY DISABLED: Authentication suspended for public beta
+    # current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Re-open a past analysis from the database (no re-analysis)
+    Restores the session so comparisons and reports can continue
+    """
+    stored = results_store.load_analysis(db, session_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    if session_id not in sessions:
+        playlist_matrix = FeatureMatrix.from_tracks(
+            dict(track["features"], filename=track["filename"])
+            for track in stored["tracks"] if track["role"] == "playlist"
+        )
+        # Only batch comparisons (latest per file) are the session's recommendations. Their tracks
+        # were compared with the playlist's parameters; they are looked up by those, since features
+        # served from the database are not stored again and single comparisons use other parameters
+        batch = [c for c in stored["comparisons"] if c["mode"] == "batch"]
+        user_features = lookup_cached_features(db, [c["content_hash"] for c in batch], stored["params"] or [])
+        sessions[session_id] = {
+            "playlist_files": [],
+            "user_files": [],
+            "file_hashes": {},
+            "playlist_profile": stored["profile"],
+            "playlist_matrix": playlist_matrix,
+            "user_matrix": FeatureMatrix.from_tracks(
+                dict(user_features[c["content_hash"]]["features"], filename=c["filename"])
+                for c in batch if c["content_hash"] in user_features
+            ),
+            "recommendations": [c["result"] for c in batch]
+        }
+
+    return NumpyJSONResponse(stored)
+
+
+@app.get("/api/analysis/{session_id}/features.npz")
+async def get_analysis_matrix(
+    session_id: str,
+    db: Session = Depends(database.get_db),
+    # TEMPORARILY DISABLED: Authentication suspended for public beta
+    # current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Playlist features as a compressed NumPy archive
+    Arrays: params, values (float32 tracks x params, NaN if not computed), mask, filenames, keys
+    """
+    session = sessions.get(session_id)
+    if session and session.get("playlist_matrix") is not None:
+        matrix = session["playlist_matrix"]
+    else:
+        stored = results_store.load_analysis(db, session_id)
+        if not stored:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        matrix = FeatureMatrix.from_tracks(
+            dict(track["features"], filename=track["filename"])
+            for track in stored["tracks"] if track["role"] == "playlist"
+        )
+
+    return Response(
+        matrix.to_npz(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="features_{session_id[:8]}.npz"'}
+    )
 
 
 @app.post("/api/report/generate")
 async def generate_report(
-    session_id: str,
+    session_id: Optional[str] = None,
+    request: Optional[dict] = Body(None),
     # TEMPORARILY DISABLED: Authentication suspended for public beta
     # current_user: models.User = Depends(auth.get_current_user)
 ):
     """
     Generate HTML report with all recommendations
+    Session id as query parameter or JSON body {session_id}. With {"stream": true} the
+    report itself is streamed back while it is written to disk.
     """
+    request = request or {}
+    session_id = session_id or request.get("session_id")
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -474,20 +1056,43 @@ async def generate_report(
             detail="No recommendations available. Run comparison first."
         )
 
-    # Generate report
     report_gen = ReportGenerator()
-    report_html = report_gen.generate_report(
-        session.get("playlist_profile"),
-        recommendations
+    report_path = REPORTS_DIR / f"{session_id}_report.html"
+    profile = session.get("playlist_profile")
+    user_matrix = session.get("user_matrix")
+    track_features = {
+        filename: user_matrix.row(i) for i, filename in enumerate(user_matrix.filenames)
+    } if user_matrix is not None else None
+
+    # Reuse the report on disk while the profile, recommendations and features are unchanged
+    # (the version is also stored in the file, so other workers can reuse it too)
+    version = await run_in_threadpool(report_gen.report_version, profile, recommendations, track_features)
+    cached = report_path.exists() and (
+        session.get("report_version") == version or report_gen.read_version(report_path) == version
     )
+    metrics.inc("report_cache_total", 1, "Report generate calls by cache result",
+                {"result": "hit" if cached else "miss"})
 
-    # Save report
-    report_path = REPORTS_DIR / f"{session_id}_report.html"
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write(report_html)
+    if request.get("stream"):
+        if cached:
+            return FileResponse(report_path, media_type="text/html; charset=utf-8")
+
+        def chunks():
+            yield from report_gen.stream_to_file(report_path, profile, recommendations, version, track_features)
+            # Only once the file is complete: an aborted stream leaves the previous version in place
+            session["report_version"] = version
+
+        return StreamingResponse(iterate_in_threadpool(chunks()), media_type="text/html; charset=utf-8")
+
+    if not cached:
+        # Render chunk by chunk to disk
+        await run_in_threadpool(report_gen.write_report, report_path, profile, recommendations, version,
+                                track_features)
+        session["report_version"] = version
 
     return {
         "report_url": f"/api/report/download/{session_id}",
+        "cached": cached,
         "message": "Report generated successfully"
     }
 
@@ -495,53 +1100,134 @@ async def generate_report(
 @app.get("/api/report/download/{session_id}")
 async def download_report(
     session_id: str,
+    request: Request,
     # TEMPORARILY DISABLED: Authentication suspended for public beta
     # current_user: models.User = Depends(auth.get_current_user)
 ):
     """
     Download generated report
+    Answers 304 while the client's copy (ETag / Last-Modified) is current
     """
     report_path = REPORTS_DIR / f"{session_id}_report.html"
 
-    if not report_path.exists():
+    try:
+        stat_result = report_path.stat()
+    except OSError:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    return FileResponse(
+    response = FileResponse(
         report_path,
         media_type="text/html",
-        filename=f"algorithm_report_{session_id[:8]}.html"
+        filename=f"algorithm_report_{session_id[:8]}.html",
+        stat_result=stat_result,
+        headers={"Cache-Control": "private, no-cache"}
     )
+    if is_not_modified(request.headers, response.headers.get("etag"), response.headers.get("last-modified")):
+        return not_modified_response(response.headers)
+    return response
 
 
-@app.post("/api/preset/load")
-async def load_preset(
+def preset_summary(preset: models.Preset) -> dict:
+    """Describe a stored preset for the API (without its profile)"""
+    return {
+        "preset_id": preset.id,
+        "param_count": len(preset.params),
+        "track_count": preset.track_count
+    }
+
+
+@app.post("/api/presets")
+async def save_preset(
     request: dict,
+    db: Session = Depends(database.get_db),
     # TEMPORARILY DISABLED: Authentication suspended for public beta
     # current_user: models.User = Depends(auth.get_current_user)
 ):
     """
-    Load preset data from frontend localStorage into backend session
-    This allows comparing tracks against saved presets
+    Store a preset server-side
+    Body: {session_id} of an analyzed playlist and/or {profile, analysis} (imported presets,
+    or a session that no longer exists)
+    Returns the content-hash preset id; saving the same content twice returns the same id
     """
-    profile = request.get("profile")
-    analysis = request.get("analysis", [])
+    session = sessions.get(request.get("session_id"))
+    if session and session.get("playlist_profile"):
+        profile, tracks = session["playlist_profile"], session.get("playlist_matrix")
+    else:
+        profile, tracks = request.get("profile"), FeatureMatrix.from_tracks(request.get("analysis") or [])
 
     if not profile:
         raise HTTPException(status_code=400, detail="No profile data provided")
 
-    # Create new session with preset data
-    session_id = "preset_" + str(uuid.uuid4())
-    sessions[session_id] = {
-        "playlist_files": [],
-        "user_files": [],
-        "playlist_profile": profile,
-        "playlist_analysis": analysis
-    }
+    try:
+        preset = results_store.save_preset(db, profile, tracks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return {
-        "session_id": session_id,
-        "message": "Preset loaded successfully"
-    }
+    return preset_summary(preset)
+
+
+@app.get("/api/presets/{preset_id}")
+async def get_preset(
+    preset_id: str,
+    db: Session = Depends(database.get_db),
+    # TEMPORARILY DISABLED: Authentication suspended for public beta
+    # current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Return a stored preset's profile (used for export)
+    """
+    preset = results_store.load_preset(db, preset_id)
+    if not preset:
+        raise HTTPException(status_code=404, detail="Preset not found")
+    return dict(preset_summary(preset), profile=results_store.unpack_profile(preset))
+
+
+@app.post("/api/preset/load")
+async def load_preset(
+    request: dict,
+    db: Session = Depends(database.get_db),
+    # TEMPORARILY DISABLED: Authentication suspended for public beta
+    # current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Open a backend session for a stored preset
+    Body: {preset_id}. Presets saved before server-side storage send {profile, analysis};
+    they are stored first and the response carries their new preset_id.
+    Loading the same preset again reuses its session.
+    """
+    preset_id = request.get("preset_id")
+    if preset_id:
+        preset = results_store.load_preset(db, preset_id)
+        if not preset:
+            raise HTTPException(status_code=404, detail="Preset not found")
+    else:
+        profile = request.get("profile")
+        if not profile:
+            raise HTTPException(status_code=400, detail="No profile data provided")
+        try:
+            preset = results_store.save_preset(db, profile, FeatureMatrix.from_tracks(request.get("analysis") or []))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    session_id = "preset_" + preset.id[:16]
+    if session_id not in sessions:
+        profile = results_store.unpack_profile(preset)
+        tracks = results_store.unpack_tracks(preset)
+        sessions[session_id] = {
+            "playlist_files": [],
+            "user_files": [],
+            "preset_id": preset.id,
+            "playlist_profile": profile,
+            "playlist_matrix": tracks,
+            "comparator": PlaylistComparator.from_profile(profile, tracks)
+        }
+
+    return dict(
+        preset_summary(preset),
+        session_id=session_id,
+        profile=sessions[session_id]["playlist_profile"],
+        message="Preset loaded successfully"
+    )
 
 
 @app.delete("/api/session/{session_id}")
@@ -554,13 +1240,8 @@ async def cleanup_session(
     Clean up session data
     """
     if session_id in sessions:
-        # Delete uploaded files
-        session_dir = UPLOAD_DIR / session_id
-        if session_dir.exists():
-            shutil.rmtree(session_dir)
-
-        # Remove from memory
-        del sessions[session_id]
+        # Remove from memory and delete uploaded files and report
+        janitor.purge_session(session_id)
 
         return {"message": "Session cleaned up successfully"}
 
@@ -570,7 +1251,13 @@ async def cleanup_session(
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok", "service": "The Algorithm API"}
+    return {"status": "ok", "service": "The Algorithm API", "warmup": warmup.warmup_status()["state"]}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus-style per-stage analysis metrics (per worker process)"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/api/test")
@@ -597,7 +1284,7 @@ async def test_upload(file: UploadFile = File(...)):
 
 
 # Mount static files for frontend
-app.mount("/static", StaticFiles(directory=str(FRONTEND_DIR / "static")), name="static")
+app.mount("/static", CachedStaticFiles(directory=str(FRONTEND_DIR / "static"), manifest=asset_manifest), name="static")
 
 
 if __name__ == "__main__":
@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, LargeBinary, String
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -12,4 +14,75 @@ class User(Base):
     is_active = Column(Boolean, default=True)
 
     # For future relationships, e.g., with analysis results
-    # analyses = relationship("Analysis", back_populates="owner")
\ No newline at end of file
+    # analyses = relationship("Analysis", back_populates="owner")
+
+
+class PlaylistProfile(Base):
+    """Sonic profile of one analyzed playlist (one row per session)"""
+    __tablename__ = "playlist_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(64), unique=True, index=True, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    params = Column(JSON, nullable=False)
+    profile = Column(JSON, nullable=False)
+    track_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    tracks = relationship("Track", back_populates="playlist", passive_deletes=True)
+
+
+class Track(Base):
+    """Extracted features of one analyzed audio file"""
+    __tablename__ = "tracks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # SHA-256 of the uploaded file - identical uploads share features
+    content_hash = Column(String(64), nullable=False)
+    # SHA-1 of the ordered parameter list the features were extracted with
+    params_key = Column(String(40), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    session_id = Column(String(64), index=True, nullable=False)
+    playlist_id = Column(Integer, ForeignKey("playlist_profiles.id", ondelete="CASCADE"), index=True, nullable=True)
+    role = Column(String(16), nullable=False)  # 'playlist', 'user' or 'reference'
+    filename = Column(String, nullable=False)
+    duration = Column(Float, nullable=True)
+    features = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    playlist = relationship("PlaylistProfile", back_populates="tracks")
+
+    __table_args__ = (
+        Index("ix_tracks_content_hash_params", "content_hash", "params_key"),
+    )
+
+
+class Comparison(Base):
+    """Result of comparing one user track against a playlist or a reference track"""
+    __tablename__ = "comparisons"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(64), index=True, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    mode = Column(String(16), nullable=False)  # 'batch', 'preview', 'playlist', 'track' or 'sections'
+    content_hash = Column(String(64), index=True, nullable=False)
+    filename = Column(String, nullable=False)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Preset(Base):
+    """Saved playlist profile, addressed by the hash of its content"""
+    __tablename__ = "presets"
+
+    # SHA-256 of params + packed stats + packed vectors - identical presets share one row
+    id = Column(String(64), primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Parameter names, in the row/column order of the packed arrays
+    params = Column(JSON, nullable=False)
+    # float32 (len(params), 4): mean, std, min, max per parameter
+    stats = Column(LargeBinary, nullable=False)
+    # Optional float32 (track_count, len(params)) track vectors, NaN where a value is missing
+    vectors = Column(LargeBinary, nullable=True)
+    track_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
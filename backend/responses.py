@@ -0,0 +1,62 @@
+"""
+JSON responses for numpy-heavy payloads
+Serialized with orjson (numpy scalars/arrays natively, NaN/inf as null).
+Returning one of these from an endpoint bypasses FastAPI's jsonable_encoder walk.
+"""
+
+import json
+import math
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(value: Any):
+    """Convert what the encoder does not know natively"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    if isinstance(value, (datetime, date)):
+        # Stored analyses and presets carry created_at (orjson handles these itself)
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _plain(value: Any):
+    """Stdlib fallback: convert numpy values and replace NaN/inf with None (orjson does both itself)"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        value = value.tolist()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a response payload to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(_plain(content), default=_default, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSONResponse that accepts numpy values and skips re-encoding server-built payloads"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
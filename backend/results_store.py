@@ -0,0 +1,372 @@
+"""
+Persistent analysis results
+Bulk writes and content-hash lookups for analyzed tracks, playlist profiles and comparisons
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+from core.feature_matrix import FeatureMatrix
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Column order of the packed preset statistics
+PROFILE_STATS = ("mean", "std", "min", "max")
+
+# Version of the extracted values, part of every cache key. Bump it whenever an extractor,
+# decoder or resampler change alters feature values, so features stored by older code are
+# not reused (2: blocked float32 STFT and shared mel spectrogram; 3: ffmpeg decodes at the
+# native rate and layout, then downmixes and resamples like the soundfile backend)
+FEATURE_VERSION = 3
+
+# How the AudioProcessor pools frame features ('frames', 'beats' or 'bars'); it changes
+# the values of some parameters, so it is part of the cache key
+FEATURE_AGGREGATION = os.environ.get("FEATURE_AGGREGATION", "frames")
+
+# Resampling strategy of the AudioProcessor (see core.resampling, or 'auto'); part of the
+# cache key when it is not the default
+RESAMPLING = os.environ.get("RESAMPLING", "soxr_hq")
+
+
+class _HashingWriter:
+    """File wrapper that hashes everything written through it"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return self.fileobj.write(data)
+
+
+def save_upload(source: BinaryIO, path) -> str:
+    """
+    Write an uploaded file to disk and hash it in the same pass
+
+    Args:
+        source: Readable binary file object (UploadFile.file)
+        path: Destination path
+
+    Returns:
+        SHA-256 hex digest of the file content
+    """
+    with open(path, "wb") as buffer:
+        writer = _HashingWriter(buffer)
+        shutil.copyfileobj(source, writer, HASH_CHUNK_SIZE)
+    return writer.digest.hexdigest()
+
+
+def file_hash(path) -> str:
+    """Return the SHA-256 hex digest of a file on disk"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_key(params: Iterable[str]) -> str:
+    """
+    Identify a parameter selection
+
+    Order is kept: some extractors (valence, danceability) reuse features
+    extracted before them, so the same set in another order may differ.
+    The feature version and a non-default feature aggregation or resampling
+    strategy are part of the key.
+    """
+    selection = f"v{FEATURE_VERSION}:" + ",".join(params)
+    if FEATURE_AGGREGATION != "frames":
+        selection += f"@{FEATURE_AGGREGATION}"
+    if RESAMPLING != "soxr_hq":
+        selection += f"~{RESAMPLING}"
+    return hashlib.sha1(selection.encode("utf-8")).hexdigest()
+
+
+def _track_rows(session_id: str, params: List[str], tracks: List[Dict], owner_id: Optional[int],
+                playlist_id: Optional[int] = None, role: str = "playlist") -> List[Dict]:
+    key = params_key(params)
+    return [{
+        "content_hash": track["content_hash"],
+        "params_key": key,
+        "owner_id": owner_id,
+        "session_id": session_id,
+        "playlist_id": playlist_id,
+        "role": track.get("role", role),
+        "filename": track["filename"],
+        "duration": track.get("duration"),
+        "features": track["features"]
+    } for track in tracks]
+
+
+def cached_features(db: Session, content_hashes: Iterable[str], params: List[str]) -> Dict[str, Dict]:
+    """
+    Look up features already extracted for the given files and parameter selection
+
+    Args:
+        db: Database session
+        content_hashes: File content hashes
+        params: Ordered parameter selection
+
+    Returns:
+        Mapping content hash -> {'features', 'duration'} (most recent analysis wins)
+    """
+    hashes = {h for h in content_hashes if h}
+    if not hashes:
+        return {}
+
+    rows = db.execute(
+        select(models.Track.content_hash, models.Track.features, models.Track.duration)
+        .where(models.Track.content_hash.in_(hashes), models.Track.params_key == params_key(params))
+        .order_by(models.Track.id.desc())
+    ).all()
+
+    cached = {}
+    for content_hash, features, duration in rows:
+        cached.setdefault(content_hash, {"features": features, "duration": duration})
+    return cached
+
+
+def save_playlist(db: Session, session_id: str, params: List[str], profile: Dict, tracks: List[Dict],
+                  owner_id: Optional[int] = None) -> int:
+    """
+    Store a playlist profile and its tracks (replaces an earlier analysis of the same session)
+
+    Args:
+        db: Database session
+        session_id: Session the playlist was uploaded to
+        params: Ordered parameter selection
+        profile: Playlist profile from PlaylistComparator
+        tracks: Dicts with content_hash, filename, features and optional duration
+        owner_id: Owning user, if authenticated
+
+    Returns:
+        Playlist profile id
+    """
+    previous = db.scalar(select(models.PlaylistProfile.id).where(models.PlaylistProfile.session_id == session_id))
+    if previous is not None:
+        db.execute(delete(models.Track).where(models.Track.playlist_id == previous))
+        db.execute(delete(models.PlaylistProfile).where(models.PlaylistProfile.id == previous))
+
+    playlist_id = db.scalar(insert(models.PlaylistProfile).returning(models.PlaylistProfile.id), {
+        "session_id": session_id,
+        "owner_id": owner_id,
+        "params": list(params),
+        "profile": profile,
+        "track_count": len(tracks)
+    })
+    if tracks:
+        db.execute(insert(models.Track), _track_rows(session_id, params, tracks, owner_id, playlist_id))
+    db.commit()
+    return playlist_id
+
+
+def save_comparisons(db: Session, session_id: str, mode: str, params: List[str], tracks: List[Dict],
+                     comparisons: List[Dict], owner_id: Optional[int] = None):
+    """
+    Store compared tracks and their comparison results in one transaction
+
+    Args:
+        db: Database session
+        session_id: Session the comparison belongs to
+        mode: 'batch', 'preview' (approximate batch), 'playlist', 'track' or 'sections'
+        params: Ordered parameter selection
+        tracks: Dicts with content_hash, filename, features, role ('user'/'reference') and optional
+            duration; only freshly analyzed tracks (features served from the database are stored already)
+        comparisons: Dicts with content_hash, filename and result
+        owner_id: Owning user, if authenticated
+
+    Rows stored earlier in the session for the same files are replaced (comparisons of the
+    same mode, tracks of the same role and parameter selection).
+    """
+    if tracks:
+        rows = _track_rows(session_id, params, tracks, owner_id, role="user")
+        for role in {row["role"] for row in rows}:
+            db.execute(delete(models.Track).where(
+                models.Track.session_id == session_id,
+                models.Track.playlist_id.is_(None),
+                models.Track.params_key == params_key(params),
+                models.Track.role == role,
+                models.Track.content_hash.in_({row["content_hash"] for row in rows if row["role"] == role})
+            ))
+        db.execute(insert(models.Track), rows)
+    if comparisons:
+        db.execute(delete(models.Comparison).where(
+            models.Comparison.session_id == session_id,
+            models.Comparison.mode == mode,
+            models.Comparison.content_hash.in_({comparison["content_hash"] for comparison in comparisons})
+        ))
+        db.execute(insert(models.Comparison), [{
+            "session_id": session_id,
+            "owner_id": owner_id,
+            "mode": mode,
+            "content_hash": comparison["content_hash"],
+            "filename": comparison["filename"],
+            "result": comparison["result"]
+        } for comparison in comparisons])
+    db.commit()
+
+
+def load_analysis(db: Session, session_id: str) -> Optional[Dict]:
+    """
+    Read back everything stored for a session
+
+    Args:
+        db: Database session
+        session_id: Session id
+
+    Returns:
+        Dictionary with profile, tracks and comparisons, or None if nothing is stored.
+        Compared tracks are the latest per file, role and parameter selection, comparisons
+        the latest per file and mode.
+    """
+    profile = db.scalar(select(models.PlaylistProfile).where(models.PlaylistProfile.session_id == session_id))
+    tracks = db.scalars(
+        select(models.Track).where(models.Track.session_id == session_id).order_by(models.Track.id)
+    ).all()
+    comparisons = db.scalars(
+        select(models.Comparison).where(models.Comparison.session_id == session_id).order_by(models.Comparison.id)
+    ).all()
+
+    if profile is None and not tracks and not comparisons:
+        return None
+
+    # Databases written before save_comparisons replaced earlier rows can hold repeats
+    tracks = [track for track in tracks if track.role == "playlist"] + _latest(
+        (track for track in tracks if track.role != "playlist"),
+        lambda track: (track.role, track.content_hash, track.params_key))
+    comparisons = _latest(comparisons, lambda comparison: (comparison.mode, comparison.content_hash))
+
+    return {
+        "session_id": session_id,
+        "params": profile.params if profile else None,
+        "profile": profile.profile if profile else None,
+        "created_at": profile.created_at if profile else tracks[0].created_at if tracks else comparisons[0].created_at,
+        "tracks": [{
+            "filename": track.filename,
+            "content_hash": track.content_hash,
+            "role": track.role,
+            "duration": track.duration,
+            "features": track.features
+        } for track in tracks],
+        "comparisons": [{
+            "mode": comparison.mode,
+            "filename": comparison.filename,
+            "content_hash": comparison.content_hash,
+            "result": comparison.result
+        } for comparison in comparisons]
+    }
+
+
+def _latest(rows: Iterable, key) -> List:
+    """Last row per key, ordered by when that row came (rows in id order)"""
+    latest = {}
+    for row in rows:
+        latest.pop(key(row), None)
+        latest[key(row)] = row
+    return list(latest.values())
+
+
+def _number(value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return float("nan")
+
+
+def pack_preset(profile: Dict, tracks: Optional[FeatureMatrix] = None) -> Dict:
+    """
+    Encode a playlist profile (and optionally its tracks) as packed float32 arrays
+
+    Args:
+        profile: {param: {'mean', 'std', 'min', 'max'}} from PlaylistComparator
+        tracks: Optional feature matrix of the playlist tracks
+
+    Returns:
+        Column values for models.Preset, including the content hash id
+
+    Raises:
+        ValueError: If the profile has no numeric parameters
+    """
+    params = sorted(p for p, stats in profile.items() if isinstance(stats, dict) and "mean" in stats)
+    if not params:
+        raise ValueError("Profile contains no parameters")
+
+    stats = np.array([[_number(profile[p].get(field)) for field in PROFILE_STATS] for p in params], dtype="<f4")
+    vectors = None
+    if tracks is not None and len(tracks):
+        vectors = tracks.select(params).values.tobytes()
+
+    digest = hashlib.sha256(json.dumps(params).encode("utf-8"))
+    digest.update(stats.tobytes())
+    if vectors:
+        digest.update(vectors)
+
+    return {
+        "id": digest.hexdigest(),
+        "params": params,
+        "stats": stats.tobytes(),
+        "vectors": vectors,
+        "track_count": len(tracks) if tracks is not None else 0
+    }
+
+
+def unpack_profile(preset: models.Preset) -> Dict:
+    """Decode a preset's statistics back into the playlist profile shape"""
+    stats = np.frombuffer(preset.stats, dtype="<f4").reshape(len(preset.params), len(PROFILE_STATS))
+    return {
+        param: {field: float(value) for field, value in zip(PROFILE_STATS, row)}
+        for param, row in zip(preset.params, stats)
+    }
+
+
+def unpack_tracks(preset: models.Preset) -> FeatureMatrix:
+    """Decode a preset's track vectors into a feature matrix (missing values masked)"""
+    if not preset.vectors:
+        return FeatureMatrix.empty()
+    vectors = np.frombuffer(preset.vectors, dtype="<f4").reshape(-1, len(preset.params)).copy()
+    return FeatureMatrix(preset.params, vectors, ~np.isnan(vectors),
+                         [""] * len(vectors), [None] * len(vectors))
+
+
+def save_preset(db: Session, profile: Dict, tracks: Optional[FeatureMatrix] = None,
+                owner_id: Optional[int] = None) -> models.Preset:
+    """
+    Store a preset once per distinct content
+
+    Args:
+        db: Database session
+        profile: Playlist profile
+        tracks: Optional feature matrix of the playlist tracks
+        owner_id: Owning user, if authenticated
+
+    Returns:
+        The stored (or already existing) preset
+    """
+    values = pack_preset(profile, tracks)
+    preset = db.get(models.Preset, values["id"])
+    if preset is not None:
+        return preset
+
+    preset = models.Preset(owner_id=owner_id, **values)
+    db.add(preset)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Saved concurrently by another worker - same content, same row
+        db.rollback()
+        preset = db.get(models.Preset, values["id"])
+    return preset
+
+
+def load_preset(db: Session, preset_id: str) -> Optional[models.Preset]:
+    """Look up a preset by its content hash"""
+    return db.get(models.Preset, preset_id)
@@ -4,6 +4,8 @@
 const API_BASE = '';  // Same origin
 let authToken = localStorage.getItem('access_token');
 let sessionId = null;
+// Upload session of 1:1 comparisons without a playlist, reused so the backend keeps their decoded audio
+let singleCompareSessionId = null;
 let playlistFiles = [];
 let userTrackFiles = [];
 let userSingleFile = null;
@@ -84,6 +86,20 @@ function initializeCollapsibleSections() {
 
 // ===== AUTHENTICATION =====
 
+// Error message from an API response (FastAPI `detail`: a string or {message, missing})
+async function responseErrorMessage(response, fallback) {
+    try {
+        const detail = (await response.json()).detail;
+        if (typeof detail === 'string') return detail;
+        if (detail && detail.message) {
+            return detail.missing ? `${detail.message} (${detail.missing.join(', ')})` : detail.message;
+        }
+    } catch (e) {
+        // Not a JSON error body
+    }
+    return fallback;
+}
+
 function getAuthHeaders(isJson = false) {
     const headers = new Headers();
 
@@ -542,7 +558,7 @@ async function analyzePlaylist() {
 
         if (handleAuthError(analyzeResponse)) return;
         if (!analyzeResponse.ok) {
-            throw new Error('Analysis failed');
+            throw new Error(await responseErrorMessage(analyzeResponse, 'Analysis failed'));
         }
 
         const analyzeData = await analyzeResponse.json();
@@ -805,14 +821,16 @@ async function compareBatch() {
             headers: getAuthHeaders(true),
             body: JSON.stringify({
                 session_id: sessionId,
-                additional_params: selectedParams
+                additional_params: selectedParams,
+                // Only what the recommendations view renders
+                fields: ['tracks_compared', 'recommendations.filename', 'recommendations.recommendations']
             }),
             signal: batchAbortController.signal
         });
 
         if (handleAuthError(compareResponse)) return;
         if (!compareResponse.ok) {
-            throw new Error('Comparison failed');
+            throw new Error(await responseErrorMessage(compareResponse, 'Comparison failed'));
         }
 
         const compareData = await compareResponse.json();
@@ -1003,8 +1021,9 @@ async function compareSingleTrack() {
         if (mode === 'track' && referenceFile) {
             formData.append('reference_track', referenceFile);
         }
-        if (sessionId && sessionId !== 'null') {
-            formData.append('session_id', sessionId);
+        const compareSessionId = sessionId || (mode === 'playlist' ? null : singleCompareSessionId);
+        if (compareSessionId && compareSessionId !== 'null') {
+            formData.append('session_id', compareSessionId);
         }
 
         // Get selected parameters
@@ -1014,6 +1033,7 @@ async function compareSingleTrack() {
         if (selectedParams.length > 0) {
             formData.append('additional_params', JSON.stringify(selectedParams));
         }
+        formData.append('fields', 'mode,session_id,user_track,reference_track,recommendations');
 
         updateProgressStage('compare-progress-stages', 'upload', 'completed');
 
@@ -1048,6 +1068,9 @@ async function compareSingleTrack() {
         }
 
         const data = await response.json();
+        if (!sessionId && data.session_id) {
+            singleCompareSessionId = data.session_id;
+        }
 
         if (mode === 'playlist') {
             updateProgressStage('compare-progress-stages', 'analyze-user', 'completed');
@@ -1097,9 +1120,9 @@ function displaySingleComparison(data) {
     const container = document.getElementById('compare-data');
     container.innerHTML = '';
 
-    const comparison = data.comparison;
     const userTrack = data.user_track;
-    const refData = data.mode === 'playlist' ? data.playlist_profile : data.reference_track;
+    // The playlist profile is not sent back with each comparison
+    const refData = data.mode === 'playlist' ? (data.playlist_profile || currentPlaylistProfile || {}) : data.reference_track;
 
     // Complete parameter mapping with labels and formatters
     const parameterMap = {
@@ -1340,16 +1363,17 @@ const PresetManager = {
     STORAGE_KEY: 'playlist_presets',
 
     // Get all presets from localStorage
+    // Entries are small ({id, name, createdAt, tracksCount, paramCount});
+    // the profile itself is stored server-side under its content hash id
     getAll() {
         const data = localStorage.getItem(this.STORAGE_KEY);
         return data ? JSON.parse(data) : [];
     },
 
-    // Save preset
+    // Save preset entry
     save(preset) {
         const presets = this.getAll();
-        preset.id = Date.now().toString();
-        preset.createdAt = new Date().toISOString();
+        preset.createdAt = preset.createdAt || new Date().toISOString();
         presets.push(preset);
         localStorage.setItem(this.STORAGE_KEY, JSON.stringify(presets));
         return preset.id;
@@ -1373,157 +1397,109 @@ const PresetManager = {
         return false;
     },
 
-        // Delete preset
-
-
-        delete(id) {
-
-
-            const presets = this.getAll();
-
-
-            const filtered = presets.filter(p => p.id !== id);
-
-
-            localStorage.setItem(this.STORAGE_KEY, JSON.stringify(filtered));
-
-
-            return true;
-
-
-        },
-
-
-    
-
-
-        // Export preset to JSON file
-
-
-        exportPreset(id) {
-
-
-            const preset = this.get(id);
-
-
-            if (!preset) return false;
-
-
-    
-
-
-            const dataStr = "data:text/json;charset=utf-8," + encodeURIComponent(JSON.stringify(preset));
-
-
-            const downloadAnchorNode = document.createElement('a');
-
-
-            downloadAnchorNode.setAttribute("href", dataStr);
-
-
-            downloadAnchorNode.setAttribute("download", `${preset.name.replace(/[^a-z0-9]/gi, '_').toLowerCase()}_preset.json`);
-
-
-            document.body.appendChild(downloadAnchorNode); // required for firefox
-
-
-            downloadAnchorNode.click();
-
-
-            downloadAnchorNode.remove();
-
-
-            return true;
-
-
-        },
-
-
-    
-
-
-        // Import preset from JSON file
-
-
-        importPreset(file) {
-
-
-            return new Promise((resolve, reject) => {
-
-
-                const reader = new FileReader();
-
-
-                reader.onload = (e) => {
-
-
-                    try {
-
-
-                        const preset = JSON.parse(e.target.result);
-
-
-                        // Basic validation
-
-
-                        if (!preset.name || !preset.profile) {
-
-
-                            reject(new Error("Invalid preset file structure"));
-
-
-                            return;
-
-
-                        }
-
-
-                        
-
-
-                        // Generate new ID to avoid collisions
-
-
-                        preset.id = Date.now().toString();
-
-
-                        preset.createdAt = new Date().toISOString();
-
-
-                        
-
-
-                        this.save(preset);
-
-
-                        resolve(preset);
-
-
-                    } catch (error) {
-
-
-                        reject(error);
-
-
-                    }
-
-
-                };
-
+    // Delete preset
+    delete(id) {
+        const presets = this.getAll();
+        const filtered = presets.filter(p => p.id !== id);
+        localStorage.setItem(this.STORAGE_KEY, JSON.stringify(filtered));
+        return true;
+    },
 
-                reader.onerror = () => reject(new Error("Error reading file"));
-
+    // Store a profile on the server, returns {preset_id, param_count, track_count}
+    async store(body) {
+        const response = await fetch(`${API_BASE}/api/presets`, {
+            method: 'POST',
+            headers: getAuthHeaders(true),
+            body: JSON.stringify(body)
+        });
+        if (!response.ok) {
+            throw new Error('Failed to save preset on server');
+        }
+        return response.json();
+    },
 
-                reader.readAsText(file);
-
+    // Move presets saved before server-side storage (full profile in localStorage) to the server
+    async migrate() {
+        let changed = false;
+        for (const preset of this.getAll()) {
+            if (!preset.profile) continue;
+            try {
+                const data = await this.store({ profile: preset.profile, analysis: preset.analysis || [] });
+                this.delete(preset.id);
+                if (!this.get(data.preset_id)) {
+                    this.save({
+                        id: data.preset_id,
+                        name: preset.name,
+                        createdAt: preset.createdAt,
+                        tracksCount: preset.tracksCount || data.track_count,
+                        paramCount: data.param_count
+                    });
+                }
+                changed = true;
+            } catch (error) {
+                console.error('Preset migration failed:', error);
+            }
+        }
+        return changed;
+    },
 
-            });
-
+    // Export preset to JSON file
+    async exportPreset(id) {
+        const preset = this.get(id);
+        if (!preset) return false;
 
-        }
-
+        const response = await fetch(`${API_BASE}/api/presets/${id}`, { headers: getAuthHeaders() });
+        if (!response.ok) {
+            showError('Preset not found on server');
+            return false;
+        }
+        const data = await response.json();
+        const exported = { name: preset.name, createdAt: preset.createdAt, tracksCount: preset.tracksCount, profile: data.profile };
+
+        const dataStr = "data:text/json;charset=utf-8," + encodeURIComponent(JSON.stringify(exported));
+        const downloadAnchorNode = document.createElement('a');
+        downloadAnchorNode.setAttribute("href", dataStr);
+        downloadAnchorNode.setAttribute("download", `${preset.name.replace(/[^a-z0-9]/gi, '_').toLowerCase()}_preset.json`);
+        document.body.appendChild(downloadAnchorNode); // required for firefox
+        downloadAnchorNode.click();
+        downloadAnchorNode.remove();
+        return true;
+    },
 
-    };
+    // Import preset from JSON file
+    importPreset(file) {
+        return new Promise((resolve, reject) => {
+            const reader = new FileReader();
+            reader.onload = async (e) => {
+                try {
+                    const preset = JSON.parse(e.target.result);
+                    // Basic validation
+                    if (!preset.name || !preset.profile) {
+                        reject(new Error("Invalid preset file structure"));
+                        return;
+                    }
+
+                    const data = await this.store({ profile: preset.profile, analysis: preset.analysis || [] });
+                    const entry = {
+                        id: data.preset_id,
+                        name: preset.name,
+                        tracksCount: preset.tracksCount || data.track_count,
+                        paramCount: data.param_count
+                    };
+                    // Same content already saved - keep a single entry
+                    if (!this.get(entry.id)) {
+                        this.save(entry);
+                    }
+                    resolve(entry);
+                } catch (error) {
+                    reject(error);
+                }
+            };
+            reader.onerror = () => reject(new Error("Error reading file"));
+            reader.readAsText(file);
+        });
+    }
+};
 
 
     
@@ -1657,6 +1633,14 @@ const PresetManager = {
     // Display presets list on page load
     displayPresetsList();
 
+    // Move presets saved before server-side storage, then refresh the lists
+    PresetManager.migrate().then(changed => {
+        if (changed) {
+            displayPresetsList();
+            displayComparePresetsList();
+        }
+    });
+
     // Show load preset modal
     showPresetModalBtn.addEventListener('click', () => {
         displayComparePresetsList(); // Populate the list right before showing
@@ -1690,7 +1674,7 @@ const PresetManager = {
     });
 
     // Confirm save
-    presetSaveConfirm.addEventListener('click', () => {
+    presetSaveConfirm.addEventListener('click', async () => {
         const name = presetNameInput.value.trim();
         if (!name) {
             showError('Please enter a preset name');
@@ -1702,15 +1686,31 @@ const PresetManager = {
             return;
         }
 
-        // Save to localStorage
-        const preset = {
-            name: name,
-            profile: currentProfileToSave.profile,
-            analysis: currentProfileToSave.analysis,
-            tracksCount: currentProfileToSave.analysis ? currentProfileToSave.analysis.length : 0
-        };
+        // Store on the server (from the backend session when it is still alive),
+        // keep only the id and display data in localStorage
+        let data;
+        try {
+            data = await PresetManager.store({
+                session_id: currentProfileToSave.sessionId,
+                profile: currentProfileToSave.profile,
+                analysis: currentProfileToSave.analysis
+            });
+        } catch (error) {
+            showError(error.message);
+            return;
+        }
 
-        PresetManager.save(preset);
+        const existing = PresetManager.get(data.preset_id);
+        if (existing) {
+            PresetManager.update(data.preset_id, { name: name });
+        } else {
+            PresetManager.save({
+                id: data.preset_id,
+                name: name,
+                tracksCount: data.track_count,
+                paramCount: data.param_count
+            });
+        }
         presetModal.style.display = 'none';
         currentProfileToSave = null;
 
@@ -1787,7 +1787,7 @@ function displayPresetsList() {
         item.className = 'preset-item';
 
         const date = new Date(preset.createdAt).toLocaleDateString();
-        const paramCount = preset.profile ? Object.keys(preset.profile).length : 0;
+        const paramCount = preset.paramCount || (preset.profile ? Object.keys(preset.profile).length : 0);
 
         item.innerHTML = `
             <div class="preset-info">
@@ -1828,7 +1828,7 @@ function displayComparePresetsList() {
         item.className = 'preset-item';
 
         const date = new Date(preset.createdAt).toLocaleDateString();
-        const paramCount = preset.profile ? Object.keys(preset.profile).length : 0;
+        const paramCount = preset.paramCount || (preset.profile ? Object.keys(preset.profile).length : 0);
 
         item.innerHTML = `
             <div class="preset-info">
@@ -1844,27 +1844,55 @@ function displayComparePresetsList() {
     });
 }
 
+// Open (or reuse) the backend session of a stored preset
+async function openPresetSession(preset) {
+    // Presets not yet migrated still carry their profile
+    const body = preset.profile
+        ? { profile: preset.profile, analysis: preset.analysis || [] }
+        : { preset_id: preset.id };
+
+    const response = await fetch(`${API_BASE}/api/preset/load`, {
+        method: 'POST',
+        headers: getAuthHeaders(true),
+        body: JSON.stringify(body)
+    });
+
+    if (handleAuthError(response)) return null;
+    if (!response.ok) {
+        throw new Error('Failed to load preset in backend');
+    }
+    return response.json();
+}
+
 // Load preset (for Analyze tab)
-window.loadPreset = function(presetId) {
+window.loadPreset = async function(presetId) {
     const preset = PresetManager.get(presetId);
     if (!preset) {
         showError('Preset not found');
         return;
     }
 
-    // Load profile into current session
-    sessionId = 'preset_' + Date.now();
-    currentPlaylistProfile = preset.profile;
-    currentPlaylistAnalysis = preset.analysis || [];
+    try {
+        const data = await openPresetSession(preset);
+        if (!data) return;
 
-    document.getElementById('session-id').textContent = sessionId;
-    document.getElementById('has-playlist-profile').textContent = 'true';
+        // Load profile into current session
+        sessionId = data.session_id;
+        currentPlaylistProfile = data.profile;
+        currentPlaylistAnalysis = [];
+
+        document.getElementById('session-id').textContent = sessionId;
+        document.getElementById('has-playlist-profile').textContent = 'true';
 
-    // Display the profile
-    displayPlaylistProfile(preset.profile);
-    document.getElementById('playlist-results').style.display = 'block';
+        // Display the profile
+        displayPlaylistProfile(data.profile);
+        document.getElementById('playlist-results').style.display = 'block';
 
-    showSuccess(`Loaded preset: ${preset.name}`);
+        showSuccess(`Loaded preset: ${preset.name}`);
+    } catch (error) {
+        console.error('Error loading preset:', error);
+        showError('Failed to load preset: ' + error.message);
+    }
 };
 
 // Load preset for Compare tab
@@ -1876,27 +1904,14 @@ window.loadPresetForCompare = async function(presetId) {
     }
 
     try {
-        // Create backend session with preset data
-        const response = await fetch(`${API_BASE}/api/preset/load`, {
-            method: 'POST',
-            headers: getAuthHeaders(true),
-            body: JSON.stringify({
-                profile: preset.profile,
-                analysis: preset.analysis || []
-            })
-        });
-
-        if (handleAuthError(response)) return;
-        if (!response.ok) {
-            throw new Error('Failed to load preset in backend');
-        }
-
-        const data = await response.json();
+        // Backend session for the preset (looked up by id, shared across loads)
+        const data = await openPresetSession(preset);
+        if (!data) return;
 
         // Load profile into current session
         sessionId = data.session_id;
-        currentPlaylistProfile = preset.profile;
-        currentPlaylistAnalysis = preset.analysis || [];
+        currentPlaylistProfile = data.profile;
+        currentPlaylistAnalysis = [];
 
         document.getElementById('session-id').textContent = sessionId;
         document.getElementById('has-playlist-profile').textContent = 'true';